@@ -1,20 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Path
-from app.schemas.conversation import ConversationCreate, ConversationResponse
-from app.services.conversation_service import create_conversation
-from typing import List, Optional
-import uuid
-from app.utils.logger import get_logger
-# 创建路由实例
-router = APIRouter()
-logger=get_logger(__name__)
-
-
-@router.post("", response_model=ConversationResponse)
-async def create_new_conversation(conversation: ConversationCreate):
-    """创建新对话"""
-    try:
-        new_conversation = create_conversation(conversation.title)
-        return new_conversation
-    except Exception as e:
-        logger.error(f"create_new_conversation error: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+from fastapi import APIRouter, Depends, HTTPException, Query, Path
+from app.schemas.conversation import ConversationCreate, ConversationResponse, ConversationBranch, ConversationBranchResponse
+from app.services.conversation_service import create_conversation, branch_conversation
+from typing import List, Optional
+import uuid
+from app.utils.logger import get_logger
+# 创建路由实例
+router = APIRouter()
+logger=get_logger(__name__)
+
+
+@router.post("", response_model=ConversationResponse)
+async def create_new_conversation(conversation: ConversationCreate):
+    """创建新对话"""
+    try:
+        new_conversation = create_conversation(conversation.title)
+        return new_conversation
+    except Exception as e:
+        logger.error(f"create_new_conversation error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{conversation_id}/branch", response_model=ConversationBranchResponse)
+async def branch_existing_conversation(branch: ConversationBranch, conversation_id: str = Path(..., description="源对话ID")):
+    """从已有对话分出新对话，新对话带有源对话的消息历史和内核变量"""
+    try:
+        return await branch_conversation(conversation_id, branch.title)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"branch_conversation error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from ..core.execution_engine import execution_engine
+from ..core.image_store import ImageStore, MEDIA_TYPES
+from app.utils.logger import get_logger
+logger = get_logger(__name__)
+# 创建图片路由实例
+router = APIRouter()
+
+# 创建富文本输出路由实例
+outputs_router = APIRouter()
+
+# 图片按内容寻址，同一ID的内容永远不变，可以长期缓存
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/{image_id}")
+async def get_image(image_id: str, request: Request):
+    """获取代码执行生成的图片"""
+    return _serve(execution_engine.image_store, image_id, request)
+
+
+@outputs_router.get("/{output_id}")
+async def get_output(output_id: str, request: Request):
+    """获取存储在单独文件中的大体积富文本输出"""
+    # 输出内容来自用户代码，在沙箱中渲染，不能访问后端的同源资源
+    return _serve(execution_engine.output_store, output_id, request, {"Content-Security-Policy": "sandbox allow-scripts"})
+
+
+def _serve(store: ImageStore, content_id: str, request: Request, extra_headers: dict = None):
+    """按内容ID返回文件，支持ETag协商缓存"""
+    path = store.find(content_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="内容不存在")
+
+    etag = f'"{content_id}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, **(extra_headers or {})}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    media_type = MEDIA_TYPES.get(path.suffix.lstrip("."), "application/octet-stream")
+    return FileResponse(path, media_type=media_type, headers=headers)
@@ -1,2 +1,2 @@
-# Agent module initialization
+# Agent module initialization
 # This module contains the core agent implementation for AutoAnalyze
\ No newline at end of file
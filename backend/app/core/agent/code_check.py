@@ -0,0 +1,247 @@
+import os
+import ast
+import difflib
+from typing import Dict, List, Any, Optional, Tuple, Set
+from IPython.core.inputtransformer2 import TransformerManager, leading_empty_lines
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 读取文件的函数名，第一个参数为文件路径
+READ_FUNCTIONS = {
+    "open", "load", "loadtxt", "genfromtxt", "ExcelFile", "read_file",
+    "read_csv", "read_table", "read_fwf", "read_excel", "read_json", "read_parquet", "read_feather",
+    "read_pickle", "read_orc", "read_stata", "read_sas", "read_spss", "read_hdf", "read_xml",
+}
+# 从数据库、网页或剪贴板读取数据的函数，第一个参数不是文件路径，结果也不只由代码决定
+EXTERNAL_READ_PREFIXES = ("read_sql", "read_html", "read_clipboard", "read_gbq")
+# 文件路径参数的关键字名称
+PATH_KEYWORDS = ("filepath_or_buffer", "io", "path", "path_or_buf", "file", "fname", "filename")
+# 捕获后可以忽略导入失败的异常类型
+IMPORT_GUARDS = {"ImportError", "ModuleNotFoundError", "Exception", "BaseException"}
+
+
+def strip_ipython_syntax(code: str) -> Optional[str]:
+    """按IPython的方式把魔法命令和shell命令转换为Python代码，行号不变
+
+    只转换语句开头的魔法命令（括号内以!=开头的续行等保持原样），与内核执行时的转换一致。
+
+    Returns:
+        str: 可以用ast解析的代码，没有IPython语法时与原代码相同；整段为单元格魔法（%%）时返回None，不做检查
+    """
+    if code.lstrip().startswith("%%"):
+        return None
+    transformer = TransformerManager()
+    # 保留开头的空行，使行号与原代码一致
+    transformer.cleanup_transforms.remove(leading_empty_lines)
+    source = transformer.transform_cell(code)
+    # transform_cell会在末尾补换行
+    if not code.endswith("\n") and source.endswith("\n"):
+        source = source[:-1]
+    return source
+
+
+def check_syntax(code: str) -> Tuple[Optional[ast.AST], Optional[Dict[str, Any]]]:
+    """解析代码，返回(语法树, 语法错误)"""
+    try:
+        return ast.parse(code), None
+    except SyntaxError as e:
+        return None, {
+            "line": e.lineno,
+            "offset": e.offset,
+            "text": (e.text or "").rstrip(),
+            "message": e.msg,
+        }
+
+
+def _call_name(node: ast.Call) -> Optional[str]:
+    if isinstance(node.func, ast.Name):
+        return node.func.id
+    if isinstance(node.func, ast.Attribute):
+        return node.func.attr
+    return None
+
+
+def _path_argument(node: ast.Call) -> Optional[str]:
+    """读取函数调用中字符串常量形式的文件路径"""
+    if node.args:
+        arg = node.args[0]
+    else:
+        arg = next((kw.value for kw in node.keywords if kw.arg in PATH_KEYWORDS), None)
+    if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+        return arg.value
+    return None
+
+
+def _is_plain_path(value: str) -> bool:
+    """字符串像文件路径，而不是直接传入的JSON、HTML、XML或CSV文本"""
+    return bool(value.strip()) and "\n" not in value and not value.lstrip().startswith(("<", "{", "["))
+
+
+def _open_mode(node: ast.Call) -> str:
+    if len(node.args) > 1 and isinstance(node.args[1], ast.Constant):
+        return str(node.args[1].value)
+    for kw in node.keywords:
+        if kw.arg == "mode" and isinstance(kw.value, ast.Constant):
+            return str(kw.value.value)
+    return "r"
+
+
+def file_accesses(tree: ast.AST) -> Tuple[List[Tuple[str, int]], Set[str], bool]:
+    """找出代码中读取和写入的文件
+
+    Returns:
+        Tuple: (读取的文件路径及行号, 写入的文件路径, 是否存在无法静态确定路径或不读取文件（如数据库查询）的读取)
+    """
+    reads, written, dynamic = [], set(), False
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        name = _call_name(node)
+        if not name:
+            continue
+        path = _path_argument(node)
+        if name.startswith("to_") or name in ("savefig", "save", "savetxt"):
+            if path is not None:
+                written.add(path)
+        elif name == "open" and any(flag in _open_mode(node) for flag in "wax+"):
+            if path is not None:
+                written.add(path)
+        elif name.startswith(EXTERNAL_READ_PREFIXES):
+            dynamic = True
+        elif name in READ_FUNCTIONS:
+            if path is not None:
+                if _is_plain_path(path):
+                    reads.append((path, node.lineno))
+            elif node.args or node.keywords:
+                dynamic = True
+    return reads, written, dynamic
+
+
+def written_files(code: str) -> Set[str]:
+    """代码中以字符串常量给出路径写入的文件，代码有语法错误时返回空集合"""
+    source = strip_ipython_syntax(code)
+    if source is None:
+        return set()
+    tree, syntax_error = check_syntax(source)
+    if syntax_error:
+        return set()
+    return file_accesses(tree)[1]
+
+
+def find_missing_files(tree: ast.AST, workspace: str,
+                       extra_written: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+    """查找代码中读取但工作目录中不存在的文件
+
+    只检查以字符串常量给出路径的读取调用；同一段代码中写入的文件，以及extra_written中的文件
+    （如批量执行时前面的代码写入的文件）不算缺失
+    """
+    reads, written, _ = file_accesses(tree)
+    written = {os.path.normpath(path) for path in written | (extra_written or set())}
+    errors = []
+    for path, line in reads:
+        if os.path.normpath(path) in written or "://" in path or not path.strip():
+            continue
+        full_path = os.path.join(workspace, os.path.expanduser(path))
+        if os.path.exists(full_path):
+            continue
+        # 在同一目录中查找名称相近的文件，方便智能体修正路径
+        directory = os.path.dirname(full_path)
+        candidates = os.listdir(directory) if os.path.isdir(directory) else []
+        errors.append({
+            "type": "missing_file",
+            "line": line,
+            "path": path,
+            "message": f"工作目录中不存在文件: {path}",
+            "suggestions": difflib.get_close_matches(os.path.basename(path), candidates, n=3, cutoff=0.5),
+        })
+    return errors
+
+
+def collect_imports(tree: ast.AST) -> List[Tuple[str, int]]:
+    """收集代码导入的顶层模块名，跳过在try中捕获了ImportError的可选导入"""
+    imports = []
+
+    def visit(node: ast.AST, guarded: bool):
+        if isinstance(node, ast.Try):
+            handled = any(
+                handler.type is None or any(
+                    isinstance(t, ast.Name) and t.id in IMPORT_GUARDS
+                    for t in (handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type])
+                )
+                for handler in node.handlers
+            )
+            for child in node.body:
+                visit(child, guarded or handled)
+            for child in node.handlers + node.orelse + node.finalbody:
+                visit(child, guarded)
+            return
+        if not guarded:
+            if isinstance(node, ast.Import):
+                imports.extend((alias.name.split(".")[0], node.lineno) for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                imports.append((node.module.split(".")[0], node.lineno))
+        for child in ast.iter_child_nodes(node):
+            visit(child, guarded)
+
+    visit(tree, False)
+    return imports
+
+
+async def preflight_check(code: str, workspace: Optional[str], conversation_id: str,
+                          extra_written: Optional[Set[str]] = None) -> Optional[Dict[str, Any]]:
+    """在代码发送到内核之前做语法检查和静态检查
+
+    Args:
+        code: 要执行的代码
+        workspace: 工作目录
+        conversation_id: 对话ID，用于查询该对话内核环境中的模块
+        extra_written: 在本段代码之前会写入的文件，读取这些文件不算缺失
+
+    Returns:
+        Dict: 发现问题时返回给智能体的结构化错误，没有问题时返回None
+    """
+    from app.core.execution_engine import execution_engine
+
+    source = strip_ipython_syntax(code)
+    if source is None:
+        return None
+    tree, syntax_error = check_syntax(source)
+    if syntax_error:
+        return {
+            "status": "error",
+            "error_type": "syntax_error",
+            "message": f"代码未执行：第{syntax_error['line']}行语法错误: {syntax_error['message']}",
+            "errors": [syntax_error],
+        }
+
+    errors = find_missing_files(tree, workspace, extra_written) if workspace else []
+    imports = collect_imports(tree)
+    if imports:
+        try:
+            missing = await execution_engine.find_missing_modules(
+                conversation_id, sorted({module for module, _ in imports}), workspace
+            )
+        except Exception as e:
+            # 检查本身失败时不阻止执行
+            logger.warning(f"检查模块是否安装时出错: {str(e)}")
+            missing = []
+        reported = set()
+        for module, line in imports:
+            if module in missing and module not in reported:
+                reported.add(module)
+                errors.append({
+                    "type": "missing_module",
+                    "line": line,
+                    "module": module,
+                    "message": f"内核环境中未安装模块 {module}，可以使用install_package安装",
+                })
+
+    if not errors:
+        return None
+    return {
+        "status": "error",
+        "error_type": "static_check",
+        "message": "代码未执行：" + "；".join(error["message"] for error in errors),
+        "errors": errors,
+    }
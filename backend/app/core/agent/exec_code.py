@@ -1,213 +1,303 @@
-from typing import Dict, List, Optional, Any, Union
-from app.core.jupyter_execution import jupyter_execution_engine as execution_engine
-import uuid
-from app.websocket.manager import manager
-import asyncio
-
-from app.core.filesystem import FileSystemManager
-from app.core.image_utils import analyze_image
-import logging
-import sys
-import io
-import time
-import traceback
-import re
-import base64
-logger = logging.getLogger(__name__)
-# 获取文件系统管理器实例
-fs_manager = FileSystemManager()
-
-async def exec_code(code: str, conversation_id: str) -> Dict[str, Any]:
-    try:
-        if not fs_manager.workspace:
-            return {"status": "error", "message": "工作目录未设置"}
-
-        execution_id = str(uuid.uuid4())
-
-        # 创建异步回调函数
-        async def async_output_callback(output_item):
-            await manager.broadcast_message({
-                "type": "code_execution_output",
-                "data": {
-                    "execution_id": execution_id,
-                    "conversation_id": conversation_id,
-                    "output": output_item,
-                    "timestamp": time.time()
-                }
-            })
-
-
-        # 在注册回调前添加日志
-        logger.info(f"注册执行回调: {execution_id}")
-        execution_engine.register_output_callback(execution_id, async_output_callback)
-
-        # 发送执行开始消息
-        await manager.broadcast_message({
-            "type": "code_execution_start",
-            "data": {
-                "execution_id": execution_id,
-                "conversation_id": conversation_id,
-                "code": code,
-                "timestamp": time.time()
-            }
-        })
-
-        # 直接使用异步方法执行代码，不再使用to_thread
-        await execution_engine.execute_code(
-            code=code,
-            execution_id=execution_id,
-            conversation_id=conversation_id,
-            workspace=fs_manager.workspace
-        )
-
-        # 等待执行完成 - 使用改进的判断逻辑
-        while True:
-            status = execution_engine.get_execution_status(execution_id)
-            if status["start_time"] and(status["status"] not in ["running", "pending"]):
-                break
-            # 如果有execution_count但状态仍为running，说明已经开始执行
-            # 如果is_executing为False，说明执行已完成
-
-            await asyncio.sleep(0.1)
-
-        # 检查是否有图片输出并发送到前端
-        image_descriptions = []
-        if "images" in status and status["images"]:
-            for i, img_data in enumerate(status["images"]):
-                # 分析图片内容
-                image_description = await analyze_image(
-                    image_data=img_data["data"],
-                    image_format=img_data["format"],
-                    is_base64=True,
-                    prompt="这是一个数据可视化图表。请详细描述这个图表展示的内容，包括图表类型、轴标签、数据趋势等关键信息。"
-                )
-                
-                # 保存图片描述
-                image_descriptions.append({
-                    "index": i,
-                    "description": image_description
-                })
-                
-                # 发送图片和描述到前端
-                await manager.broadcast_message({
-                    "type": "code_execution_image",
-                    "data": {
-                        "execution_id": execution_id,
-                        "conversation_id": conversation_id,
-                        "image_data": img_data["data"],
-                        "image_format": img_data["format"],
-                        "image_index": i,
-                        "image_description": image_description,
-                        "timestamp": time.time()
-                    }
-                })
-
-        # 发送执行完成消息
-        await manager.broadcast_message({
-            "type": "code_execution_end",
-            "data": {
-                "execution_id": execution_id,
-                "conversation_id": conversation_id,
-                "status": status["status"],
-                "timestamp": time.time()
-            }
-        })
-
-        # 注销回调函数
-        execution_engine.unregister_output_callback(execution_id)
-
-        # 修改输出收集逻辑，改为列表形式
-        return {
-            "status": "success" if status["status"] == "completed" else "error",
-            "output": sorted(
-                [
-                    {
-                        "type": o["type"],
-                        "content": o["content"],
-                        "timestamp": o["timestamp"]
-                    }
-                    for o in status["output"]
-                ],
-                key=lambda x: x["timestamp"]
-            ),
-            "image_count": len(status.get("images", [])),
-            "image_descriptions": image_descriptions
-        }
-
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
-
-
-if __name__ == "__main__":
-    import asyncio
-
-    # 仅针对Windows系统设置
-    if sys.platform == 'win32':
-        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-
-    async def test_exec_code():
-        print("\n=== 测试代码执行功能 ===")
-
-        # 设置测试工作目录
-        fs_manager.set_workspace("D:\\deep")
-
-        test_cases = [
-            {
-                "name": "基础打印测试",
-                "code": """
-print('Hello World!')
-print('Testing...')
-                """
-            },
-            {
-                "name": "数据处理测试",
-                "code": """
-import pandas as pd
-df = pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]})
-print(df.describe())
-                """
-            },
-            {
-                "name": "图表生成测试",
-                "code": """
-import matplotlib.pyplot as plt
-plt.figure(figsize=(6,4))
-plt.plot([1,2,3,4], [1,4,2,3])
-plt.title('Test Plot')
-plt.xlabel('X axis')
-plt.ylabel('Y axis')
-plt.show()
-                """
-            },
-            {
-                "name": "错误处理测试",
-                "code": """
-# 制造一个错误
-x = 1/0
-                """
-            }
-        ]
-
-        for test in test_cases:
-            print(f"\n--- 测试用例: {test['name']} ---")
-            try:
-                result = await exec_code(
-                    code=test["code"],
-                    conversation_id="test-conversation"
-                )
-                print("执行结果:", result)
-                if result["status"] == "error":
-                    print("错误信息:", result["message"])
-                else:
-                    if result.get("stdout"):
-                        print("标准输出:", result["stdout"])
-                    if result.get("stderr"):
-                        print("标准错误:", result["stderr"])
-                    if result.get("image_count"):
-                        print(f"生成图片数量: {result['image_count']}")
-            except Exception as e:
-                print(f"测试出错: {str(e)}")
-
-
-    # 运行测试
-    asyncio.run(test_exec_code())
+from typing import Dict, List, Optional, Any, Union
+from app.core.execution_engine import execution_engine
+import uuid
+from app.websocket.manager import manager
+import asyncio
+
+from app.core.filesystem import FileSystemManager
+from app.core.image_utils import analyze_image
+from app.core.agent.code_check import preflight_check, written_files
+import logging
+import sys
+import io
+import time
+import traceback
+import re
+import base64
+logger = logging.getLogger(__name__)
+# 获取文件系统管理器实例
+fs_manager = FileSystemManager()
+# 批量执行中某段代码的结果状态 -> 汇总信息中的说明
+_BATCH_FAILURES = {"timeout": "执行超时", "oom": "内存不足"}
+
+async def exec_code(code: Union[str, List[str]], conversation_id: str) -> Dict[str, Any]:
+    """执行代码，code为代码列表时在同一内核中依次执行，返回每段代码的结果"""
+    if isinstance(code, list):
+        return await exec_code_batch(code, conversation_id)
+    try:
+        if not fs_manager.workspace:
+            return {"status": "error", "message": "工作目录未设置"}
+
+        # 发送到内核之前先做语法和静态检查，发现问题直接返回给智能体
+        if execution_engine.config.preflight_checks:
+            problem = await preflight_check(code, fs_manager.workspace, conversation_id)
+            if problem:
+                return problem
+
+        execution_id = str(uuid.uuid4())
+        await _start_execution(execution_id, code, conversation_id)
+
+        # 直接使用异步方法执行代码，不再使用to_thread
+        await execution_engine.execute_code(
+            code=code,
+            execution_id=execution_id,
+            conversation_id=conversation_id,
+            workspace=fs_manager.workspace
+        )
+
+        # 等待执行完成，内核进入idle后立即返回
+        status = await execution_engine.wait_for_completion(execution_id)
+        return await _finish_execution(execution_id, conversation_id, status)
+
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+async def exec_code_batch(codes: List[str], conversation_id: str) -> Dict[str, Any]:
+    """在同一内核中依次执行多段代码，所有代码一次性发送到内核
+
+    某段代码出错后不再执行之后的代码，这些代码的状态为skipped
+    """
+    try:
+        if not fs_manager.workspace:
+            return {"status": "error", "message": "工作目录未设置"}
+        if not codes or not all(isinstance(code, str) for code in codes):
+            return {"status": "error", "message": "code必须是代码字符串或非空的代码字符串列表"}
+
+        # 有一段代码检查不通过时所有代码都不执行；前面的代码写入的文件可以在之后的代码中读取
+        if execution_engine.config.preflight_checks:
+            written = set()
+            for index, code in enumerate(codes):
+                problem = await preflight_check(code, fs_manager.workspace, conversation_id, written)
+                if problem:
+                    problem["message"] = f"第{index + 1}段{problem['message']}，所有代码均未执行"
+                    problem["block"] = index
+                    return problem
+                written |= written_files(code)
+
+        execution_ids = [str(uuid.uuid4()) for _ in codes]
+        for execution_id, code in zip(execution_ids, codes):
+            await _start_execution(execution_id, code, conversation_id)
+
+        await execution_engine.execute_batch(
+            codes,
+            conversation_id=conversation_id,
+            workspace=fs_manager.workspace,
+            execution_ids=execution_ids
+        )
+
+        results = []
+        for index, execution_id in enumerate(execution_ids):
+            status = await execution_engine.wait_for_completion(execution_id)
+            if status["status"] == "skipped":
+                await _broadcast_end(execution_id, conversation_id, status)
+                execution_engine.unregister_output_callback(execution_id)
+                results.append({"block": index, "status": "skipped", "message": status.get("error") or "本段代码未执行"})
+            else:
+                results.append({"block": index, **await _finish_execution(execution_id, conversation_id, status)})
+
+        failed = next((result for result in results if result["status"] not in ("success", "skipped")), None)
+        return {
+            "status": failed["status"] if failed else "success",
+            "message": f"第{failed['block'] + 1}段代码{_BATCH_FAILURES.get(failed['status'], '执行失败')}，之后的代码未执行"
+                       if failed else f"{len(codes)}段代码全部执行成功",
+            "results": results,
+        }
+
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+async def _start_execution(execution_id: str, code: str, conversation_id: str):
+    """注册输出回调并通知前端执行开始"""
+    # 创建异步回调函数
+    async def async_output_callback(output_item):
+        await manager.broadcast_message({
+            "type": "code_execution_output",
+            "data": {
+                "execution_id": execution_id,
+                "conversation_id": conversation_id,
+                "output": output_item,
+                "timestamp": time.time()
+            }
+        })
+
+    # 在注册回调前添加日志
+    logger.info(f"注册执行回调: {execution_id}")
+    execution_engine.register_output_callback(execution_id, async_output_callback)
+
+    # 发送执行开始消息
+    await manager.broadcast_message({
+        "type": "code_execution_start",
+        "data": {
+            "execution_id": execution_id,
+            "conversation_id": conversation_id,
+            "code": code,
+            "timestamp": time.time()
+        }
+    })
+
+
+async def _broadcast_end(execution_id: str, conversation_id: str, status: Dict[str, Any]):
+    """发送执行完成消息"""
+    await manager.broadcast_message({
+        "type": "code_execution_end",
+        "data": {
+            "execution_id": execution_id,
+            "conversation_id": conversation_id,
+            "status": status["status"],
+            # 内核端统计的耗时、CPU时间、内存峰值增量和新建的DataFrame
+            "profile": status.get("profile"),
+            "cached": status.get("cached", False),
+            "timestamp": time.time()
+        }
+    })
+
+
+async def _finish_execution(execution_id: str, conversation_id: str, status: Dict[str, Any]) -> Dict[str, Any]:
+    """分析图片、通知前端执行完成，返回给智能体的执行结果"""
+    # 检查是否有图片输出并发送到前端
+    image_descriptions = []
+    if "images" in status and status["images"]:
+        for i, img_data in enumerate(status["images"]):
+            # 分析图片内容，图片从图片存储中读取；视觉模型不支持SVG矢量图
+            if img_data["format"] == "svg":
+                image_description = "SVG矢量图，未进行图像分析"
+            else:
+                image_description = await analyze_image(
+                    image_data=execution_engine.image_store.read_base64(img_data["id"]),
+                    image_format=img_data["format"],
+                    is_base64=True,
+                    prompt="这是一个数据可视化图表。请详细描述这个图表展示的内容，包括图表类型、轴标签、数据趋势等关键信息。"
+                )
+
+
+            # 保存图片描述
+            image_descriptions.append({
+                "index": i,
+                "description": image_description
+            })
+
+            # 发送图片地址、尺寸和描述到前端，图片本身由前端通过HTTP获取
+            await manager.broadcast_message({
+                "type": "code_execution_image",
+                "data": {
+                    "execution_id": execution_id,
+                    "conversation_id": conversation_id,
+                    "image_id": img_data["id"],
+                    "image_url": img_data["url"],
+                    "image_width": img_data["width"],
+                    "image_height": img_data["height"],
+                    "image_format": img_data["format"],
+                    "image_index": i,
+                    "image_description": image_description,
+                    "timestamp": time.time()
+                }
+            })
+
+    await _broadcast_end(execution_id, conversation_id, status)
+
+    # 注销回调函数
+    execution_engine.unregister_output_callback(execution_id)
+
+    # 超时和内存不足单独标出，便于调整代码后重试
+    result_status = {"completed": "success", "timeout": "timeout", "oom": "oom"}.get(status["status"], "error")
+
+    # 修改输出收集逻辑，改为列表形式
+    return {
+        "status": result_status,
+        "output": sorted(
+            [
+                {
+                    "type": o["type"],
+                    "content": o["content"],
+                    "timestamp": o["timestamp"]
+                }
+                for o in status["output"]
+            ],
+            key=lambda x: x["timestamp"]
+        ),
+        "image_count": len(status.get("images", [])),
+        "image_descriptions": image_descriptions,
+        # 代码和读取的文件都未变化，直接使用了之前的执行结果
+        **({"cached": True} if status.get("cached") else {}),
+        # 输出过长被截断时给出总大小和完整输出文件位置
+        **({"output_truncated": status["output_truncated"]} if status.get("output_truncated") else {}),
+        # 内核内存过高时提醒释放变量
+        **({"memory_warning": status["memory_warning"]} if status.get("memory_warning") else {})
+    }
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    # 仅针对Windows系统设置
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+    async def test_exec_code():
+        print("\n=== 测试代码执行功能 ===")
+
+        # 设置测试工作目录
+        fs_manager.set_workspace("D:\\deep")
+
+        test_cases = [
+            {
+                "name": "基础打印测试",
+                "code": """
+print('Hello World!')
+print('Testing...')
+                """
+            },
+            {
+                "name": "数据处理测试",
+                "code": """
+import pandas as pd
+df = pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]})
+print(df.describe())
+                """
+            },
+            {
+                "name": "图表生成测试",
+                "code": """
+import matplotlib.pyplot as plt
+plt.figure(figsize=(6,4))
+plt.plot([1,2,3,4], [1,4,2,3])
+plt.title('Test Plot')
+plt.xlabel('X axis')
+plt.ylabel('Y axis')
+plt.show()
+                """
+            },
+            {
+                "name": "错误处理测试",
+                "code": """
+# 制造一个错误
+x = 1/0
+                """
+            }
+        ]
+
+        for test in test_cases:
+            print(f"\n--- 测试用例: {test['name']} ---")
+            try:
+                result = await exec_code(
+                    code=test["code"],
+                    conversation_id="test-conversation"
+                )
+                print("执行结果:", result)
+                if result["status"] == "error":
+                    print("错误信息:", result["message"])
+                else:
+                    if result.get("stdout"):
+                        print("标准输出:", result["stdout"])
+                    if result.get("stderr"):
+                        print("标准错误:", result["stderr"])
+                    if result.get("image_count"):
+                        print(f"生成图片数量: {result['image_count']}")
+            except Exception as e:
+                print(f"测试出错: {str(e)}")
+
+
+    # 运行测试
+    asyncio.run(test_exec_code())
@@ -0,0 +1,202 @@
+import os
+import ast
+import json
+import time
+import hashlib
+import builtins
+import symtable
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
+from app.core.agent.code_check import strip_ipython_syntax, file_accesses
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 结果不确定或有外部副作用的模块，导入这些模块的代码不缓存
+NONDETERMINISTIC_MODULES = {
+    "random", "time", "datetime", "uuid", "secrets", "os", "sys", "subprocess", "socket",
+    "shutil", "glob", "pathlib", "requests", "urllib", "http", "threading", "multiprocessing",
+}
+# 结果不确定的调用或属性，例如随机数、当前时间
+NONDETERMINISTIC_NAMES = {
+    "random", "rand", "randn", "randint", "choice", "sample", "shuffle", "permutation",
+    "now", "today", "utcnow", "urandom", "input", "exec", "eval", "globals", "locals", "vars",
+}
+
+
+def _global_references(table: symtable.SymbolTable) -> List[str]:
+    """嵌套作用域（lambda、推导式）中引用的全局名称；声明了global的名称直接返回None标记"""
+    names = []
+    for child in table.get_children():
+        for symbol in child.get_symbols():
+            if symbol.is_declared_global():
+                names.append(None)
+            elif symbol.is_global() and symbol.is_referenced():
+                names.append(symbol.get_name())
+        names.extend(_global_references(child))
+    return names
+
+
+def analyze_cell(code: str) -> Optional[Dict[str, Any]]:
+    """判断代码能否缓存
+
+    只有自包含的代码才能缓存：不引用之前代码定义的变量，除import外不在命名空间中留下变量，
+    不写文件，不使用随机数和当前时间，读取的文件路径都是字符串常量。
+    满足这些条件时，代码的输出只由代码本身和读取的文件决定，重放输出与重新执行等价。
+
+    Returns:
+        Dict: 包含reads（读取的文件路径）和imports（命中缓存时需要在内核中补执行的import语句），
+            不能缓存时返回None
+    """
+    source = strip_ipython_syntax(code)
+    # 魔法命令和shell命令可能有副作用
+    if source is None or source != code:
+        return None
+    try:
+        tree = ast.parse(source)
+        table = symtable.symtable(source, "<cell>", "exec")
+    except SyntaxError:
+        return None
+
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            if isinstance(node, ast.ImportFrom):
+                if node.level or not node.module or any(alias.name == "*" for alias in node.names):
+                    return None
+                modules = [node.module]
+            else:
+                modules = [alias.name for alias in node.names]
+            if any(module.split(".")[0] in NONDETERMINISTIC_MODULES for module in modules):
+                return None
+            imports.append(ast.get_source_segment(source, node))
+        elif isinstance(node, ast.Attribute) and node.attr in NONDETERMINISTIC_NAMES:
+            return None
+        elif isinstance(node, ast.Name) and node.id in NONDETERMINISTIC_NAMES:
+            return None
+        elif isinstance(node, (ast.Global, ast.Nonlocal, ast.Delete)):
+            return None
+
+    # 推导式的循环变量不会留在命名空间中（Python 3.12起推导式内联到外层符号表）
+    comprehension_targets = [
+        target
+        for node in ast.walk(tree) if isinstance(node, ast.comprehension)
+        for target in ast.walk(node.target) if isinstance(target, ast.Name)
+    ]
+    other_stores = {
+        node.id for node in ast.walk(tree)
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store)
+        and not any(node is target for target in comprehension_targets)
+    }
+    comprehension_names = {target.id for target in comprehension_targets} - other_stores
+
+    imported = set()
+    for symbol in table.get_symbols():
+        name = symbol.get_name()
+        if symbol.is_imported():
+            imported.add(name)
+        elif name in comprehension_names:
+            continue
+        elif symbol.is_assigned() or symbol.is_namespace():
+            # 绑定了新变量，跳过执行会使之后的代码找不到该变量
+            return None
+        elif symbol.is_referenced() and not hasattr(builtins, name):
+            # 依赖之前代码定义的变量，输出不只由本段代码决定
+            return None
+    for name in _global_references(table):
+        if name is None or (name not in imported and not hasattr(builtins, name)):
+            return None
+
+    reads, written, dynamic = file_accesses(tree)
+    if written or dynamic or any("://" in path for path, _ in reads):
+        return None
+    return {"reads": sorted({path for path, _ in reads}), "imports": imports}
+
+
+def fingerprint_files(paths: List[str], workspace: Optional[str]) -> List[Tuple[str, Optional[int], Optional[int]]]:
+    """读取文件的路径、修改时间和大小，文件不存在时后两项为None"""
+    fingerprints = []
+    for path in paths:
+        full_path = os.path.normpath(os.path.join(workspace or os.getcwd(), os.path.expanduser(path)))
+        try:
+            stat = os.stat(full_path)
+            fingerprints.append((full_path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            fingerprints.append((full_path, None, None))
+    return fingerprints
+
+
+class CellCache:
+    """代码执行结果缓存
+
+    以代码内容和读取文件的修改时间、大小作为键，保存执行成功后的输出和图片。
+    再次执行相同的代码且读取的文件没有变化时，直接重放保存的输出而不发送到内核。
+    图片和大体积输出按内容寻址存储，缓存中只保存它们的ID和URL。
+    """
+
+    def __init__(self, max_entries: int = 128):
+        """初始化执行结果缓存
+
+        Args:
+            max_entries: 最多缓存的结果数，超出时淘汰最久未使用的结果
+        """
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+
+    def lookup(self, code: str, workspace: Optional[str]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """查找代码的缓存结果
+
+        Returns:
+            Tuple: (代码信息, 缓存的结果)；代码信息包含缓存键key和import语句，
+                代码不能缓存时为None；未命中时缓存的结果为None
+        """
+        cell = analyze_cell(code)
+        if cell is None:
+            self.uncacheable += 1
+            return None, None
+        key_source = json.dumps([code, fingerprint_files(cell["reads"], workspace)], ensure_ascii=False)
+        cell["key"] = key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return cell, None
+        self.hits += 1
+        entry["hits"] += 1
+        self.entries.move_to_end(key)
+        return cell, entry
+
+    def put(self, cell: Dict[str, Any], execution: Dict[str, Any]):
+        """保存执行成功的结果
+
+        Args:
+            cell: lookup返回的代码信息
+            execution: 执行记录
+        """
+        key = cell["key"]
+        self.entries[key] = {
+            "output": [dict(item) for item in execution["output"]],
+            "images": [dict(image) for image in execution["images"]],
+            "output_truncated": execution.get("output_truncated"),
+            "imports": cell["imports"],
+            "created_at": time.time(),
+            "hits": 0,
+        }
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存条目数和命中、未命中、不可缓存的次数"""
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "uncacheable": self.uncacheable,
+        }
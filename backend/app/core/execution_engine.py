@@ -0,0 +1,28 @@
+from typing import Optional
+from app.config import get_settings
+from app.schemas.config import ExecutionConfig
+from app.core.jupyter_execution import JupyterExecutionEngine
+from app.core.subprocess_execution import SubprocessExecutionEngine
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 配置中的引擎名称 -> 执行引擎类
+ENGINES = {
+    JupyterExecutionEngine.engine_name: JupyterExecutionEngine,
+    SubprocessExecutionEngine.engine_name: SubprocessExecutionEngine,
+}
+
+
+def create_execution_engine(config: Optional[ExecutionConfig] = None) -> JupyterExecutionEngine:
+    """按配置创建执行引擎，未知的引擎名称使用Jupyter引擎"""
+    config = config or get_settings().execution
+    engine_class = ENGINES.get(config.engine)
+    if engine_class is None:
+        logger.warning(f"未知的执行引擎: {config.engine}，使用jupyter引擎")
+        engine_class = JupyterExecutionEngine
+    return engine_class(config)
+
+
+# 创建全局执行引擎实例
+execution_engine = create_execution_engine()
@@ -0,0 +1,222 @@
+import os
+import json
+import time
+import shutil
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterator, Tuple
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 默认的执行记录落盘目录
+DEFAULT_STORE_DIR = Path(os.path.dirname(os.path.abspath(__file__))).parent.parent / "data" / "executions"
+
+
+class ExecutionStore:
+    """有界的执行记录存储
+
+    内存中只保留最近的执行记录。已结束的记录在超出数量上限、内存上限或超过TTL时
+    写入磁盘（输出为JSON Lines），再次访问时按需从磁盘加载。
+    图片保存在图片存储中，记录里只有图片ID、URL和尺寸。
+    正在执行的记录始终保留在内存中。
+    """
+
+    def __init__(self, storage_dir: Optional[str] = None, max_records: int = 200,
+                 max_memory_mb: int = 256, ttl: int = 3600):
+        """初始化执行记录存储
+
+        Args:
+            storage_dir: 落盘目录，为None时使用 data/executions
+            max_records: 内存中最多保留的记录数
+            max_memory_mb: 内存中已结束记录的估算内存上限（MB）
+            ttl: 已结束记录在内存中保留的最长时间（秒）
+        """
+        self.storage_dir = Path(storage_dir) if storage_dir else DEFAULT_STORE_DIR
+        self.max_records = max_records
+        self.max_memory = max_memory_mb * 1024 * 1024
+        self.ttl = ttl
+        # 执行ID -> 执行记录，按最近访问顺序排列
+        self.records: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # 已结束记录的估算内存占用，未出现在此处的记录仍在执行中
+        self._sizes: Dict[str, int] = {}
+        self.spilled_count = 0
+        self.loaded_count = 0
+
+    def __contains__(self, execution_id: str) -> bool:
+        return execution_id in self.records or self._record_path(execution_id).exists()
+
+    def __getitem__(self, execution_id: str) -> Dict[str, Any]:
+        record = self.get(execution_id)
+        if record is None:
+            raise KeyError(execution_id)
+        return record
+
+    def __setitem__(self, execution_id: str, record: Dict[str, Any]):
+        self.records[execution_id] = record
+        self.records.move_to_end(execution_id)
+        self._sizes.pop(execution_id, None)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.records.keys()))
+
+    def get(self, execution_id: str, default: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """获取执行记录，不在内存中时从磁盘加载"""
+        record = self.records.get(execution_id)
+        if record is not None:
+            self.records.move_to_end(execution_id)
+            return record
+        record = self._load(execution_id)
+        if record is None:
+            return default
+        self.records[execution_id] = record
+        self._sizes[execution_id] = self._estimate_size(record)
+        self.enforce_limits(keep=execution_id)
+        return record
+
+    def mark_finished(self, execution_id: str):
+        """标记执行已结束，此后该记录可以被写入磁盘"""
+        record = self.records.get(execution_id)
+        if record is None:
+            return
+        self._sizes[execution_id] = self._estimate_size(record)
+        self.enforce_limits()
+
+    def enforce_limits(self, keep: Optional[str] = None):
+        """按LRU顺序把超出限制的已结束记录写入磁盘
+
+        Args:
+            keep: 本次不写入磁盘的执行ID（刚加载的记录）
+        """
+        now = time.time()
+        memory = sum(self._sizes.values())
+        for execution_id in list(self.records.keys()):
+            if execution_id not in self._sizes or execution_id == keep:
+                continue
+            record = self.records[execution_id]
+            expired = record.get("end_time") and now - record["end_time"] > self.ttl
+            if not expired and len(self.records) <= self.max_records and memory <= self.max_memory:
+                break
+            memory -= self._sizes[execution_id]
+            self._spill(execution_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取存储统计信息"""
+        return {
+            "in_memory": len(self.records),
+            "memory_bytes": sum(self._sizes.values()),
+            "spilled_count": self.spilled_count,
+            "loaded_count": self.loaded_count,
+        }
+
+    def spill_conversation(self, conversation_id: str) -> Tuple[int, int]:
+        """把对话已结束的执行记录写入磁盘，之后仍可按需加载
+
+        Returns:
+            Tuple: (写入磁盘的记录数, 释放的内存估算字节数)
+        """
+        spilled, freed = 0, 0
+        for execution_id, record in list(self.records.items()):
+            if record.get("conversation_id") != conversation_id or execution_id not in self._sizes:
+                continue
+            size = self._sizes[execution_id]
+            self._spill(execution_id)
+            if execution_id not in self.records:
+                spilled += 1
+                freed += size
+        return spilled, freed
+
+    def drop_conversation(self, conversation_id: str) -> Tuple[int, int]:
+        """删除对话已结束的执行记录，包括已写入磁盘的记录
+
+        Returns:
+            Tuple: (删除的记录数, 释放的内存估算字节数)
+        """
+        dropped, freed = 0, 0
+        for execution_id, record in list(self.records.items()):
+            if record.get("conversation_id") != conversation_id or execution_id not in self._sizes:
+                continue
+            freed += self._sizes.pop(execution_id)
+            del self.records[execution_id]
+            shutil.rmtree(self._record_dir(execution_id), ignore_errors=True)
+            dropped += 1
+        if self.storage_dir.exists():
+            for record_dir in self.storage_dir.iterdir():
+                if record_dir.name in self.records:
+                    continue
+                try:
+                    with open(record_dir / "record.json", "r", encoding="utf-8") as f:
+                        if json.load(f).get("conversation_id") != conversation_id:
+                            continue
+                except (OSError, ValueError):
+                    continue
+                shutil.rmtree(record_dir, ignore_errors=True)
+                dropped += 1
+        return dropped, freed
+
+    @staticmethod
+    def _estimate_size(record: Dict[str, Any]) -> int:
+        """估算记录占用的内存（按字符串长度计），包括富文本输出随消息发送的data"""
+        size = len(record.get("code") or "")
+        for item in record.get("output", []):
+            size += len(item.get("content") or "")
+            data = item.get("data")
+            if isinstance(data, str):
+                size += len(data)
+            elif data is not None:
+                size += len(json.dumps(data, ensure_ascii=False, default=str))
+        return size
+
+    def _record_dir(self, execution_id: str) -> Path:
+        return self.storage_dir / execution_id
+
+    def _record_path(self, execution_id: str) -> Path:
+        return self._record_dir(execution_id) / "record.json"
+
+    def _spill(self, execution_id: str):
+        """把记录写入磁盘并从内存中移除"""
+        record = self.records.get(execution_id)
+        if record is None:
+            return
+        record_dir = self._record_dir(execution_id)
+        try:
+            record_dir.mkdir(parents=True, exist_ok=True)
+            with open(record_dir / "output.jsonl", "w", encoding="utf-8") as f:
+                for item in record.get("output", []):
+                    f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            meta = {k: v for k, v in record.items() if k != "output"}
+            # 最后写入record.json，存在即表示记录已完整落盘
+            with open(self._record_path(execution_id), "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+        except Exception as e:
+            logger.error(f"执行记录写入磁盘失败: {execution_id}, {str(e)}")
+            shutil.rmtree(record_dir, ignore_errors=True)
+            return
+        del self.records[execution_id]
+        self._sizes.pop(execution_id, None)
+        self.spilled_count += 1
+        logger.debug(f"执行记录已写入磁盘: {execution_id}")
+
+    def _load(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """从磁盘加载记录"""
+        record_path = self._record_path(execution_id)
+        if not record_path.exists():
+            return None
+        record_dir = self._record_dir(execution_id)
+        try:
+            with open(record_path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+            output = []
+            output_path = record_dir / "output.jsonl"
+            if output_path.exists():
+                with open(output_path, "r", encoding="utf-8") as f:
+                    output = [json.loads(line) for line in f if line.strip()]
+            record["output"] = output
+        except Exception as e:
+            logger.error(f"从磁盘加载执行记录失败: {execution_id}, {str(e)}")
+            return None
+        self.loaded_count += 1
+        return record
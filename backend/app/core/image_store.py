@@ -0,0 +1,125 @@
+import os
+import base64
+import hashlib
+import struct
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 默认的图片存储目录
+DEFAULT_IMAGE_DIR = Path(os.path.dirname(os.path.abspath(__file__))).parent.parent / "data" / "images"
+# 默认的大体积富文本输出（HTML、图表数据等）存储目录
+DEFAULT_OUTPUT_DIR = Path(os.path.dirname(os.path.abspath(__file__))).parent.parent / "data" / "outputs"
+
+# 文件格式 -> HTTP Content-Type
+MEDIA_TYPES = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "jpg": "image/jpeg",
+    "gif": "image/gif",
+    "svg": "image/svg+xml",
+    "html": "text/html; charset=utf-8",
+    "json": "application/json",
+    "txt": "text/plain; charset=utf-8",
+}
+
+
+def image_dimensions(data: bytes, image_format: str) -> Tuple[Optional[int], Optional[int]]:
+    """从图片头部读取宽高，无法识别时返回(None, None)"""
+    try:
+        if image_format == "png" and data[:8] == b"\x89PNG\r\n\x1a\n":
+            # IHDR块紧跟在文件签名之后
+            width, height = struct.unpack(">II", data[16:24])
+            return width, height
+        if image_format in ("jpeg", "jpg") and data[:2] == b"\xff\xd8":
+            # 查找SOF段，其中记录了图片尺寸
+            pos = 2
+            while pos + 9 < len(data):
+                if data[pos] != 0xFF:
+                    break
+                marker = data[pos + 1]
+                length = struct.unpack(">H", data[pos + 2:pos + 4])[0]
+                if marker in (0xC0, 0xC1, 0xC2):
+                    height, width = struct.unpack(">HH", data[pos + 5:pos + 9])
+                    return width, height
+                pos += 2 + length
+    except struct.error:
+        pass
+    return None, None
+
+
+class ImageStore:
+    """按内容寻址的图片存储
+
+    图片只解码一次，以内容的SHA-256作为ID写入磁盘，相同的图表只保存一份。
+    执行记录和WebSocket消息中只保存图片ID、URL和尺寸，图片本身通过HTTP接口获取。
+    超过内联大小的HTML等富文本输出也使用同样的方式存储在单独的目录中。
+    """
+
+    def __init__(self, storage_dir: Optional[str] = None, url_prefix: str = "/api/images"):
+        """初始化图片存储
+
+        Args:
+            storage_dir: 存储目录，为None时使用 data/images
+            url_prefix: 图片HTTP接口的路径前缀
+        """
+        self.storage_dir = Path(storage_dir) if storage_dir else DEFAULT_IMAGE_DIR
+        self.url_prefix = url_prefix
+
+    def put(self, data: bytes, image_format: str = "png") -> Dict[str, Any]:
+        """保存图片，已存在相同内容时直接复用
+
+        Args:
+            data: 图片的二进制内容
+            image_format: 图片格式
+
+        Returns:
+            Dict: 图片信息，包含id、format、width、height、size和url
+        """
+        image_id = hashlib.sha256(data).hexdigest()
+        path = self._path(image_id, image_format)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # 先写临时文件再重命名，避免并发请求读到不完整的图片
+            tmp_path = path.with_suffix(path.suffix + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        width, height = image_dimensions(data, image_format)
+        return {
+            "id": image_id,
+            "format": image_format,
+            "width": width,
+            "height": height,
+            "size": len(data),
+            "url": f"{self.url_prefix}/{image_id}",
+        }
+
+    def put_base64(self, data: str, image_format: str = "png") -> Dict[str, Any]:
+        """保存base64编码的图片"""
+        return self.put(base64.b64decode(data), image_format)
+
+    def find(self, image_id: str) -> Optional[Path]:
+        """查找图片文件，不存在时返回None"""
+        # ID只能是十六进制字符，防止路径穿越
+        if len(image_id) != 64 or any(c not in "0123456789abcdef" for c in image_id):
+            return None
+        for image_format in MEDIA_TYPES:
+            path = self._path(image_id, image_format)
+            if path.exists():
+                return path
+        return None
+
+    def read_base64(self, image_id: str) -> Optional[str]:
+        """读取图片并编码为base64，用于发送给视觉模型"""
+        path = self.find(image_id)
+        if path is None:
+            return None
+        with open(path, "rb") as f:
+            return base64.b64encode(f.read()).decode("ascii")
+
+    def _path(self, image_id: str, image_format: str) -> Path:
+        # 按ID前两位分目录，避免单个目录下文件过多
+        return self.storage_dir / image_id[:2] / f"{image_id}.{image_format}"
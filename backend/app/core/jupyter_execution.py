@@ -1,376 +1,1261 @@
-import asyncio
-import uuid
-import sys
-import traceback
-from typing import Dict, Any, Optional, Callable, List
-import time
-import os
-from queue import Empty  # 添加导入
-from jupyter_client.asynchronous import AsyncKernelClient
-from jupyter_client import AsyncKernelManager
-from app.utils.logger import get_logger
-import re
-logger = get_logger(__name__)
-
-class JupyterExecutionEngine:
-    """基于Jupyter内核的代码执行引擎，负责安全地执行用户代码"""
-
-    def __init__(self):
-        self.executions: Dict[str, Dict[str, Any]] = {}
-        self.output_callbacks: Dict[str, Callable] = {}
-        self.environments: Dict[str, Dict[str, Any]] = {}  # 会话环境存储
-        # 修改为单个全局内核
-        self.kernel_manager: Optional[AsyncKernelManager] = None
-        self.kernel_client: Optional[AsyncKernelClient] = None
-        self.execution_tasks: Dict[str, asyncio.Task] = {}  # 存储执行任务
-        self.setup_code="""
-import matplotlib.pyplot as plt
-plt.rcParams['font.sans-serif'] = ['SimHei']  # 设置默认字体为 SimHei（黑体）
-plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
-import warnings
-# 忽略所有警告
-warnings.filterwarnings("ignore")"""   
-
-    async def create_kernel(self, conversation_id: str) -> None:
-        """创建全局Jupyter内核"""
-        # 如果内核已存在，直接返回
-        if self.kernel_manager is not None:
-            return
-
-        try:
-            km = AsyncKernelManager(kernel_name='python3')
-            await km.start_kernel()
-            client = km.client()
-            client.start_channels()
-
-            # 新增：验证内核准备就绪
-            await client.wait_for_ready(timeout=10)
-  
-            client.execute(self.setup_code)#避免出现字体错误
-
-            # 保存全局内核引用
-            self.kernel_manager = km
-            self.kernel_client = client
-
-        except Exception as e:
-            logger.error(f"创建内核失败: {str(e)}")
-            # 尝试使用默认内核
-            try:
-                km = AsyncKernelManager()
-                await km.start_kernel()
-                client = km.client()
-                client.start_channels()
-
-                client.execute(self.setup_code)
-
-                # 保存全局内核引用
-                self.kernel_manager = km
-                self.kernel_client = client
-
-            except Exception as e:
-                logger.error(f"使用默认内核也失败: {str(e)}")
-                raise e
-
-    async def execute_code(self, code: str, execution_id: str, conversation_id: str, workspace: Optional[str] = None) -> str:
-        """执行代码并返回执行ID
-
-        Args:
-            code: 要执行的代码
-            execution_id: 执行ID，如果为None则自动生成
-            conversation_id: 关联的对话ID
-            workspace: 工作目录
-
-        Returns:
-            execution_id: 执行ID
-        """
-        if not execution_id:
-            execution_id = str(uuid.uuid4())
-
-        # 确保会话有对应的内核
-        await self.create_kernel(conversation_id)
-
-        # 创建执行记录
-        self.executions[execution_id] = {
-            "status": "pending",
-            "code": code,
-            "conversation_id": conversation_id,
-            "start_time": None,
-            "end_time": None,
-            "output": [],
-            "error": None,
-            "images": [],  # 存储生成的图片
-            "execution_count": None,  # 记录执行计数
-            "is_executing": False  # 标记是否正在执行
-        }
-
-        # 创建异步执行任务并存储
-        task = asyncio.create_task(self._execute_code_async(code, execution_id, workspace, conversation_id))
-        self.execution_tasks[execution_id] = task
-        
-        return execution_id
-
-    async def _execute_code_async(self, code: str, execution_id: str, workspace: Optional[str], conversation_id: str):
-        """异步执行代码"""
-        original_cwd = os.getcwd()
-        msg_id = None  # 用于跟踪当前执行的消息ID
-
-        try:
-            kernel = self.kernel_manager
-            client = self.kernel_client
-            setup_code = ""
-
-            # 更新状态为运行中
-            self.executions[execution_id]["status"] = "running"
-
-            # 切换工作目录
-            if workspace:
-                os.chdir(workspace)
-                # 设置内核的工作目录
-                setup_code += f"\nimport os\nos.chdir('{workspace.replace('\\', '/')}')\n"
-                logger.info(f"设置工作目录: {setup_code}")
-
-            # 发送代码到内核执行
-            self.executions[execution_id]["is_executing"] = True
-            msg_id = client.execute(setup_code + code)
-            logger.info(f"代码执行msg_id={msg_id}")
-
-            # 处理执行结果
-            execution_started = False
-
-            while True:
-                try:
-                    msg = await client.get_iopub_msg(timeout=1.0)
-        
-                    # 关键修复：验证消息属于当前执行
-                    parent_header = msg.get('parent_header', {})
-                    current_msg_id = parent_header.get('msg_id')
-                    if current_msg_id != msg_id:
-                        logger.debug("跳过非当前执行的消息")
-                        continue
-
-                    logger.debug(f"接收到消息: {msg['header']['msg_type']}")
-                    msg_type = msg['header']['msg_type']
-                    content = msg['content']
-
-                    if msg_type == 'execute_input':
-                        execution_started = True
-                        self.executions[execution_id]["start_time"] = time.time()
-                        self.executions[execution_id]["execution_count"] = content.get('execution_count')
-
-                    elif msg_type == 'stream':
-                        # 处理标准输出/错误
-                        stream_name = content['name']  # stdout或stderr
-                        text = content['text']
-                        await self._add_output(execution_id, text, stream_name)
-
-                    elif msg_type == 'display_data' or msg_type == 'execute_result':
-                        # 处理富文本输出（包括图片）
-                        data = content['data']
-                        if 'image/png' in data:
-                            # 保存图片数据
-                            self.executions[execution_id]['images'].append({
-                                'data': data['image/png'],
-                                'format': 'png'
-                            })
-                        elif 'text/plain' in data:
-                            await self._add_output(execution_id, data['text/plain'], 'output')
-
-                    elif msg_type == 'error':
-                        # 处理错误信息
-                        error_msg = '\n'.join(content['traceback'])
-                        await self._add_output(execution_id, error_msg, 'error')
-                        self.executions[execution_id]['status'] = 'error'
-                        self.executions[execution_id]['error'] = error_msg
-                        self.executions[execution_id]['is_executing'] = False
-
-                    elif msg_type == 'status' and content['execution_state'] == 'idle':
-                        # 只有在执行已经开始后，idle状态才表示执行完成
-                        if execution_started:
-                            if self.executions[execution_id]['status'] != 'error':
-                                self.executions[execution_id]['status'] = 'completed'
-                            self.executions[execution_id]['is_executing'] = False
-                            logger.info(f"代码执行完成: {execution_id}")
-                            break
-
-                except Empty:
-                    # 处理队列空的情况
-                    if execution_started and not self.executions[execution_id]['is_executing']:
-                        logger.info(f"执行已完成，退出监听循环: {execution_id}")
-                        break
-                    logger.debug("IOPub通道无新消息，继续等待...")
-                    continue
-                except asyncio.TimeoutError:
-                    # 超时处理
-                    if execution_started and not self.executions[execution_id]['is_executing']:
-                        logger.info(f"执行可能已完成，退出循环")
-                        break
-                    continue
-                except Exception as e:
-                    logger.error(f"处理消息出错: {str(e)}")
-                    self.executions[execution_id]['status'] = 'error'
-                    self.executions[execution_id]['error'] = str(e)
-                    break
-
-            self.executions[execution_id]['end_time'] = time.time()
-
-        except Exception as e:
-            logger.error(f"执行异常: {str(e)}")
-            self.executions[execution_id]['status'] = 'error'
-            self.executions[execution_id]['error'] = f"执行异常: {str(e)}"
-            self.executions[execution_id]['end_time'] = time.time()
-            self.executions[execution_id]['is_executing'] = False
-            raise e
-
-        finally:
-            if workspace:
-                os.chdir(original_cwd)
-
-    async def _add_output(self, execution_id: str, output: str, output_type: str = 'stdout'):
-        """添加执行输出"""
-        if execution_id in self.executions:
-            # 添加ANSI转义码过滤
-            filtered_output = re.sub(r'\x1B\[[0-?]*[ -/]*[@-~]', '', output)
-            output_item = {
-                'type': output_type,
-                'content': filtered_output,
-                'timestamp': time.time()
-            }
-            self.executions[execution_id]['output'].append(output_item)
-
-            # 调用回调函数（如果有）
-            if execution_id in self.output_callbacks:
-                await self.output_callbacks[execution_id](output_item)
-
-    async def cancel_execution(self, execution_id: str) -> bool:
-        """取消代码执行
-
-        Args:
-            execution_id: 执行ID
-
-        Returns:
-            bool: 是否成功取消
-        """
-        if execution_id not in self.executions:
-            logger.warning(f"尝试取消不存在的执行: {execution_id}")
-            return False
-
-        execution = self.executions[execution_id]
-        if execution['status'] not in ['running', 'pending']:
-            logger.info(f"尝试取消非运行状态的执行: {execution_id}, 当前状态: {execution['status']}")
-            return False
-
-        # 中断内核执行
-        try:
-            if self.kernel_client:
-                logger.info(f"正在中断内核执行: {execution_id}")
-                await self.kernel_client.interrupt_kernel()
-        except Exception as e:
-            logger.error(f"中断内核执行时出错: {str(e)}")
-
-        # 取消执行任务
-        if execution_id in self.execution_tasks:
-            task = self.execution_tasks[execution_id]
-            if not task.done():
-                logger.info(f"正在取消执行任务: {execution_id}")
-                task.cancel()
-                try:
-                    # 等待任务取消完成
-                    await asyncio.wait_for(asyncio.shield(task), timeout=2.0)
-                except (asyncio.CancelledError, asyncio.TimeoutError):
-                    pass
-
-        # 更新状态为取消
-        execution['status'] = 'cancelled'
-        execution['end_time'] = time.time()
-        execution['is_executing'] = False
-
-        # 添加取消消息到输出
-        await self._add_output(execution_id, '执行已取消', 'system')
-        logger.info(f"执行已成功取消: {execution_id}")
-
-        return True
-
-    def get_execution_status(self, execution_id: str) -> Optional[Dict[str, Any]]:
-        """获取执行状态
-
-        Args:
-            execution_id: 执行ID
-
-        Returns:
-            Dict: 执行状态信息，如果不存在则返回None
-        """
-        if execution_id not in self.executions:
-            return None
-
-        execution = self.executions[execution_id]
-
-        # 创建状态副本，不包含不需要的字段
-        status = execution.copy()
-        if 'is_executing' in status:
-            del status['is_executing']
-
-        return status
-
-    def register_output_callback(self, execution_id: str, callback: Callable):
-        """注册输出回调函数
-
-        Args:
-            execution_id: 执行ID
-            callback: 回调函数，接收输出项作为参数
-        """
-        self.output_callbacks[execution_id] = callback
-
-    def unregister_output_callback(self, execution_id: str):
-        """注销输出回调函数
-
-        Args:
-            execution_id: 执行ID
-        """
-        if execution_id in self.output_callbacks:
-            del self.output_callbacks[execution_id]
-
-    async def cleanup(self):
-        """清理所有内核资源"""
-        # 等待所有执行任务完成或取消
-        if self.execution_tasks:
-            logger.info(f"等待 {len(self.execution_tasks)} 个执行任务完成...")
-            pending_tasks = [task for task in self.execution_tasks.values() if not task.done()]
-            
-            if pending_tasks:
-                # 等待所有任务完成，或设置超时
-                try:
-                    await asyncio.wait(pending_tasks, timeout=5.0)
-                except asyncio.TimeoutError:
-                    # 超时后取消剩余任务
-                    for task in pending_tasks:
-                        if not task.done():
-                            task.cancel()
-                    
-                    # 等待取消操作完成
-                    if pending_tasks:
-                        await asyncio.wait(pending_tasks, timeout=2.0)
-            
-            logger.info("所有执行任务已处理完毕")
-        
-        # 关闭内核资源
-        if self.kernel_client:
-            self.kernel_client.shutdown()
-        if self.kernel_manager:
-            await self.kernel_manager.shutdown_kernel(now=True)
-        self.kernel_client = None
-        self.kernel_manager = None
-
-# 创建全局执行引擎实例
-jupyter_execution_engine = JupyterExecutionEngine()
-
-if __name__ == "__main__":
-    if sys.platform == 'win32':
-        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-
-    async def main():
-        await jupyter_execution_engine.create_kernel("test")
-        await jupyter_execution_engine.execute_code("print('hello')", "a", "b", "D:/")
-        await jupyter_execution_engine.cleanup()
-
-    # 使用 asyncio.run 运行主函数
+import asyncio
+import uuid
+import sys
+import traceback
+import textwrap
+from typing import Dict, Any, Optional, Callable, List, AsyncIterator
+import time
+import os
+import json
+import shutil
+from collections import deque
+from pathlib import Path
+from jupyter_client.asynchronous import AsyncKernelClient
+from jupyter_client import AsyncKernelManager
+from app.utils.logger import get_logger
+from app.config import get_settings
+from app.schemas.config import ExecutionConfig
+from app.core.kernel_pool import KernelPool, kernel_exit_status
+from app.core.execution_store import ExecutionStore
+from app.core.image_store import ImageStore, DEFAULT_OUTPUT_DIR
+from app.core.rich_output import build_rich_output
+from app.core import kernel_runtime
+from app.core.output_buffer import OutputCoalescer, OutputLimiter
+from app.core.cell_cache import CellCache
+from app.core.zygote import Zygote, ZygoteProvisioner, kernel_python
+from app.core.remote_kernels import KernelPlacement, LocalWorkerCluster, RemoteProvisioner
+import re
+logger = get_logger(__name__)
+
+# ANSI转义码
+ANSI_ESCAPE = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
+# 默认的检查点目录
+DEFAULT_CHECKPOINT_DIR = Path(os.path.dirname(os.path.abspath(__file__))).parent.parent / "data" / "checkpoints"
+
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.2f}GB"
+
+
+def format_memory_warning(report: Dict[str, Any], soft_limit: int, hard_limit: Optional[int]) -> str:
+    """根据内核端的内存报告生成给智能体的提醒"""
+    rss = report["rss"]
+    if hard_limit and rss >= hard_limit:
+        lines = [f"内核内存占用{_format_bytes(rss)}，已超过硬限制{_format_bytes(hard_limit)}，继续增长可能导致内核被系统终止、变量全部丢失。"]
+    else:
+        lines = [f"内核内存占用{_format_bytes(rss)}，已超过软限制{_format_bytes(soft_limit)}。"]
+    if report["largest"]:
+        lines.append("占用内存最多的变量：")
+        for item in report["largest"]:
+            shape = f"，形状{tuple(item['shape'])}" if item.get("shape") else ""
+            lines.append(f"- {item['name']}（{item['type']}{shape}）：{_format_bytes(item['bytes'])}")
+    if report.get("spilled"):
+        names = "、".join(item["name"] for item in report["spilled"])
+        freed = sum(item["bytes"] for item in report["spilled"])
+        lines.append(f"已把最近未使用的DataFrame {names}（共{_format_bytes(freed)}）写入磁盘，代码中再次使用时会自动加载。")
+    lines.append("请用del删除不再需要的变量，读取数据时只选择需要的列（usecols）或分块处理（chunksize）。")
+    return "\n".join(lines)
+
+
+def _link_or_copy(src: str, dst: str):
+    """优先创建硬链接，不支持时（例如跨文件系统）复制文件"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+def _skip_reason(index: int, status: str) -> str:
+    """批量执行中第index段代码以status结束后，之后的代码未执行的原因"""
+    cause = {
+        "timeout": "执行超时",
+        "cancelled": "被取消",
+        "oom": "内存不足",
+    }.get(status, "执行出错")
+    return f"第{index + 1}段代码{cause}，本段代码未执行"
+
+
+class JupyterExecutionEngine:
+    """基于Jupyter内核的代码执行引擎，负责安全地执行用户代码"""
+
+    engine_name = "jupyter"
+    # 内核管理器类，子类可以替换为其他实现相同接口的内核
+    kernel_manager_class = AsyncKernelManager
+    # 内核中显示matplotlib图表的方式
+    matplotlib_setup = "%matplotlib inline"
+
+    def __init__(self, config: Optional[ExecutionConfig] = None):
+        self.config = config or get_settings().execution
+        # 有界的执行记录存储，已结束的旧记录会写入磁盘并按需加载
+        self.executions = ExecutionStore(
+            storage_dir=self.config.execution_store_dir,
+            max_records=self.config.max_execution_records,
+            max_memory_mb=self.config.max_execution_memory_mb,
+            ttl=self.config.execution_record_ttl
+        )
+        # 按内容寻址的图片存储，执行记录中只保存图片ID、URL和尺寸
+        self.image_store = ImageStore(self.config.image_store_dir)
+        # 超过内联大小的HTML等富文本输出单独存储
+        self.output_store = ImageStore(self.config.output_store_dir or DEFAULT_OUTPUT_DIR, url_prefix="/api/outputs")
+        self.output_callbacks: Dict[str, Callable] = {}
+        self.environments: Dict[str, Dict[str, Any]] = {}  # 会话环境存储
+        self.execution_tasks: Dict[str, asyncio.Task] = {}  # 存储执行任务
+        self.completion_events: Dict[str, asyncio.Event] = {}  # 执行完成事件
+        self.output_streams: Dict[str, List[asyncio.Queue]] = {}  # 输出迭代器的订阅队列
+        self.output_limiters: Dict[str, OutputLimiter] = {}  # 每次执行的输出大小限制
+        self.execution_batches: Dict[str, List[str]] = {}  # 批量执行中每段代码所属批次的全部执行ID
+        # 自包含代码的执行结果缓存，相同代码在读取的文件未变化时直接重放输出
+        self.cell_cache = CellCache(max_entries=self.config.memoize_max_entries)
+        # 内核变量的检查点，每个对话一个子目录
+        self.checkpoint_dir = Path(self.config.checkpoint_dir or DEFAULT_CHECKPOINT_DIR)
+        self.checkpoint_tasks: Dict[str, asyncio.Task] = {}
+        self._checkpoint_dirty: set = set()  # 保存检查点期间又有代码执行成功的对话
+        # 回收长时间空闲的内核
+        self._cull_task: Optional[asyncio.Task] = None
+        self.culled_count = 0
+        self.reclaimed_bytes = 0
+        self.spilled_records = 0
+        self.recent_culls: deque = deque(maxlen=20)
+        # 合并stream输出，按时间窗口或字节阈值批量写入记录和广播
+        self.output_coalescer = OutputCoalescer(
+            self._add_output,
+            flush_interval=self.config.output_flush_interval,
+            max_bytes=self.config.output_flush_bytes
+        )
+        self.setup_code=f"""
+{self.matplotlib_setup}
+import warnings
+# 忽略所有警告
+warnings.filterwarnings("ignore")
+import matplotlib.pyplot as plt
+from matplotlib import font_manager
+plt.rcParams['font.sans-serif'] = ['SimHei']  # 设置默认字体为 SimHei（黑体）
+plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+font_manager.findfont('SimHei')  # 预先构建字体缓存
+# 预先导入常用的数据分析库，使第一次import无需等待
+import importlib
+for _module in {self.config.preload_modules!r}:
+    try:
+        importlib.import_module(_module)
+    except ImportError:
+        pass
+# DataFrame额外输出表格结构化数据，返回给智能体时比文本表示更紧凑
+try:
+    import pandas as _pd
+    _pd.set_option('display.html.table_schema', True)
+except ImportError:
+    pass
+# Plotly图表以MIME数据输出，由服务端生成界面所需的页面
+import os as _os
+_os.environ.setdefault('PLOTLY_RENDERER', 'plotly_mimetype')
+{self._runtime_setup_code()}"""
+        self._configure_launchers()
+        # 按对话ID划分的内核池，每个对话使用独立的内核
+        self.kernel_pool = KernelPool(
+            max_size=self.config.max_kernels,
+            setup_code=self.setup_code,
+            spare_size=self.config.spare_kernels,
+            cpu_time_limit=self.config.kernel_cpu_time_limit,
+            memory_limit_mb=self.config.kernel_memory_limit_mb,
+            health_check_interval=self.config.health_check_interval,
+            replay_on_restart=self.config.replay_on_restart,
+            replay_max_cells=self.config.replay_max_cells,
+            # 原本在执行时间上限内完成的代码，重放时使用同样的上限
+            replay_timeout=self.config.execution_timeout or 120,
+            restore_code=self._restore_code,
+            provisioner_factory=self._make_provisioner if self.placement is not None or self.zygote is not None else None,
+            kernel_manager_class=self.kernel_manager_class,
+            before_evict=self._checkpoint_before_shutdown
+        )
+
+    def _configure_launchers(self):
+        """根据配置选择内核的启动方式：工作节点、孵化进程或直接启动子进程"""
+        # 预先导入常用库的内核孵化进程，新内核由它fork产生
+        self.zygote = None
+        # 内核工作节点，配置后内核按负载分配到各节点上运行
+        self.placement = None
+        self.local_workers = None
+        if self.config.kernel_workers:
+            self.placement = KernelPlacement(self.config.kernel_workers, self.config.kernel_worker_token)
+        elif self.config.local_kernel_workers > 0:
+            self.local_workers = LocalWorkerCluster(self.config.local_kernel_workers, kernel_python())
+            self.placement = KernelPlacement(token=self.local_workers.token)
+        if self.placement is not None and self.config.kernel_zygote:
+            logger.warning("已配置内核工作节点，内核孵化进程未启用")
+        elif self.config.kernel_zygote:
+            if Zygote.supported():
+                self.zygote = Zygote(kernel_python(), preload_modules=["IPython", "matplotlib"] + self.config.preload_modules)
+            else:
+                logger.warning("当前系统不支持fork，内核孵化进程未启用")
+
+    def _runtime_setup_code(self) -> str:
+        """把内核端运行时注入为autoanalyze模块并注册钩子的代码"""
+        with open(kernel_runtime.__file__, 'r', encoding='utf-8') as f:
+            source = f.read()
+        return f"""import sys as _sys, types as _types
+_runtime = _types.ModuleType('autoanalyze')
+exec(compile({source!r}, 'autoanalyze', 'exec'), _runtime.__dict__)
+_sys.modules['autoanalyze'] = _runtime
+_runtime.install(get_ipython(), profile={self.config.profile_cells!r}, watch_memory={self.config.memory_soft_limit_mb is not None!r},
+                 data_cache_dir={self.config.data_cache_dir!r}, data_mirror={self.config.data_mirror!r},
+                 data_cache_bytes={self.config.data_cache_max_mb * 1024 * 1024!r}, optimize={self._optimize_options()!r})
+del _sys, _types, _runtime"""
+
+    def _optimize_options(self) -> Optional[Dict[str, Any]]:
+        """内核端DataFrameOptimizer的参数，未启用时为None"""
+        if not self.config.optimize_dataframes:
+            return None
+        return {
+            "min_bytes": int(self.config.optimize_min_mb * 1024 * 1024),
+            "category_ratio": self.config.optimize_category_ratio,
+            "category_min_rows": self.config.optimize_category_min_rows,
+            "parse_dates": self.config.optimize_parse_dates,
+            "downcast_floats": self.config.optimize_float32,
+            "downcast_ints": self.config.optimize_int32,
+        }
+
+    def _make_provisioner(self, km):
+        """为内核池创建内核供应器：配置了工作节点时在节点上启动内核，否则由孵化进程fork"""
+        if self.placement is not None:
+            provisioner = RemoteProvisioner(kernel_id=km.kernel_id, kernel_spec=km.kernel_spec, parent=km)
+            provisioner.placement = self.placement
+        else:
+            provisioner = ZygoteProvisioner(kernel_id=km.kernel_id, kernel_spec=km.kernel_spec, parent=km)
+            provisioner.zygote = self.zygote
+        provisioner.limits = (self.config.kernel_cpu_time_limit, self.config.kernel_memory_limit_mb)
+        return provisioner
+
+    async def start(self):
+        """启动执行引擎的后台任务，预先启动备用内核"""
+        if self.local_workers is not None:
+            try:
+                await self.local_workers.start()
+                for address in self.local_workers.addresses:
+                    self.placement.add_worker(address)
+            except Exception as e:
+                logger.error(f"启动本地内核工作节点失败，改为直接启动内核: {str(e)}")
+                self.placement = self.local_workers = None
+                self.kernel_pool.provisioner_factory = None
+        if self.zygote is not None:
+            try:
+                await self.zygote.start()
+            except Exception as e:
+                logger.error(f"启动内核孵化进程失败，改为直接启动内核: {str(e)}")
+                self.zygote = self.kernel_pool.provisioner_factory = None
+        self.kernel_pool.start()
+        if self.config.kernel_idle_timeout and (self._cull_task is None or self._cull_task.done()):
+            self._cull_task = asyncio.create_task(self._cull_loop())
+
+    async def create_kernel(self, conversation_id: str, workspace: Optional[str] = None) -> Dict[str, Any]:
+        """获取对话对应的Jupyter内核，不存在时创建
+
+        Args:
+            conversation_id: 对话ID
+            workspace: 内核的工作目录，新内核直接在该目录启动，已有内核在目录变化时切换
+
+        Returns:
+            Dict: 内核条目，包含kernel_manager和kernel_client
+        """
+        return await self.kernel_pool.acquire(conversation_id, workspace)
+
+    async def execute_code(self, code: str, execution_id: str, conversation_id: str, workspace: Optional[str] = None,
+                           timeout: Optional[float] = None) -> str:
+        """执行代码并返回执行ID
+
+        Args:
+            code: 要执行的代码
+            execution_id: 执行ID，如果为None则自动生成
+            conversation_id: 关联的对话ID
+            workspace: 工作目录
+            timeout: 最长执行时间（秒），为None时使用配置中的execution_timeout，为0表示不限制
+
+        Returns:
+            execution_id: 执行ID
+        """
+        if not execution_id:
+            execution_id = str(uuid.uuid4())
+
+        # 确保会话有对应的内核，并标记为执行中，避免被内核池回收
+        kernel = await self.create_kernel(conversation_id, workspace)
+        kernel["running"] += 1
+
+        cell, cached = None, None
+        if self.config.memoize_cells:
+            cell, cached = self.cell_cache.lookup(code, kernel["workspace"])
+        self._create_execution(execution_id, code, conversation_id, cached is not None)
+
+        # 创建异步执行任务并存储
+        if timeout is None:
+            timeout = self.config.execution_timeout
+        if cached is not None:
+            task = asyncio.create_task(self._replay_cached(execution_id, kernel, cached))
+        else:
+            task = asyncio.create_task(self._execute_code_async(code, execution_id, kernel, timeout, cell))
+        self.execution_tasks[execution_id] = task
+        task.add_done_callback(lambda _: self.execution_tasks.pop(execution_id, None))
+
+        return execution_id
+
+    async def execute_batch(self, codes: List[str], conversation_id: str, workspace: Optional[str] = None,
+                            timeout: Optional[float] = None, execution_ids: Optional[List[str]] = None) -> List[str]:
+        """在同一内核中依次执行多段代码，返回每段代码的执行ID
+
+        所有代码的执行请求连续发送到内核，不等待前一段执行结束。某段代码出错、超时或被取消后，
+        内核中止之后排队的请求，这些代码的状态为skipped。每段代码有独立的执行记录和输出，
+        不使用执行结果缓存。
+
+        Args:
+            codes: 要执行的代码列表
+            conversation_id: 关联的对话ID
+            workspace: 工作目录
+            timeout: 每段代码的最长执行时间（秒），为None时使用配置中的execution_timeout，为0表示不限制
+            execution_ids: 每段代码的执行ID，为None时自动生成
+        """
+        execution_ids = list(execution_ids or [str(uuid.uuid4()) for _ in codes])
+        if len(execution_ids) != len(codes):
+            raise ValueError("执行ID的数量与代码段数不一致")
+
+        kernel = await self.create_kernel(conversation_id, workspace)
+        kernel["running"] += len(codes)
+        for code, execution_id in zip(codes, execution_ids):
+            self._create_execution(execution_id, code, conversation_id)
+            self.execution_batches[execution_id] = execution_ids
+
+        if timeout is None:
+            timeout = self.config.execution_timeout
+        task = asyncio.create_task(self._execute_batch_async(codes, execution_ids, kernel, timeout))
+        for execution_id in execution_ids:
+            self.execution_tasks[execution_id] = task
+            task.add_done_callback(lambda _, execution_id=execution_id: self.execution_tasks.pop(execution_id, None))
+        return execution_ids
+
+    def _create_execution(self, execution_id: str, code: str, conversation_id: str, cached: bool = False):
+        """创建执行记录、完成事件和输出大小限制"""
+        self.executions[execution_id] = {
+            "status": "pending",
+            "code": code,
+            "conversation_id": conversation_id,
+            "start_time": None,
+            "end_time": None,
+            "output": [],
+            "error": None,
+            "images": [],  # 生成的图片信息（ID、URL和尺寸）
+            "execution_count": None,  # 记录执行计数
+            "profile": None,  # 内核端统计的耗时、CPU时间和内存信息
+            "cached": cached,  # 是否直接重放了缓存的结果
+            "is_executing": False  # 标记是否正在执行
+        }
+        self.completion_events[execution_id] = asyncio.Event()
+        self.output_limiters[execution_id] = OutputLimiter(
+            spill_path=str(self.executions.storage_dir / execution_id / "full_output.txt"),
+            max_bytes=self.config.max_output_bytes,
+            max_lines=self.config.max_output_lines,
+            tail_lines=self.config.output_tail_lines,
+            tail_bytes=self.config.output_tail_bytes
+        )
+
+    async def _execute_batch_async(self, codes: List[str], execution_ids: List[str], kernel: Dict[str, Any],
+                                   timeout: Optional[float] = None):
+        """连续发送一批代码的执行请求，再按顺序处理每段代码的输出"""
+        requests = []
+        try:
+            await kernel["ready"].wait()
+            client = kernel["kernel_client"]
+            for code in codes:
+                # 出错时内核中止之后已排队的请求
+                msg_id = client.execute(code, stop_on_error=True)
+                requests.append((msg_id, kernel["dispatcher"].subscribe(msg_id), time.time()))
+            logger.info(f"批量发送{len(codes)}段代码: {execution_ids}")
+
+            skip_reason = None
+            for index, (code, execution_id, request) in enumerate(zip(codes, execution_ids, requests)):
+                try:
+                    # 内存查询会排在已发送的代码之后，只在最后一段代码结束后检查
+                    await self._execute_code_async(code, execution_id, kernel, timeout, request=request,
+                                                   skip_reason=skip_reason, check_memory=index == len(codes) - 1)
+                except Exception:
+                    # 已记录在执行记录中，继续处理之后的代码
+                    pass
+                status = self.executions[execution_id]["status"]
+                if skip_reason is None and status != "completed":
+                    skip_reason = _skip_reason(index, status)
+        finally:
+            unfinished = [index for index, execution_id in enumerate(execution_ids)
+                          if index < len(requests) and execution_id in self.output_limiters]
+            if unfinished:
+                # 批量执行被取消时等待内核中止剩余的请求，之后的执行请求不会被一并中止
+                await self._wait_for_idle(requests[unfinished[-1]][1], self.config.interrupt_grace_period)
+            for index, execution_id in enumerate(execution_ids):
+                self.execution_batches.pop(execution_id, None)
+                if execution_id not in self.output_limiters:
+                    continue
+                # 批量执行被取消或发送失败时，之后的代码没有处理
+                if index < len(requests):
+                    kernel["dispatcher"].unsubscribe(requests[index][0])
+                self.output_limiters.pop(execution_id, None)
+                execution = self.executions[execution_id]
+                if execution["status"] != "cancelled":
+                    execution["status"] = "skipped"
+                    execution["error"] = "批量执行已终止，本段代码未执行"
+                    execution["end_time"] = time.time()
+                    execution["is_executing"] = False
+                    self._finish_execution(execution_id)
+                self._update_kernel_stats(kernel, execution_id)
+
+    async def _execute_code_async(self, code: str, execution_id: str, kernel: Dict[str, Any],
+                                  timeout: Optional[float] = None, cell: Optional[Dict[str, Any]] = None,
+                                  request: Optional[tuple] = None, skip_reason: Optional[str] = None,
+                                  check_memory: bool = True):
+        """在指定内核中异步执行代码，cell为可缓存代码的信息，执行成功后保存结果
+
+        批量执行时request为已发送的执行请求（msg_id、订阅队列和发送时间），skip_reason为同一批中前面的代码出错、
+        超时或被取消时本段代码未执行的原因；
+        check_memory为False时执行成功后不检查内存（之后还有排队的代码），出错时之后的请求被内核中止，仍然检查
+        """
+        msg_id = None  # 用于跟踪当前执行的消息ID
+
+        try:
+            # 内核正在重启时等待重启完成
+            await kernel["ready"].wait()
+            client = kernel["kernel_client"]
+
+            # 更新状态为运行中
+            self.executions[execution_id]["status"] = "running"
+
+            # 发送代码到内核执行，并立即订阅该执行的IOPub消息
+            self.executions[execution_id]["is_executing"] = True
+            if request is None:
+                # 单次执行出错时不让内核中止之后排队的请求
+                msg_id = client.execute(code, stop_on_error=False)
+                sent_at = time.time()
+                queue = kernel["dispatcher"].subscribe(msg_id)
+            else:
+                msg_id, queue, sent_at = request
+            logger.info(f"代码执行msg_id={msg_id}")
+
+            # 处理执行结果
+            execution_started = False
+            deadline = time.monotonic() + timeout if timeout else None
+
+            while True:
+                try:
+                    remaining = None if deadline is None else max(0, deadline - time.monotonic())
+                    msg = await asyncio.wait_for(queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    await self._handle_timeout(execution_id, kernel, queue, timeout)
+                    break
+                if msg is None and skip_reason and not execution_started:
+                    # 前面的代码超时后内核被重启，本段代码尚未执行
+                    await self._skip_execution(execution_id, skip_reason)
+                    break
+                if msg is None:
+                    # 内核被重启或关闭，以内核池记录的原因结束本次执行
+                    failure = kernel.get("failure") or {"status": "error", "message": "内核IOPub通道已断开"}
+                    await self.output_coalescer.flush(execution_id)
+                    self.executions[execution_id]['status'] = failure["status"]
+                    self.executions[execution_id]['error'] = failure["message"]
+                    self.executions[execution_id]['is_executing'] = False
+                    await self._add_output(execution_id, f"{failure['message']}，本次执行已终止", 'system')
+                    break
+
+                logger.debug(f"接收到消息: {msg['header']['msg_type']}")
+                msg_type = msg['header']['msg_type']
+                content = msg['content']
+                if msg_type != 'stream':
+                    # 其他消息之前先输出缓存的stream内容，保持输出顺序
+                    await self.output_coalescer.flush(execution_id)
+
+                if msg_type == 'execute_input':
+                    execution_started = True
+                    self.executions[execution_id]["start_time"] = time.time()
+                    self.executions[execution_id]["execution_count"] = content.get('execution_count')
+
+                elif msg_type == 'stream':
+                    # 处理标准输出/错误
+                    stream_name = content['name']  # stdout或stderr
+                    text = content['text']
+                    await self.output_coalescer.write(execution_id, text=text, stream_name=stream_name)
+
+                elif msg_type == 'display_data' or msg_type == 'execute_result':
+                    # 处理富文本输出（包括图片）
+                    await self._add_display_data(execution_id, content['data'])
+
+                elif msg_type == 'error':
+                    # 处理错误信息
+                    error_msg = '\n'.join(content['traceback'])
+                    await self._add_output(execution_id, error_msg, 'error')
+                    # 超出内存限制时代码中抛出MemoryError
+                    self.executions[execution_id]['status'] = 'oom' if content.get('ename') == 'MemoryError' else 'error'
+                    self.executions[execution_id]['error'] = error_msg
+                    self.executions[execution_id]['is_executing'] = False
+
+                elif msg_type == 'status' and content['execution_state'] == 'idle':
+                    # 消息已按msg_id分发，本执行的idle即表示执行完成
+                    if not execution_started and skip_reason:
+                        await self._skip_execution(execution_id, skip_reason)
+                    elif not execution_started:
+                        # 没有execute_input说明请求被内核中止（例如前一次执行被中断）
+                        self.executions[execution_id]['status'] = 'error'
+                        self.executions[execution_id]['error'] = "执行请求被内核中止"
+                    elif self.executions[execution_id]['status'] == 'running':
+                        self.executions[execution_id]['status'] = 'completed'
+                        # 记录执行成功的代码，内核重启后可重放恢复状态
+                        self.kernel_pool.record_history(kernel, code, sent_at)
+                    self.executions[execution_id]['is_executing'] = False
+                    logger.info(f"代码执行完成: {execution_id}")
+                    break
+
+            self.executions[execution_id]['end_time'] = time.time()
+
+        except Exception as e:
+            logger.error(f"执行异常: {str(e)}")
+            self.executions[execution_id]['status'] = 'error'
+            self.executions[execution_id]['error'] = f"执行异常: {str(e)}"
+            self.executions[execution_id]['end_time'] = time.time()
+            self.executions[execution_id]['is_executing'] = False
+            raise e
+
+        finally:
+            await self.output_coalescer.close(execution_id)
+            await self._finish_output(execution_id)
+            if msg_id:
+                kernel["dispatcher"].unsubscribe(msg_id)
+            if self.executions[execution_id]['status'] == 'completed':
+                if cell is not None:
+                    self.cell_cache.put(cell, self.executions[execution_id])
+                if self.config.checkpoint_after_cells:
+                    self._schedule_checkpoint(kernel["conversation_id"])
+            status = self.executions[execution_id]['status']
+            if status in ('error', 'oom') or (status == 'completed' and check_memory):
+                await self._check_memory(kernel, execution_id)
+            self._update_kernel_stats(kernel, execution_id)
+            # 被取消的执行由cancel_execution在写入取消信息后再通知完成
+            if self.executions[execution_id]['status'] != 'cancelled':
+                self._finish_execution(execution_id)
+
+    async def _skip_execution(self, execution_id: str, reason: str):
+        """批量执行中前面的代码出错，本段代码的请求被内核中止"""
+        execution = self.executions[execution_id]
+        if execution["status"] == "cancelled":
+            return
+        execution["status"] = "skipped"
+        execution["error"] = reason
+        execution["is_executing"] = False
+        await self._add_output(execution_id, execution["error"], 'system')
+
+    async def _replay_cached(self, execution_id: str, kernel: Dict[str, Any], cached: Dict[str, Any]):
+        """重放缓存的执行结果，只在内核中补执行import语句"""
+        execution = self.executions[execution_id]
+        try:
+            await kernel["ready"].wait()
+            execution["status"] = "running"
+            execution["start_time"] = time.time()
+            logger.info(f"使用缓存的执行结果: {execution_id}")
+            if cached["imports"]:
+                # 代码中导入的模块仍需出现在命名空间中，之后的代码可能会用到
+                imports = "\n".join(
+                    f"try:\n{textwrap.indent(statement, '    ')}\nexcept ImportError:\n    pass"
+                    for statement in cached["imports"]
+                )
+                kernel["kernel_client"].execute(imports, silent=True, store_history=False)
+                self.kernel_pool.record_history(kernel, imports)
+            for item in cached["output"]:
+                await self._publish_output(execution_id, dict(item, timestamp=time.time()))
+            execution["images"] = [dict(image) for image in cached["images"]]
+            if cached["output_truncated"]:
+                execution["output_truncated"] = cached["output_truncated"]
+            execution["status"] = "completed"
+        except Exception as e:
+            logger.error(f"重放缓存结果时出错: {str(e)}")
+            execution["status"] = "error"
+            execution["error"] = f"执行异常: {str(e)}"
+        finally:
+            execution["end_time"] = time.time()
+            execution["is_executing"] = False
+            self._update_kernel_stats(kernel, execution_id)
+            if execution["status"] != "cancelled":
+                self._finish_execution(execution_id)
+
+    async def _handle_timeout(self, execution_id: str, kernel: Dict[str, Any], queue: asyncio.Queue, timeout: float):
+        """执行超时：先中断内核，宽限期内仍未结束则重启内核"""
+        execution = self.executions[execution_id]
+        km = kernel["kernel_manager"]
+        logger.warning(f"代码执行超时: {execution_id}, 超过{timeout}秒")
+        await self.output_coalescer.flush(execution_id)
+
+        status, message = 'timeout', f"执行超过{timeout}秒，已中断"
+        if not await km.is_alive():
+            # 内核进程已退出（例如超出CPU时间或被系统强制终止），只能重启
+            status, message = await kernel_exit_status(km)
+            restart = True
+        else:
+            try:
+                await km.interrupt_kernel()
+            except Exception as e:
+                logger.error(f"中断内核执行时出错: {str(e)}")
+            restart = not await self._wait_for_idle(queue, self.config.interrupt_grace_period)
+            if restart:
+                message = f"执行超过{timeout}秒且中断无效"
+
+        if restart:
+            try:
+                await self.kernel_pool.restart_kernel(execution['conversation_id'], status=status, reason=message)
+                if self.kernel_pool.replay_on_restart:
+                    message += "，已重启内核并重放之前执行成功的代码"
+                else:
+                    message += "，已重启内核，之前定义的变量已丢失"
+            except Exception as e:
+                logger.error(f"重启内核失败: {str(e)}")
+                message += f"，重启内核失败: {str(e)}"
+
+        execution['status'] = status
+        execution['error'] = message
+        execution['is_executing'] = False
+        await self._add_output(execution_id, message, 'system')
+
+    @staticmethod
+    async def _wait_for_idle(queue: asyncio.Queue, timeout: float) -> bool:
+        """等待执行请求的idle消息，期间的其他消息直接丢弃"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                msg = await asyncio.wait_for(queue.get(), timeout=max(0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                return False
+            if msg is None:
+                return False
+            if msg['header']['msg_type'] == 'status' and msg['content']['execution_state'] == 'idle':
+                return True
+
+    async def _check_memory(self, kernel: Dict[str, Any], execution_id: str):
+        """执行结束后检查内核内存，超过限制时在执行记录中写入给智能体的提醒"""
+        soft_limit = self.config.memory_soft_limit_mb
+        if soft_limit is None:
+            return
+        soft_limit *= 1024 * 1024
+        hard_limit = self.config.memory_hard_limit_mb * 1024 * 1024 if self.config.memory_hard_limit_mb else None
+        execution = self.executions[execution_id]
+        rss = (execution.get("profile") or {}).get("rss")
+        if rss is not None and rss < soft_limit:
+            # 内核端统计的内存未超过软限制，无需再查询
+            kernel["rss"] = rss
+            return
+        try:
+            report = await self._query_kernel(
+                kernel,
+                "import autoanalyze\nautoanalyze.memory_report("
+                f"{soft_limit}, {hard_limit}, spill={self.config.memory_spill!r}, "
+                f"spill_dir={self.config.memory_spill_dir!r}, idle_cells={self.config.memory_spill_idle_cells}, "
+                f"top={self.config.memory_report_top})",
+                timeout=self.config.checkpoint_timeout
+            )
+        except Exception as e:
+            logger.error(f"检查内核内存时出错: {str(e)}")
+            return
+        if not report:
+            return
+        kernel["rss"] = report.get("rss_after") or report["rss"]
+        kernel["spilled_variables"] = report.get("spilled_variables", [])
+        if report.get("largest") is not None:
+            execution["memory_warning"] = format_memory_warning(report, soft_limit, hard_limit)
+            logger.warning(f"对话 {kernel['conversation_id']} 的内核内存过高: {report['rss'] / 1024 ** 2:.0f}MB")
+
+    async def find_missing_modules(self, conversation_id: str, modules: List[str],
+                                   workspace: Optional[str] = None) -> List[str]:
+        """检查模块能否在对话的内核环境中导入
+
+        已确认可以导入的模块缓存在内核条目中，只有未知的模块才需要查询内核
+
+        Returns:
+            List[str]: 找不到的模块
+        """
+        kernel = await self.create_kernel(conversation_id, workspace)
+        known = kernel["available_modules"]
+        unknown = [module for module in modules if module not in known]
+        if not unknown:
+            return []
+        missing = await self._query_kernel(kernel, f"import autoanalyze\nautoanalyze.report_missing_modules({unknown!r})")
+        if missing is None:
+            # 查询超时（例如内核正在执行其他代码），不做判断
+            return []
+        known.update(module for module in unknown if module not in missing)
+        return missing
+
+    async def _query_kernel(self, kernel: Dict[str, Any], code: str, timeout: float = 5) -> Any:
+        """在内核中静默执行查询代码，返回内核端运行时发送的结果，超时返回None"""
+        await kernel["ready"].wait()
+        msg_id = kernel["kernel_client"].execute(code, silent=True, store_history=False)
+        queue = kernel["dispatcher"].subscribe(msg_id)
+        result = None
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                msg = await asyncio.wait_for(queue.get(), timeout=max(0, deadline - time.monotonic()))
+                if msg is None:
+                    return None
+                msg_type = msg['header']['msg_type']
+                if msg_type == 'display_data' and kernel_runtime.QUERY_MIME in msg['content']['data']:
+                    result = msg['content']['data'][kernel_runtime.QUERY_MIME]
+                elif msg_type == 'error':
+                    logger.warning(f"内核查询出错: {msg['content'].get('evalue')}")
+                elif msg_type == 'status' and msg['content']['execution_state'] == 'idle':
+                    return result
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            kernel["dispatcher"].unsubscribe(msg_id)
+
+    def checkpoint_path(self, conversation_id: str) -> Path:
+        """对话的检查点目录"""
+        # 对话ID作为目录名，不能包含路径分隔符
+        if not conversation_id or os.path.basename(conversation_id) != conversation_id or conversation_id in ('.', '..'):
+            raise ValueError(f"无效的对话ID: {conversation_id}")
+        return self.checkpoint_dir / conversation_id
+
+    def has_checkpoint(self, conversation_id: str) -> bool:
+        try:
+            return (self.checkpoint_path(conversation_id) / "manifest.json").exists()
+        except ValueError:
+            return False
+
+    def _restore_code(self, conversation_id: str, load_all: bool = False) -> Optional[str]:
+        """内核池新建或重启内核后执行的恢复代码，没有检查点时返回None；load_all为True时立即加载全部变量"""
+        if not self.has_checkpoint(conversation_id):
+            return None
+        code = f"import autoanalyze\nautoanalyze.restore_checkpoint({str(self.checkpoint_path(conversation_id))!r})"
+        return code + "\nautoanalyze.load_all()" if load_all else code
+
+    async def save_checkpoint(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """把对话内核中的变量增量保存到检查点
+
+        DataFrame保存为Parquet，其他变量保存为pickle，内容未变化的变量不重新写入
+
+        Returns:
+            Dict: 保存和未变化的变量、跳过的变量、占用空间和耗时；内核不存在或超时时返回None
+        """
+        kernel = self.kernel_pool.get(conversation_id)
+        if kernel is None:
+            return None
+        path = self.checkpoint_path(conversation_id)
+        # 保存代码在内核中排在已发送的代码之后执行，此前执行成功的代码的结果都包含在检查点中
+        requested_at = time.time()
+        result = await self._query_kernel(
+            kernel,
+            f"import autoanalyze\nautoanalyze.save_checkpoint({str(path)!r})",
+            timeout=self.config.checkpoint_timeout
+        )
+        if result is None:
+            logger.warning(f"保存对话 {conversation_id} 的检查点失败或超时")
+            return None
+        kernel["checkpoint_covers"] = requested_at
+        kernel["last_checkpoint"] = time.time()
+        kernel["checkpoint_bytes"] = result["bytes"]
+        logger.info(f"已保存对话 {conversation_id} 的检查点: 写入{len(result['saved'])}个变量, "
+                    f"未变化{result['unchanged']}个, 耗时{result['duration']}秒")
+        return result
+
+    async def restore_checkpoint(self, conversation_id: str, workspace: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """从检查点恢复对话的变量
+
+        只读取检查点清单，变量在第一次被代码引用时才从磁盘加载
+
+        Returns:
+            Dict: 等待加载的变量名；没有检查点或超时时返回None
+        """
+        if not self.has_checkpoint(conversation_id):
+            return None
+        kernel = await self.create_kernel(conversation_id, workspace)
+        return await self._query_kernel(kernel, self._restore_code(conversation_id))
+
+    def delete_checkpoint(self, conversation_id: str) -> bool:
+        """删除对话的检查点"""
+        path = self.checkpoint_path(conversation_id)
+        if not path.exists():
+            return False
+        shutil.rmtree(path, ignore_errors=True)
+        return True
+
+    async def branch_conversation(self, source_id: str, target_id: str,
+                                  workspace: Optional[str] = None) -> Dict[str, Any]:
+        """从已有对话分出新对话，新对话的内核带有源对话当前的全部变量
+
+        先增量保存源对话的检查点，再以硬链接复制到新对话的检查点目录（不复制数据），
+        然后为新对话创建内核并按需恢复变量，源对话之后的修改不会影响新对话。
+
+        Args:
+            source_id: 源对话ID
+            target_id: 新对话ID
+            workspace: 新对话内核的工作目录，为None时沿用源对话内核的工作目录
+
+        Returns:
+            Dict: 新对话ID、可恢复的变量和耗时
+        """
+        start = time.time()
+        source_kernel = self.kernel_pool.get(source_id)
+        if source_kernel is not None:
+            if await self.save_checkpoint(source_id) is None:
+                raise RuntimeError(f"保存对话 {source_id} 的检查点失败")
+            workspace = workspace or source_kernel["workspace"]
+        elif not self.has_checkpoint(source_id):
+            raise ValueError(f"对话 {source_id} 没有内核也没有检查点")
+        if self.kernel_pool.get(target_id) is not None or self.has_checkpoint(target_id):
+            raise ValueError(f"对话 {target_id} 已存在")
+
+        source_path, target_path = self.checkpoint_path(source_id), self.checkpoint_path(target_id)
+        # 检查点文件总是以替换的方式更新，硬链接后两个对话的文件互不影响
+        shutil.copytree(source_path, target_path, copy_function=_link_or_copy)
+        # 新内核创建时由内核池执行恢复代码
+        await self.create_kernel(target_id, workspace)
+        with open(target_path / "manifest.json", encoding="utf-8") as f:
+            variables = sorted(json.load(f))
+        logger.info(f"已从对话 {source_id} 分出对话 {target_id}，耗时{time.time() - start:.2f}秒")
+        return {
+            "conversation_id": target_id,
+            "source_conversation_id": source_id,
+            "variables": variables,
+            "duration": round(time.time() - start, 4),
+        }
+
+    async def _cull_loop(self):
+        """定期回收空闲超时的内核"""
+        timeout = self.config.kernel_idle_timeout * 60
+        interval = max(1.0, min(60.0, timeout / 4))
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.cull_idle_kernels()
+            except Exception as e:
+                logger.error(f"回收空闲内核时出错: {str(e)}")
+
+    async def cull_idle_kernels(self, idle_timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """回收空闲超时的内核
+
+        Args:
+            idle_timeout: 空闲时间（秒），为None时使用配置中的kernel_idle_timeout
+
+        Returns:
+            List[Dict]: 每个被回收内核的对话ID、空闲时间、释放的内存和写入磁盘的执行记录数
+        """
+        if idle_timeout is None:
+            idle_timeout = self.config.kernel_idle_timeout * 60
+        now = time.time()
+        culled = []
+        for conversation_id, entry in list(self.kernel_pool.kernels.items()):
+            if entry["running"] or not entry["ready"].is_set() or now - entry["last_activity"] < idle_timeout:
+                continue
+            checkpoint_task = self.checkpoint_tasks.get(conversation_id)
+            if checkpoint_task is not None and not checkpoint_task.done():
+                continue
+            info = await self._cull_kernel(conversation_id, entry)
+            if info is not None:
+                culled.append(info)
+        return culled
+
+    async def _cull_kernel(self, conversation_id: str, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """保存检查点后关闭内核并把该对话的执行记录写入磁盘，期间有新的执行时放弃回收"""
+        last_activity = entry["last_activity"]
+        rss = await self._query_kernel(entry, "import autoanalyze\nautoanalyze.report_rss()")
+        checkpointed = await self._checkpoint_before_shutdown(entry)
+        if entry["running"] or entry["last_activity"] != last_activity or self.kernel_pool.get(conversation_id) is not entry:
+            logger.info(f"对话 {conversation_id} 的内核在回收前又被使用，放弃回收")
+            return None
+        await self.kernel_pool.shutdown_kernel(conversation_id)
+        # 执行记录只从内存移到磁盘，界面和智能体之后仍能读取
+        records, record_bytes = self.executions.spill_conversation(conversation_id)
+        info = {
+            "conversation_id": conversation_id,
+            "last_activity": last_activity,
+            "idle_seconds": round(time.time() - last_activity, 1),
+            "rss": rss,
+            "record_bytes": record_bytes,
+            "spilled_records": records,
+            "checkpointed": checkpointed,
+            "culled_at": time.time(),
+        }
+        self.culled_count += 1
+        self.reclaimed_bytes += (rss or 0) + record_bytes
+        self.spilled_records += records
+        self.recent_culls.appendleft(info)
+        logger.info(f"已回收对话 {conversation_id} 的空闲内核，空闲{info['idle_seconds']}秒，"
+                    f"释放内存{(rss or 0) / 1024 ** 2:.1f}MB，执行记录{records}条已写入磁盘")
+        return info
+
+    async def _checkpoint_before_shutdown(self, entry: Dict[str, Any]) -> bool:
+        """关闭内核前保证磁盘上的检查点不过时，之后再使用该对话时不会恢复过时的变量
+
+        检查点已包含全部执行成功的代码的结果时保留；否则按checkpoint_on_cull保存检查点，
+        不保存或保存失败时删除过时的检查点。返回是否留有最新的检查点。
+        """
+        conversation_id = entry["conversation_id"]
+        covers = entry["checkpoint_covers"]
+        if covers is not None and (entry["last_success"] is None or entry["last_success"] <= covers):
+            return True
+        if self.config.checkpoint_on_cull and await self.save_checkpoint(conversation_id) is not None:
+            return True
+        if self.delete_checkpoint(conversation_id):
+            logger.info(f"已删除对话 {conversation_id} 过时的检查点")
+        entry["checkpoint_covers"] = None
+        return False
+
+    def _schedule_checkpoint(self, conversation_id: str):
+        """在后台保存检查点，正在保存时只标记，保存完成后再保存一次"""
+        task = self.checkpoint_tasks.get(conversation_id)
+        if task is not None and not task.done():
+            self._checkpoint_dirty.add(conversation_id)
+            return
+        task = asyncio.create_task(self._checkpoint_loop(conversation_id))
+        self.checkpoint_tasks[conversation_id] = task
+        task.add_done_callback(lambda _: self.checkpoint_tasks.pop(conversation_id, None))
+
+    async def _checkpoint_loop(self, conversation_id: str):
+        while True:
+            self._checkpoint_dirty.discard(conversation_id)
+            try:
+                await self.save_checkpoint(conversation_id)
+            except Exception as e:
+                logger.error(f"保存对话 {conversation_id} 的检查点时出错: {str(e)}")
+            if conversation_id not in self._checkpoint_dirty:
+                break
+
+    def _finish_execution(self, execution_id: str):
+        """通知等待者执行已结束，结束所有输出迭代器，并释放执行相关的资源"""
+        event = self.completion_events.pop(execution_id, None)
+        if event is not None:
+            event.set()
+        for queue in self.output_streams.get(execution_id, []):
+            queue.put_nowait(None)
+        self.output_callbacks.pop(execution_id, None)
+        # 记录已不再变化，可以按限制写入磁盘
+        self.executions.mark_finished(execution_id)
+
+    def _update_kernel_stats(self, kernel: Dict[str, Any], execution_id: str):
+        """执行结束后更新内核统计信息"""
+        execution = self.executions[execution_id]
+        kernel["running"] = max(0, kernel["running"] - 1)
+        kernel["last_activity"] = time.time()
+        kernel["execution_count"] += 1
+        if execution["status"] in ("error", "timeout", "oom"):
+            kernel["error_count"] += 1
+        if execution["start_time"] and execution["end_time"]:
+            kernel["total_execution_time"] += execution["end_time"] - execution["start_time"]
+
+    async def _add_display_data(self, execution_id: str, data: Dict[str, Any]):
+        """处理富文本输出：图片写入图片存储，其他格式按MIME类型选择最紧凑的表示"""
+        if kernel_runtime.PROFILE_MIME in data:
+            # 内核端钩子统计的执行信息，只记录不作为输出
+            profile = data[kernel_runtime.PROFILE_MIME]
+            self.executions[execution_id]['profile'] = profile
+            if profile.get('wall_time', 0) >= self.config.slow_cell_threshold:
+                logger.warning(f"代码执行较慢: {execution_id}, 耗时{profile['wall_time']}秒, CPU时间{profile['cpu_time']}秒")
+            return
+
+        for mime, image_format in (('image/png', 'png'), ('image/jpeg', 'jpeg'), ('image/svg+xml', 'svg')):
+            if mime in data:
+                # 解码一次后写入图片存储，相同的图表只保存一份
+                if image_format == 'svg':
+                    image = self.image_store.put(data[mime].encode('utf-8'), image_format)
+                else:
+                    image = self.image_store.put_base64(data[mime], image_format)
+                self.executions[execution_id]['images'].append(image)
+                return
+
+        item = build_rich_output(
+            data,
+            self.output_store,
+            inline_bytes=self.config.rich_output_inline_bytes,
+            table_max_rows=self.config.agent_table_max_rows
+        )
+        if item is not None:
+            await self._add_output(execution_id, item.pop('content'), item.pop('type'), extra=item)
+        elif 'text/plain' in data:
+            await self._add_output(execution_id, data['text/plain'], 'output')
+
+    async def _add_output(self, execution_id: str, output: str, output_type: str = 'stdout',
+                          extra: Optional[Dict[str, Any]] = None):
+        """添加执行输出
+
+        Args:
+            execution_id: 执行ID
+            output: 输出内容（返回给智能体的文本）
+            output_type: 输出类型
+            extra: 富文本输出的附加字段，例如界面渲染用的data或url；progress为True时是进度条所在行的当前状态，
+                只发送给界面，不写入执行记录
+        """
+        if execution_id in self.executions and extra and extra.get('progress'):
+            output_item = {'type': output_type, 'content': ANSI_ESCAPE.sub('', output), 'timestamp': time.time(),
+                           'progress': True}
+            await self._publish_output(execution_id, output_item, persist=False)
+        elif execution_id in self.executions:
+            # 添加ANSI转义码过滤
+            filtered_output = ANSI_ESCAPE.sub('', output)
+            output_item = {
+                'type': output_type,
+                'content': filtered_output,
+                'timestamp': time.time()
+            }
+            if extra:
+                output_item.update(extra)
+            items = [output_item]
+            limiter = self.output_limiters.get(execution_id)
+            # 只限制文本输出，富文本输出给智能体的内容在生成时已截断到rich_output_inline_bytes以内
+            if limiter is not None and output_type in ('stdout', 'stderr', 'output'):
+                # 超过输出上限后只保留开头部分，其余进入环形缓冲和落盘文件
+                items = limiter.add(output_item)
+            for item in items:
+                await self._publish_output(execution_id, item)
+
+    async def _publish_output(self, execution_id: str, output_item: Dict[str, Any], persist: bool = True):
+        """把输出项写入执行记录并通知订阅者，persist为False时只通知订阅者"""
+        if persist:
+            self.executions[execution_id]['output'].append(output_item)
+        for queue in self.output_streams.get(execution_id, []):
+            queue.put_nowait(output_item)
+
+        # 调用回调函数（如果有）
+        if execution_id in self.output_callbacks:
+            await self.output_callbacks[execution_id](output_item)
+
+    async def _finish_output(self, execution_id: str):
+        """执行结束时补充被截断输出的最后若干行和截断信息"""
+        limiter = self.output_limiters.pop(execution_id, None)
+        if limiter is None or not limiter.truncated:
+            return
+        for item in limiter.finish():
+            await self._publish_output(execution_id, item)
+        self.executions[execution_id]['output_truncated'] = limiter.summary()
+
+    async def cancel_execution(self, execution_id: str) -> bool:
+        """取消代码执行
+
+        Args:
+            execution_id: 执行ID
+
+        Returns:
+            bool: 是否成功取消
+        """
+        if execution_id not in self.executions:
+            logger.warning(f"尝试取消不存在的执行: {execution_id}")
+            return False
+
+        execution = self.executions[execution_id]
+        if execution['status'] not in ['running', 'pending']:
+            logger.info(f"尝试取消非运行状态的执行: {execution_id}, 当前状态: {execution['status']}")
+            return False
+
+        # 先标记为取消，执行任务结束时据此不再提前通知完成；批量执行中同一批尚未结束的代码一并取消
+        cancelled = [execution_id] + [
+            other for other in self.execution_batches.get(execution_id, [])
+            if other != execution_id and self.executions[other]['status'] in ['running', 'pending']
+        ]
+        for other in cancelled:
+            self.executions[other]['status'] = 'cancelled'
+
+        # 中断该对话内核的执行
+        try:
+            kernel = self.kernel_pool.get(execution['conversation_id'])
+            if kernel:
+                logger.info(f"正在中断内核执行: {execution_id}")
+                await kernel["kernel_manager"].interrupt_kernel()
+        except Exception as e:
+            logger.error(f"中断内核执行时出错: {str(e)}")
+
+        # 取消执行任务
+        if execution_id in self.execution_tasks:
+            task = self.execution_tasks[execution_id]
+            if not task.done():
+                logger.info(f"正在取消执行任务: {execution_id}")
+                task.cancel()
+                try:
+                    # 等待任务取消完成
+                    await asyncio.wait_for(asyncio.shield(task), timeout=2.0)
+                except (asyncio.CancelledError, asyncio.TimeoutError):
+                    pass
+
+        # 更新状态为取消
+        for other in cancelled:
+            execution = self.executions[other]
+            execution['status'] = 'cancelled'
+            execution['end_time'] = time.time()
+            execution['is_executing'] = False
+
+            # 添加取消消息到输出
+            await self._add_output(other, '执行已取消', 'system')
+            self._finish_execution(other)
+        logger.info(f"执行已成功取消: {execution_id}")
+
+        return True
+
+    def get_execution_status(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """获取执行状态
+
+        Args:
+            execution_id: 执行ID
+
+        Returns:
+            Dict: 执行状态信息，如果不存在则返回None
+        """
+        if execution_id not in self.executions:
+            return None
+
+        execution = self.executions[execution_id]
+
+        # 创建状态副本，不包含不需要的字段
+        status = execution.copy()
+        if 'is_executing' in status:
+            del status['is_executing']
+
+        return status
+
+    async def wait_for_completion(self, execution_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """等待执行结束并返回执行状态
+
+        内核进入idle后立即返回，无需轮询get_execution_status
+
+        Args:
+            execution_id: 执行ID
+            timeout: 最长等待时间（秒），为None时一直等待
+
+        Returns:
+            Dict: 执行状态信息，如果不存在则返回None
+
+        Raises:
+            asyncio.TimeoutError: 超过timeout仍未结束
+        """
+        event = self.completion_events.get(execution_id)
+        if event is None:
+            return self.get_execution_status(execution_id)
+        await asyncio.wait_for(event.wait(), timeout=timeout)
+        return self.get_execution_status(execution_id)
+
+    async def iter_output(self, execution_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """异步迭代执行的输出项
+
+        先返回已经产生的输出，再实时返回新的输出，执行结束后迭代结束。
+        带progress字段的输出项是进度条所在行的当前状态，替换同类型的上一个进度输出项
+
+        Args:
+            execution_id: 执行ID
+        """
+        execution = self.executions.get(execution_id)
+        if execution is None:
+            return
+        # 订阅与读取已有输出之间没有await，保证输出不重复、不遗漏
+        queue = asyncio.Queue()
+        self.output_streams.setdefault(execution_id, []).append(queue)
+        backlog = list(execution['output'])
+        event = self.completion_events.get(execution_id)
+        finished = event is None or event.is_set()
+        try:
+            for item in backlog:
+                yield item
+            if finished:
+                return
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                yield item
+        finally:
+            queues = self.output_streams.get(execution_id, [])
+            if queue in queues:
+                queues.remove(queue)
+            if not queues:
+                self.output_streams.pop(execution_id, None)
+
+    def register_output_callback(self, execution_id: str, callback: Callable):
+        """注册输出回调函数
+
+        Args:
+            execution_id: 执行ID
+            callback: 回调函数，接收输出项作为参数
+        """
+        self.output_callbacks[execution_id] = callback
+
+    def unregister_output_callback(self, execution_id: str):
+        """注销输出回调函数
+
+        Args:
+            execution_id: 执行ID
+        """
+        if execution_id in self.output_callbacks:
+            del self.output_callbacks[execution_id]
+
+    async def cleanup(self):
+        """清理所有内核资源"""
+        # 等待所有执行任务完成或取消
+        if self.execution_tasks:
+            logger.info(f"等待 {len(self.execution_tasks)} 个执行任务完成...")
+            pending_tasks = [task for task in self.execution_tasks.values() if not task.done()]
+            
+            if pending_tasks:
+                # 等待所有任务完成，或设置超时
+                try:
+                    await asyncio.wait(pending_tasks, timeout=5.0)
+                except asyncio.TimeoutError:
+                    # 超时后取消剩余任务
+                    for task in pending_tasks:
+                        if not task.done():
+                            task.cancel()
+                    
+                    # 等待取消操作完成
+                    if pending_tasks:
+                        await asyncio.wait(pending_tasks, timeout=2.0)
+            
+            logger.info("所有执行任务已处理完毕")
+
+        if self._cull_task is not None and not self._cull_task.done():
+            self._cull_task.cancel()
+
+        # 等待正在保存的检查点完成，关闭服务后仍可恢复
+        if self.checkpoint_tasks:
+            await asyncio.wait(list(self.checkpoint_tasks.values()), timeout=self.config.checkpoint_timeout)
+        
+        # 关闭内核池中的所有内核
+        await self.kernel_pool.shutdown_all()
+        if self.zygote is not None:
+            await self.zygote.stop()
+        if self.local_workers is not None:
+            await self.local_workers.stop()
+
+    def get_kernel_stats(self) -> Dict[str, Any]:
+        """获取内核池统计信息
+
+        Returns:
+            Dict: 内核池容量、回收次数、备用内核数以及每个内核的统计信息
+        """
+        return {
+            "engine": self.engine_name,
+            "execution_store": self.executions.stats(),
+            "max_kernels": self.kernel_pool.max_size,
+            "evicted_count": self.kernel_pool.evicted_count,
+            "restart_count": self.kernel_pool.restart_count,
+            "cell_cache": {"enabled": self.config.memoize_cells, **self.cell_cache.stats()},
+            "zygote": self.zygote.get_stats() if self.zygote is not None else {"enabled": False},
+            "placement": self.placement.get_stats() if self.placement is not None else {"enabled": False},
+            "culling": {
+                "enabled": bool(self.config.kernel_idle_timeout),
+                "idle_timeout_minutes": self.config.kernel_idle_timeout,
+                "culled_kernels": self.culled_count,
+                "reclaimed_bytes": self.reclaimed_bytes,
+                "spilled_records": self.spilled_records,
+                "recent": list(self.recent_culls),
+            },
+            **self.kernel_pool.get_spare_stats(),
+            "kernels": self.kernel_pool.get_stats()
+        }
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+    async def main():
+        engine = JupyterExecutionEngine()
+        await engine.create_kernel("test")
+        await engine.execute_code("print('hello')", "a", "b", "D:/")
+        await engine.cleanup()
+
+    # 使用 asyncio.run 运行主函数
     asyncio.run(main())
\ No newline at end of file
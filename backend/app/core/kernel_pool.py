@@ -0,0 +1,645 @@
+import asyncio
+import queue
+import signal
+import sys
+import time
+import uuid
+import functools
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable
+from jupyter_client import AsyncKernelManager
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _limit_resources(cpu_time: Optional[int], memory_mb: Optional[int]):
+    """在内核子进程中设置资源限制，于exec之前调用（仅POSIX）"""
+    import resource
+    if cpu_time:
+        # 超出软限制后内核进程收到SIGXCPU退出，硬限制留出余量作为兜底
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_time, cpu_time + 5))
+    if memory_mb:
+        # 超出地址空间上限时内存分配失败，代码中抛出MemoryError
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+async def kernel_exit_status(km) -> Tuple[str, str]:
+    """根据内核进程的退出码判断退出原因，返回(状态, 说明)"""
+    exit_code = None
+    try:
+        if km.provisioner is not None:
+            exit_code = await km.provisioner.poll()
+    except Exception:
+        pass
+    if exit_code is None:
+        return 'error', "内核停止响应"
+    sigxcpu = getattr(signal, 'SIGXCPU', None)
+    sigkill = getattr(signal, 'SIGKILL', None)
+    if sigxcpu is not None and exit_code == -sigxcpu:
+        return 'timeout', "内核进程超出CPU时间限制后退出"
+    if sigkill is not None and exit_code == -sigkill:
+        return 'oom', "内核进程被系统强制终止（可能内存不足）"
+    return 'error', f"内核进程意外退出（退出码: {exit_code}）"
+
+
+def _chdir_code(workspace: str) -> str:
+    """在内核中切换工作目录的代码"""
+    return f"import os as _os\n_os.chdir({workspace!r})\ndel _os"
+
+
+class IOPubDispatcher:
+    """单个内核的IOPub消息分发器
+
+    每个内核只有一个后台任务读取IOPub通道，按消息的parent_header.msg_id
+    把消息投递到对应执行的队列中，多个执行同时进行时互不丢失输出。
+    """
+
+    def __init__(self, client):
+        self.client = client
+        # 执行请求msg_id -> 该执行的消息队列
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """启动后台读取任务"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def subscribe(self, msg_id: str) -> asyncio.Queue:
+        """订阅某个执行请求的IOPub消息
+
+        必须在client.execute返回后、下一次await之前调用，保证不会漏掉消息
+        """
+        queue = asyncio.Queue()
+        self.queues[msg_id] = queue
+        return queue
+
+    def unsubscribe(self, msg_id: str):
+        """取消订阅"""
+        self.queues.pop(msg_id, None)
+
+    async def _run(self):
+        """持续读取IOPub消息并分发，无消息时阻塞等待而不是轮询"""
+        try:
+            while True:
+                msg = await self.client.get_iopub_msg()
+                msg_id = msg.get('parent_header', {}).get('msg_id')
+                queue = self.queues.get(msg_id)
+                if queue is not None:
+                    queue.put_nowait(msg)
+                else:
+                    logger.debug(f"丢弃无订阅者的IOPub消息: {msg['header']['msg_type']}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"读取IOPub消息出错: {str(e)}")
+        self._notify_closed()
+
+    def _notify_closed(self):
+        """通道已断开，通知所有等待中的执行"""
+        for queue in self.queues.values():
+            queue.put_nowait(None)
+        self.queues.clear()
+
+    async def stop(self):
+        """停止后台读取任务"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._notify_closed()
+
+
+class KernelPool:
+    """按对话ID管理Jupyter内核的内核池
+
+    每个对话独占一个内核，不同对话的代码可以在不同的内核进程中并行执行。
+    内核数量达到上限时，按最近最少使用（LRU）的顺序回收空闲内核。
+    另外维护若干已完成初始化的备用内核，新对话直接领取，无需等待内核启动。
+    后台健康检查定期检测内核进程和心跳，发现内核退出或无响应时立即通知正在执行的代码并重启内核，
+    可选地重放该对话执行成功的代码以恢复变量。
+    """
+
+    def __init__(self, max_size: int = 4, setup_code: str = "", spare_size: int = 0,
+                 cpu_time_limit: Optional[int] = None, memory_limit_mb: Optional[int] = None,
+                 health_check_interval: float = 5, replay_on_restart: bool = False,
+                 replay_max_cells: int = 100, replay_timeout: float = 120, restore_code: Optional[Callable[[str, bool], Optional[str]]] = None,
+                 provisioner_factory: Optional[Callable[[AsyncKernelManager], Any]] = None,
+                 kernel_manager_class: type = AsyncKernelManager,
+                 before_evict: Optional[Callable[[Dict[str, Any]], Awaitable[Any]]] = None):
+        """初始化内核池
+
+        Args:
+            max_size: 内核池最大内核数
+            setup_code: 内核启动后执行的初始化代码
+            spare_size: 预先启动的备用内核数
+            cpu_time_limit: 内核进程累计CPU时间上限（秒）
+            memory_limit_mb: 内核进程地址空间上限（MB）
+            health_check_interval: 健康检查间隔（秒），为0时不启动健康检查
+            replay_on_restart: 重启内核后是否重放执行成功的代码
+            replay_max_cells: 每个对话最多记录的可重放代码数，超出后不再重放
+            replay_timeout: 重启后重放每段代码或从检查点恢复变量的最长时间（秒），超时后停止重放，保留已恢复的部分
+            restore_code: 根据对话ID返回恢复该对话变量的代码，没有可恢复的状态时返回None；第二个参数为True时
+                立即加载全部变量，之后静默重放的代码也能使用这些变量；
+                新建内核后执行；重启内核时只在检查点覆盖了全部执行成功的代码，或之后的代码可以重放时执行
+            provisioner_factory: 根据内核管理器创建内核供应器，用于由孵化进程fork内核或在工作节点上启动内核；
+                为None时通过子进程启动内核
+            kernel_manager_class: 内核管理器类，需提供与AsyncKernelManager相同的启动、重启、中断和关闭接口
+            before_evict: 内核池已满、回收最近最少使用的内核之前调用，参数为内核条目，例如保存检查点
+        """
+        self.max_size = max(1, max_size)
+        self.setup_code = setup_code
+        self.spare_size = max(0, spare_size)
+        self.cpu_time_limit = cpu_time_limit
+        self.memory_limit_mb = memory_limit_mb
+        self.health_check_interval = health_check_interval
+        self.replay_on_restart = replay_on_restart
+        self.replay_max_cells = replay_max_cells
+        self.replay_timeout = replay_timeout
+        self.restore_code = restore_code
+        self.provisioner_factory = provisioner_factory
+        self.kernel_manager_class = kernel_manager_class
+        self.before_evict = before_evict
+        self._monitor_task: Optional[asyncio.Task] = None
+        self.restart_count = 0
+        # 已启动并完成初始化、尚未分配给对话的备用内核
+        self.spares: List[Tuple[AsyncKernelManager, Any]] = []
+        self._refill_task: Optional[asyncio.Task] = None
+        self.spare_hits = 0
+        self.spare_misses = 0
+        # 对话ID -> 内核条目，按最近使用顺序排列（末尾为最近使用）
+        self.kernels: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # 正在为对话创建内核时使用的锁，避免同一对话重复创建
+        self._creating: Dict[str, asyncio.Lock] = {}
+        # 正在启动中的内核数量，计入容量避免并发创建时超出上限
+        self._pending = 0
+        self.evicted_count = 0
+
+    def start(self):
+        """开始在后台补充备用内核，并启动健康检查"""
+        self._schedule_refill()
+        if self.health_check_interval > 0 and (self._monitor_task is None or self._monitor_task.done()):
+            self._monitor_task = asyncio.create_task(self._monitor())
+
+    async def _monitor(self):
+        """定期检查所有内核的健康状况，重启已退出或无响应的内核"""
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            for conversation_id, entry in list(self.kernels.items()):
+                # 正在重启的内核跳过检查
+                if not entry["ready"].is_set():
+                    continue
+                try:
+                    if await self._is_healthy(entry):
+                        continue
+                    status, reason = await kernel_exit_status(entry["kernel_manager"])
+                    logger.warning(f"对话 {conversation_id} 的内核异常: {reason}")
+                    await self.restart_kernel(conversation_id, status=status, reason=reason)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"重启对话 {conversation_id} 的内核失败，移除该内核: {str(e)}")
+                    await self.shutdown_kernel(conversation_id)
+
+    @staticmethod
+    async def _is_healthy(entry: Dict[str, Any]) -> bool:
+        """内核进程存活且心跳正常"""
+        if not await entry["kernel_manager"].is_alive():
+            return False
+        return entry["kernel_client"].hb_channel.is_beating()
+
+    def _schedule_refill(self):
+        """备用内核不足时启动后台补充任务"""
+        if len(self.spares) >= self.spare_size:
+            return
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill_spares())
+
+    async def _refill_spares(self):
+        """启动新内核直到备用内核数达到目标"""
+        while len(self.spares) < self.spare_size:
+            try:
+                self.spares.append(await self._start_kernel())
+                logger.info(f"备用内核已就绪，当前备用内核数: {len(self.spares)}")
+            except Exception as e:
+                # 启动失败时停止补充，等待下一次领取时重试
+                logger.error(f"启动备用内核失败: {str(e)}")
+                return
+
+    def get(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """获取对话的内核条目，不存在时返回None"""
+        return self.kernels.get(conversation_id)
+
+    async def acquire(self, conversation_id: str, workspace: Optional[str] = None) -> Dict[str, Any]:
+        """获取对话的内核，不存在时创建
+
+        Args:
+            conversation_id: 对话ID
+            workspace: 工作目录，与内核当前的工作目录不同时切换
+
+        Returns:
+            Dict: 内核条目
+        """
+        entry = self.kernels.get(conversation_id)
+        if entry is None:
+            lock = self._creating.setdefault(conversation_id, asyncio.Lock())
+            async with lock:
+                entry = self.kernels.get(conversation_id)
+                if entry is None:
+                    entry = await self._create_entry(conversation_id, workspace)
+            self._creating.pop(conversation_id, None)
+
+        if workspace and entry["workspace"] != workspace:
+            await entry["ready"].wait()
+            await self._change_workspace(entry, workspace)
+
+        self.kernels.move_to_end(conversation_id)
+        entry["last_activity"] = time.time()
+        return entry
+
+    async def _create_entry(self, conversation_id: str, workspace: Optional[str] = None) -> Dict[str, Any]:
+        """为对话启动新内核并加入内核池"""
+        await self._make_room()
+        # 备用内核启动时工作目录尚未确定，领取后再切换
+        kernel_workspace = None
+        if self.spares:
+            km, client = self.spares.pop(0)
+            self.spare_hits += 1
+        else:
+            self.spare_misses += 1
+            self._pending += 1
+            try:
+                km, client = await self._start_kernel(cwd=workspace)
+                kernel_workspace = workspace
+            finally:
+                self._pending -= 1
+        self._schedule_refill()
+
+        dispatcher = IOPubDispatcher(client)
+        dispatcher.start()
+        entry = {
+            "conversation_id": conversation_id,
+            "kernel_manager": km,
+            "kernel_client": client,
+            "dispatcher": dispatcher,
+            "created_at": time.time(),
+            "last_activity": time.time(),
+            "running": 0,  # 正在执行的代码数
+            "execution_count": 0,
+            "error_count": 0,
+            "total_execution_time": 0.0,
+            "ready": asyncio.Event(),  # 重启期间清除，执行代码前等待
+            "failure": None,  # 最近一次内核异常的状态和说明，通知正在执行的代码
+            "history": [],  # 执行成功的代码，重启后按顺序重放；为None表示已超出上限
+            "restart_count": 0,
+            "replayed_cells": 0,
+            "last_replay_time": None,
+            "workspace": kernel_workspace,  # 内核当前的工作目录
+            "available_modules": set(),  # 已确认在内核环境中可以导入的模块
+            "last_checkpoint": None,  # 最近一次保存检查点的时间
+            "checkpoint_covers": None,  # 检查点包含该时间之前发送的代码的结果，没有可用的检查点时为None
+            "last_success": None,  # 最近一次执行成功的代码的发送时间
+            "checkpoint_bytes": 0,  # 检查点占用的磁盘空间
+            "rss": None,  # 最近一次执行后内核的常驻内存
+            "spilled_variables": [],  # 已写入磁盘、再次使用时加载的DataFrame
+        }
+        entry["ready"].set()
+        self.kernels[conversation_id] = entry
+        logger.info(f"为对话 {conversation_id} 创建内核，当前内核数: {len(self.kernels)}")
+        if workspace and kernel_workspace != workspace:
+            await self._change_workspace(entry, workspace)
+        code = self.restore_code(conversation_id, False) if self.restore_code else None
+        if code:
+            # 之前保存过检查点（例如服务重启或内核被回收），恢复该对话的变量
+            try:
+                await self._execute_silent(entry, code)
+                entry["checkpoint_covers"] = entry["created_at"]
+                logger.info(f"已从检查点恢复对话 {conversation_id} 的变量")
+            except RuntimeError as e:
+                logger.warning(f"从检查点恢复对话 {conversation_id} 的变量失败: {str(e)}")
+        return entry
+
+    async def _change_workspace(self, entry: Dict[str, Any], workspace: str):
+        """切换内核的工作目录
+
+        代码在内核中排队执行，会在该内核正在执行的代码结束后生效
+        """
+        try:
+            await self._execute_silent(entry, _chdir_code(workspace))
+        except RuntimeError as e:
+            raise RuntimeError(f"切换内核工作目录失败: {str(e)}")
+        entry["workspace"] = workspace
+        logger.info(f"对话 {entry['conversation_id']} 的内核工作目录: {workspace}")
+
+    @staticmethod
+    async def _execute_silent(entry: Dict[str, Any], code: str):
+        """通过消息分发器在内核中静默执行代码并等待完成，出错时抛出RuntimeError"""
+        msg_id = entry["kernel_client"].execute(code, silent=True, store_history=False)
+        queue = entry["dispatcher"].subscribe(msg_id)
+        try:
+            while True:
+                msg = await queue.get()
+                if msg is None:
+                    raise RuntimeError("内核IOPub通道已断开")
+                msg_type = msg['header']['msg_type']
+                if msg_type == 'error':
+                    raise RuntimeError(msg['content'].get('evalue'))
+                if msg_type == 'status' and msg['content']['execution_state'] == 'idle':
+                    break
+        finally:
+            entry["dispatcher"].unsubscribe(msg_id)
+
+    async def _start_kernel(self, cwd: Optional[str] = None):
+        """启动内核并执行初始化代码
+
+        Args:
+            cwd: 内核进程的工作目录，为None时沿用服务进程的工作目录
+        """
+        km = self.kernel_manager_class(kernel_name='python3')
+        client = None
+        try:
+            if self.provisioner_factory is not None:
+                # 由供应器启动内核进程，资源限制由供应器在内核进程中设置
+                km.kernel_id = str(uuid.uuid4())
+                km.provisioner = self.provisioner_factory(km)
+                await km.start_kernel(cwd=cwd)
+            else:
+                await km.start_kernel(cwd=cwd, **self._launch_kwargs())
+            client = km.client()
+            client.start_channels()
+
+            # 验证内核准备就绪
+            await client.wait_for_ready(timeout=10)
+
+            # 等待初始化代码执行完毕，领取内核后即可直接使用预先导入的库
+            await self._run_setup(client)  # 避免出现字体错误
+            return km, client
+
+        except (Exception, asyncio.CancelledError) as e:
+            logger.error(f"创建内核失败: {str(e)}")
+            # 关闭已经启动的内核进程，避免泄漏
+            if client is not None:
+                client.stop_channels()
+            try:
+                await km.shutdown_kernel(now=True)
+            except Exception as shutdown_error:
+                logger.error(f"关闭启动失败的内核时出错: {str(shutdown_error)}")
+            raise
+
+    def _launch_kwargs(self) -> Dict[str, Any]:
+        """启动内核进程的额外参数，配置了资源限制时在子进程中设置rlimit"""
+        if sys.platform == 'win32' or not (self.cpu_time_limit or self.memory_limit_mb):
+            return {}
+        return {"preexec_fn": functools.partial(_limit_resources, self.cpu_time_limit, self.memory_limit_mb)}
+
+    async def _run_setup(self, client, timeout: float = 120):
+        """在内核中执行初始化代码并等待完成，超时时抛出TimeoutError"""
+        try:
+            success = await self._run_silent(client, self.setup_code, timeout, raise_on_timeout=True)
+        except queue.Empty:
+            raise TimeoutError(f"内核初始化代码在{timeout:.0f}秒内未执行完毕") from None
+        if not success:
+            logger.warning("内核初始化代码执行失败或超时")
+
+    @staticmethod
+    async def _run_silent(client, code: str, timeout: float = 120, raise_on_timeout: bool = False) -> bool:
+        """在内核中静默执行代码并等待完成，返回是否执行成功
+
+        超时时返回False，raise_on_timeout为True时抛出queue.Empty
+        """
+        msg_id = client.execute(code, silent=True, store_history=False)
+        deadline = time.time() + timeout
+        success = True
+        try:
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise queue.Empty
+                msg = await client.get_iopub_msg(timeout=remaining)
+                if msg.get('parent_header', {}).get('msg_id') != msg_id:
+                    continue
+                msg_type = msg['header']['msg_type']
+                if msg_type == 'error':
+                    logger.warning(f"内核静默执行代码出错: {msg['content'].get('evalue')}")
+                    success = False
+                elif msg_type == 'status' and msg['content']['execution_state'] == 'idle':
+                    return success
+        except queue.Empty:
+            if raise_on_timeout:
+                raise
+            logger.warning(f"内核静默执行代码在{timeout:.0f}秒内未完成")
+            return False
+
+    def record_history(self, entry: Dict[str, Any], code: str, sent_at: Optional[float] = None):
+        """记录执行成功的代码，用于内核重启后恢复状态
+
+        Args:
+            sent_at: 代码的执行请求发送到内核的时间，为None时使用当前时间；内核按发送顺序执行代码，
+                与检查点的保存时间比较即可判断代码的结果是否已包含在检查点中
+        """
+        entry["last_success"] = max(entry["last_success"] or 0, sent_at or time.time())
+        if not self.replay_on_restart or entry["history"] is None:
+            return
+        if len(entry["history"]) >= self.replay_max_cells:
+            # 只重放部分代码会得到不完整的状态，超出上限后放弃重放
+            logger.info(f"对话 {entry['conversation_id']} 的可重放代码超过{self.replay_max_cells}段，重启后将不再重放")
+            entry["history"] = None
+            return
+        entry["history"].append((entry["last_success"], code))
+
+    async def _replay(self, entry: Dict[str, Any], client, since: Optional[float] = None):
+        """按顺序重放执行成功的代码，遇到失败时停止
+
+        Args:
+            since: 已从检查点恢复时为检查点覆盖到的时间，只重放之后执行成功的代码
+        """
+        history = entry["history"] or []
+        # 历史按执行顺序排列，检查点已包含的是开头部分
+        covered = sum(1 for executed_at, _ in history if since is not None and executed_at <= since)
+        start = time.time()
+        replayed = 0
+        for _, code in history[covered:]:
+            if not await self._run_silent(client, code, self.replay_timeout):
+                logger.warning(f"重放对话 {entry['conversation_id']} 的代码失败或超时，停止重放")
+                await self._interrupt_silent(entry)
+                break
+            replayed += 1
+        entry["replayed_cells"] = replayed
+        entry["last_replay_time"] = time.time() - start
+        # 只保留成功重放的部分，之后的代码依赖的状态已不存在
+        entry["history"] = history[:covered + replayed]
+        logger.info(f"已为对话 {entry['conversation_id']} 重放{replayed}段代码，耗时{entry['last_replay_time']:.2f}秒")
+
+    @staticmethod
+    async def _interrupt_silent(entry: Dict[str, Any]):
+        """静默执行的代码失败或超时后中断内核，超时的代码可能仍在执行，不能让之后的代码排在它后面"""
+        try:
+            await entry["kernel_manager"].interrupt_kernel()
+        except Exception as e:
+            logger.warning(f"中断对话 {entry['conversation_id']} 的内核失败: {str(e)}")
+
+    async def _make_room(self):
+        """内核池已满时回收最近最少使用的空闲内核"""
+        while len(self.kernels) + self._pending >= self.max_size:
+            idle = [cid for cid, entry in self.kernels.items() if entry["running"] == 0]
+            if not idle:
+                raise RuntimeError(f"内核池已满（{self.max_size}个），且所有内核都在执行代码，请稍后重试")
+            # OrderedDict按使用顺序排列，第一个空闲内核即为LRU
+            entry = self.kernels[idle[0]]
+            if self.before_evict is not None:
+                try:
+                    await self.before_evict(entry)
+                except Exception as e:
+                    logger.error(f"回收对话 {idle[0]} 的内核前处理出错: {str(e)}")
+                if entry["running"] or self.kernels.get(idle[0]) is not entry:
+                    # 期间内核又被使用或已被移除，重新选择
+                    continue
+            logger.info(f"内核池已满，回收对话 {idle[0]} 的空闲内核")
+            await self.shutdown_kernel(idle[0])
+            self.evicted_count += 1
+
+    async def restart_kernel(self, conversation_id: str, status: str = 'error', reason: str = "内核已重启") -> bool:
+        """重启对话的内核
+
+        内核中的变量会丢失。检查点包含全部执行成功的代码的结果时从检查点恢复；检查点之后还有执行成功的代码时，
+        开启重放则恢复检查点后重放这些代码，否则不使用过时的检查点。没有可用的检查点时在开启重放时重放全部代码。
+        正在等待该内核输出的执行会立即收到通知，以status和reason作为执行结果。
+
+        Args:
+            conversation_id: 对话ID
+            status: 正在执行的代码的结束状态
+            reason: 重启原因
+
+        Returns:
+            bool: 内核是否存在并已重启
+        """
+        entry = self.kernels.get(conversation_id)
+        if entry is None:
+            return False
+        if not entry["ready"].is_set():
+            # 已经在重启中，等待完成即可
+            await entry["ready"].wait()
+            return True
+        entry["ready"].clear()
+        try:
+            logger.info(f"正在重启对话 {conversation_id} 的内核: {reason}")
+            entry["failure"] = {"status": status, "message": reason}
+            await entry["dispatcher"].stop()
+            entry["kernel_client"].stop_channels()
+            km = entry["kernel_manager"]
+            # 重启时沿用首次启动的参数，资源限制同样生效
+            await km.restart_kernel(now=True)
+            client = km.client()
+            client.start_channels()
+            await client.wait_for_ready(timeout=30)
+            await self._run_setup(client)
+            # 重启沿用首次启动时的工作目录，之后切换过的需要重新切换
+            if entry["workspace"] and not await self._run_silent(client, _chdir_code(entry["workspace"])):
+                logger.warning(f"重启后切换工作目录失败: {entry['workspace']}")
+            since = entry["checkpoint_covers"]
+            replayable = self.replay_on_restart and entry["history"] is not None
+            stale = since is not None and entry["last_success"] is not None and entry["last_success"] > since
+            # 之后要重放代码时立即加载全部变量，静默执行的代码不会触发按需加载
+            code = self.restore_code(conversation_id, stale) if self.restore_code and since is not None else None
+            if code and stale and not replayable:
+                # 检查点之后执行成功的代码无法重放，恢复检查点只会得到过时的变量
+                logger.warning(f"对话 {conversation_id} 的检查点已过时且无法重放之后的代码，不恢复变量")
+                code = None
+            if code:
+                # 检查点比重放代码快得多，只重放检查点之后执行成功的代码
+                if not await self._run_silent(client, code, self.replay_timeout):
+                    logger.warning(f"从检查点恢复对话 {conversation_id} 的变量失败或超时")
+                    await self._interrupt_silent(entry)
+                    since = None
+            else:
+                since = None
+            if replayable and entry["history"]:
+                await self._replay(entry, client, since)
+            entry["checkpoint_covers"] = since
+
+            dispatcher = IOPubDispatcher(client)
+            dispatcher.start()
+            entry["kernel_client"] = client
+            entry["dispatcher"] = dispatcher
+            entry["restart_count"] += 1
+            # 写出的DataFrame随原内核进程一起删除
+            entry["spilled_variables"] = []
+            entry["last_activity"] = time.time()
+            self.restart_count += 1
+        finally:
+            entry["ready"].set()
+        return True
+
+    async def shutdown_kernel(self, conversation_id: str) -> bool:
+        """关闭并移除对话的内核
+
+        Args:
+            conversation_id: 对话ID
+
+        Returns:
+            bool: 内核是否存在并被关闭
+        """
+        entry = self.kernels.pop(conversation_id, None)
+        if entry is None:
+            return False
+        entry["failure"] = {"status": "error", "message": "内核已关闭"}
+        try:
+            await entry["dispatcher"].stop()
+            entry["kernel_client"].stop_channels()
+            await entry["kernel_manager"].shutdown_kernel(now=True)
+        except Exception as e:
+            logger.error(f"关闭对话 {conversation_id} 的内核时出错: {str(e)}")
+        return True
+
+    async def shutdown_all(self):
+        """关闭内核池中的所有内核以及备用内核"""
+        for task in (self._refill_task, self._monitor_task):
+            if task and not task.done():
+                task.cancel()
+        for conversation_id in list(self.kernels.keys()):
+            await self.shutdown_kernel(conversation_id)
+        while self.spares:
+            km, client = self.spares.pop()
+            try:
+                client.stop_channels()
+                await km.shutdown_kernel(now=True)
+            except Exception as e:
+                logger.error(f"关闭备用内核时出错: {str(e)}")
+
+    def get_spare_stats(self) -> Dict[str, Any]:
+        """获取备用内核的统计信息"""
+        return {
+            "spare_kernels": len(self.spares),
+            "spare_target": self.spare_size,
+            "spare_hits": self.spare_hits,
+            "spare_misses": self.spare_misses,
+        }
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """获取每个内核的统计信息"""
+        return [
+            {
+                "conversation_id": conversation_id,
+                "kernel_id": entry["kernel_manager"].kernel_id,
+                "created_at": entry["created_at"],
+                "last_activity": entry["last_activity"],
+                "running": entry["running"],
+                "execution_count": entry["execution_count"],
+                "error_count": entry["error_count"],
+                "total_execution_time": entry["total_execution_time"],
+                "restart_count": entry["restart_count"],
+                "replayed_cells": entry["replayed_cells"],
+                "last_replay_time": entry["last_replay_time"],
+                "workspace": entry["workspace"],
+                "last_checkpoint": entry["last_checkpoint"],
+                "checkpoint_bytes": entry["checkpoint_bytes"],
+                "rss": entry["rss"],
+                "spilled_variables": entry["spilled_variables"],
+                "worker": getattr(entry["kernel_manager"].provisioner, "host", None),
+            }
+            for conversation_id, entry in self.kernels.items()
+        ]
@@ -0,0 +1,995 @@
+"""内核端运行时
+
+本文件的源码在内核初始化时注入到内核进程中，注册为autoanalyze模块；服务进程只使用其中的常量。
+内核可能运行在与服务不同的Python环境中，因此只能依赖标准库，第三方库按需从sys.modules获取。
+"""
+import os
+import re
+import sys
+import json
+import time
+import gc
+import pickle
+import shutil
+import hashlib
+import inspect
+import functools
+import contextlib
+
+# 执行统计信息通过该MIME类型的display_data发送给服务端，不作为输出展示
+PROFILE_MIME = "application/vnd.autoanalyze.profile+json"
+# 服务端查询内核状态时的返回结果
+QUERY_MIME = "application/vnd.autoanalyze.query+json"
+
+
+def _reply(value):
+    """把查询结果发送给服务端"""
+    from IPython.display import publish_display_data
+    publish_display_data({QUERY_MIME: value})
+
+
+def report_missing_modules(names):
+    """返回无法在内核环境中找到的顶层模块，只查找不导入"""
+    import importlib.util
+    missing = []
+    for name in names:
+        try:
+            if importlib.util.find_spec(name) is None:
+                missing.append(name)
+        except (ImportError, ValueError):
+            missing.append(name)
+    _reply(missing)
+
+
+def _proc_status(field):
+    """读取/proc/self/status中的内存字段（字节），非Linux系统返回None"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def current_rss():
+    """当前进程的常驻内存（字节）"""
+    rss = _proc_status("VmRSS")
+    if rss is not None:
+        return rss
+    psutil = sys.modules.get("psutil")
+    if psutil is None:
+        try:
+            import psutil
+        except ImportError:
+            return None
+    return psutil.Process().memory_info().rss
+
+
+def report_rss():
+    """返回当前进程的常驻内存"""
+    _reply(current_rss())
+
+
+def _reset_peak_rss():
+    """重置进程的内存峰值记录（VmHWM），仅Linux支持"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _dataframes(namespace):
+    """用户命名空间中的DataFrame，pandas未导入时为空"""
+    pd = sys.modules.get("pandas")
+    if pd is None:
+        return []
+    return [
+        value for name, value in list(namespace.items())
+        if not name.startswith("_") and isinstance(value, pd.DataFrame)
+    ]
+
+
+class CellProfiler:
+    """统计每段代码的耗时、CPU时间、内存峰值增量和新建的DataFrame"""
+
+    def __init__(self, shell):
+        self.shell = shell
+        self._start = None
+
+    def pre_run_cell(self, info):
+        peak_reset = _reset_peak_rss()
+        frame_ids = {id(df) for df in _dataframes(self.shell.user_ns)}
+        self._start = (time.perf_counter(), time.process_time(), current_rss(), peak_reset, frame_ids)
+
+    def post_run_cell(self, result):
+        if self._start is None:
+            return
+        wall_start, cpu_start, rss_start, peak_reset, frame_ids = self._start
+        self._start = None
+        wall_time = time.perf_counter() - wall_start
+        cpu_time = time.process_time() - cpu_start
+        rss = current_rss()
+
+        peak_delta = None
+        if rss_start is not None and rss is not None:
+            peak = _proc_status("VmHWM") if peak_reset else None
+            # 无法读取峰值时以结束时的增量作为下限
+            peak_delta = max(0, (peak if peak is not None else rss) - rss_start)
+
+        # 执行后新绑定到命名空间的DataFrame视为本段代码创建
+        created = [df for df in _dataframes(self.shell.user_ns) if id(df) not in frame_ids]
+        frame_bytes = 0
+        for df in created:
+            try:
+                frame_bytes += int(df.memory_usage(index=True, deep=False).sum())
+            except Exception:
+                pass
+
+        profile = {
+            "wall_time": round(wall_time, 4),
+            "cpu_time": round(cpu_time, 4),
+            "rss": rss,
+            "rss_delta": rss - rss_start if rss is not None and rss_start is not None else None,
+            "peak_rss_delta": peak_delta,
+            "dataframes_created": len(created),
+            "dataframes_bytes": frame_bytes,
+        }
+        from IPython.display import publish_display_data
+        publish_display_data({PROFILE_MIME: profile})
+
+
+# 检查点中不保存的IPython内部名称
+_CHECKPOINT_SKIP = {"In", "Out", "exit", "quit", "get_ipython"}
+_IDENTIFIER = re.compile(r"[^\W\d]\w*")
+
+
+def _user_variables(shell):
+    """用户在命名空间中定义的变量，不包括模块、函数、类和IPython内部名称"""
+    hidden = getattr(shell, "user_ns_hidden", {})
+    for name, value in list(shell.user_ns.items()):
+        if name.startswith("_") or name in _CHECKPOINT_SKIP or name in hidden:
+            continue
+        if inspect.ismodule(value) or inspect.isclass(value) or inspect.isroutine(value):
+            continue
+        yield name, value
+
+
+def _write_atomic(path, write):
+    """先写临时文件再重命名，中途失败不会留下不完整的文件"""
+    tmp_path = path + ".tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _frame_hash(df):
+    """DataFrame内容的哈希，包括列名、类型和索引"""
+    pd = sys.modules["pandas"]
+    digest = hashlib.sha256()
+    digest.update(repr((list(df.columns), [str(t) for t in df.dtypes], df.shape)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+class Checkpointer:
+    """把用户命名空间中的变量增量保存到磁盘，并在新内核中按需恢复
+
+    DataFrame保存为Parquet，其他可以pickle的变量保存为pickle；模块、函数和类不保存。
+    每个变量记录内容哈希，只有内容变化的变量才重新写入。
+    恢复时只读取清单，变量在第一次被代码引用时才从磁盘加载。
+    """
+
+    def __init__(self, shell):
+        self.shell = shell
+        # 尚未加载的变量名 -> 清单条目
+        self.pending = {}
+        self.directory = None
+        self._hooked = False
+
+    def _variables(self):
+        return _user_variables(self.shell)
+
+    @staticmethod
+    def _read_manifest(directory):
+        try:
+            with open(os.path.join(directory, "manifest.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, directory, name, value, old):
+        """保存一个变量，内容未变化时直接返回原来的清单条目"""
+        if isinstance(value, SpilledFrame):
+            # 已写入磁盘的DataFrame直接链接到检查点，无需重新加载
+            if old and old["hash"] == value._hash and os.path.exists(os.path.join(directory, old["file"])):
+                return old, False
+            file = os.path.join("vars", name + ".parquet")
+            _write_atomic(os.path.join(directory, file), value._copy_to)
+            return {"file": file, "format": "parquet", "hash": value._hash, "type": "DataFrame",
+                    "bytes": os.path.getsize(os.path.join(directory, file))}, True
+
+        pd = sys.modules.get("pandas")
+        if pd is not None and isinstance(value, pd.DataFrame):
+            try:
+                digest = _frame_hash(value)
+                if old and old["hash"] == digest and os.path.exists(os.path.join(directory, old["file"])):
+                    return old, False
+                file = os.path.join("vars", name + ".parquet")
+                _write_atomic(os.path.join(directory, file), lambda path: value.to_parquet(path))
+                return {"file": file, "format": "parquet", "hash": digest, "type": "DataFrame",
+                        "bytes": os.path.getsize(os.path.join(directory, file))}, True
+            except Exception:
+                # 列名不是字符串或包含无法转换为Arrow的对象时改用pickle
+                pass
+
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        digest = hashlib.sha256(data).hexdigest()
+        if old and old["hash"] == digest and os.path.exists(os.path.join(directory, old["file"])):
+            return old, False
+        file = os.path.join("vars", name + ".pkl")
+
+        def write(path):
+            with open(path, "wb") as f:
+                f.write(data)
+        _write_atomic(os.path.join(directory, file), write)
+        return {"file": file, "format": "pickle", "hash": digest, "type": type(value).__name__,
+                "bytes": len(data)}, True
+
+    def checkpoint(self, directory):
+        """把变化的变量写入检查点目录，返回保存的统计信息"""
+        start = time.perf_counter()
+        os.makedirs(os.path.join(directory, "vars"), exist_ok=True)
+        manifest = self._read_manifest(directory)
+        current, saved, skipped = {}, [], []
+        for name, value in self._variables():
+            try:
+                entry, changed = self._save(directory, name, value, manifest.get(name))
+            except Exception:
+                skipped.append(name)
+                continue
+            current[name] = entry
+            if changed:
+                saved.append(name)
+        # 尚未加载的变量没有变化，保留原来的文件
+        for name in self.pending:
+            if name not in current and name in manifest:
+                current[name] = manifest[name]
+        removed = [name for name in manifest if name not in current]
+        for name, entry in manifest.items():
+            if name not in current or current[name]["file"] != entry["file"]:
+                try:
+                    os.remove(os.path.join(directory, entry["file"]))
+                except OSError:
+                    pass
+
+        def write(path):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(current, f, ensure_ascii=False)
+        _write_atomic(os.path.join(directory, "manifest.json"), write)
+        return {
+            "saved": saved,
+            "unchanged": len(current) - len(saved),
+            "removed": removed,
+            "skipped": skipped,
+            "bytes": sum(entry["bytes"] for entry in current.values()),
+            "duration": round(time.perf_counter() - start, 4),
+        }
+
+    def restore(self, directory):
+        """登记检查点中的变量，在第一次被引用时加载"""
+        self.directory = directory
+        manifest = self._read_manifest(directory)
+        self.pending = {name: entry for name, entry in manifest.items() if name not in self.shell.user_ns}
+        if self.pending and not self._hooked:
+            self.shell.events.register("pre_run_cell", self.pre_run_cell)
+            self._hooked = True
+        return sorted(self.pending)
+
+    def load(self, names=None):
+        """加载尚未加载的变量，names为None时全部加载"""
+        loaded = []
+        for name in list(self.pending if names is None else names):
+            entry = self.pending.pop(name, None)
+            if entry is None:
+                continue
+            path = os.path.join(self.directory, entry["file"])
+            try:
+                if entry["format"] == "parquet":
+                    import pandas as pd
+                    with _suspend_optimizer():
+                        value = pd.read_parquet(path)
+                else:
+                    with open(path, "rb") as f:
+                        value = pickle.load(f)
+            except Exception as e:
+                print(f"恢复变量 {name} 失败: {e}", file=sys.stderr)
+                continue
+            self.shell.user_ns[name] = value
+            loaded.append(name)
+        return loaded
+
+    def pre_run_cell(self, info):
+        # 代码中出现的名称如果是尚未加载的变量，在执行前加载
+        if self.pending:
+            self.load(set(_IDENTIFIER.findall(info.raw_cell or "")) & set(self.pending))
+
+
+def object_size(value):
+    """对象占用的内存（字节），DataFrame和Series包括object列中字符串的实际大小"""
+    try:
+        pd = sys.modules.get("pandas")
+        if pd is not None:
+            if isinstance(value, pd.DataFrame):
+                return int(value.memory_usage(index=True, deep=True).sum())
+            if isinstance(value, (pd.Series, pd.Index)):
+                return int(value.memory_usage(deep=True))
+        nbytes = getattr(value, "nbytes", None)
+        if isinstance(nbytes, int):
+            return nbytes
+        return sys.getsizeof(value)
+    except Exception:
+        return 0
+
+
+def _describe(value):
+    shape = getattr(value, "shape", None)
+    return {
+        "type": type(value).__name__,
+        "shape": list(shape) if isinstance(shape, tuple) else None,
+    }
+
+
+class SpilledFrame:
+    """已写入Parquet临时文件的DataFrame的占位对象
+
+    代码中出现变量名时在执行前直接换回DataFrame；通过其他方式访问（例如之前定义的函数中引用）时，
+    第一次访问属性或运算时加载并替换命名空间中的自身。
+    临时文件没有文件名（Windows上关闭时删除），内核进程以任何方式退出后都不会留下文件。
+    """
+
+    __slots__ = ("_watchdog", "_name", "_file", "_hash", "_bytes", "_value")
+
+    def __init__(self, watchdog, name, file, digest, size):
+        self._watchdog = watchdog
+        self._name = name
+        self._file = file
+        self._hash = digest
+        self._bytes = size
+        self._value = None
+
+    def _copy_to(self, path):
+        self._file.seek(0)
+        with open(path, "wb") as f:
+            shutil.copyfileobj(self._file, f)
+
+    def _load(self):
+        if self._value is None:
+            self._value = self._watchdog.reload(self._name, self)
+        return self._value
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+
+def _forward(method_name):
+    def method(self, *args, **kwargs):
+        return getattr(self._load(), method_name)(*args, **kwargs)
+    method.__name__ = method_name
+    return method
+
+
+for _method in (
+    "__getitem__", "__setitem__", "__delitem__", "__len__", "__iter__", "__contains__", "__repr__", "__str__",
+    "__array__", "__bool__", "__eq__", "__ne__", "__lt__", "__le__", "__gt__", "__ge__", "__neg__", "__invert__",
+    "__add__", "__radd__", "__sub__", "__rsub__", "__mul__", "__rmul__", "__truediv__", "__rtruediv__",
+    "__floordiv__", "__mod__", "__pow__", "__and__", "__or__", "__xor__",
+):
+    setattr(SpilledFrame, _method, _forward(_method))
+del _method
+
+
+class MemoryWatchdog:
+    """跟踪变量最近一次被代码引用的时间，内存占用过高时报告最大的变量，并可把不常用的DataFrame写入磁盘"""
+
+    def __init__(self, shell):
+        self.shell = shell
+        # 已执行的代码段数，作为变量使用时间的计数
+        self.cell = 0
+        # 变量名 -> 最近一次出现在代码中的序号
+        self.last_used = {}
+        # 已写入磁盘的变量名 -> 占位对象
+        self.spilled = {}
+
+    def pre_run_cell(self, info):
+        self.cell += 1
+        names = set(_IDENTIFIER.findall(info.raw_cell or ""))
+        for name in names:
+            self.last_used[name] = self.cell
+        for name in names & set(self.spilled):
+            self.reload(name)
+
+    def largest(self, top):
+        """按内存占用排序的最大的若干变量"""
+        sizes = []
+        for name, value in _user_variables(self.shell):
+            if isinstance(value, SpilledFrame):
+                continue
+            sizes.append(dict(name=name, bytes=object_size(value), **_describe(value)))
+        sizes.sort(key=lambda item: item["bytes"], reverse=True)
+        return sizes[:top]
+
+    def reload(self, name, proxy=None):
+        """从磁盘加载写出的DataFrame并放回命名空间"""
+        # 占位对象重载了__bool__等运算，只能用is判断
+        spilled = self.spilled.pop(name, None)
+        if spilled is not None:
+            proxy = spilled
+        if proxy is None:
+            return self.shell.user_ns.get(name)
+        if proxy._value is None:
+            import pandas as pd
+            proxy._file.seek(0)
+            with _suspend_optimizer():
+                proxy._value = pd.read_parquet(proxy._file)
+            proxy._file.close()
+        if self.shell.user_ns.get(name) is proxy:
+            self.shell.user_ns[name] = proxy._value
+        return proxy._value
+
+    def _drop_output_references(self, value):
+        """删除IPython输出历史中对该对象的引用，否则写出后内存不会释放"""
+        output = self.shell.user_ns.get("Out")
+        if isinstance(output, dict):
+            for key in [key for key, item in output.items() if item is value]:
+                del output[key]
+        for name in ("_", "__", "___"):
+            if self.shell.user_ns.get(name) is value:
+                self.shell.user_ns[name] = None
+        displayhook = getattr(self.shell, "displayhook", None)
+        for attr in ("_", "__", "___"):
+            if getattr(displayhook, attr, None) is value:
+                setattr(displayhook, attr, None)
+
+    def spill(self, directory, target_bytes, idle_cells):
+        """把最近idle_cells段代码中没有用到的DataFrame按大小依次写入磁盘，直到释放target_bytes"""
+        pd = sys.modules.get("pandas")
+        if pd is None:
+            return []
+        candidates = [
+            (name, value, object_size(value)) for name, value in _user_variables(self.shell)
+            if isinstance(value, pd.DataFrame) and self.cell - self.last_used.get(name, 0) >= idle_cells
+        ]
+        candidates.sort(key=lambda item: item[2], reverse=True)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        import tempfile
+        spilled, freed = [], 0
+        for name, value, size in candidates:
+            if freed >= target_bytes:
+                break
+            file = tempfile.TemporaryFile(prefix="spill-", suffix=".parquet", dir=directory or None)
+            try:
+                digest = _frame_hash(value)
+                value.to_parquet(file)
+            except Exception:
+                # 包含无法转换为Arrow的对象，不能写出
+                file.close()
+                continue
+            proxy = SpilledFrame(self, name, file, digest, size)
+            self.shell.user_ns[name] = proxy
+            self.spilled[name] = proxy
+            self._drop_output_references(value)
+            spilled.append({"name": name, "bytes": size})
+            freed += size
+        del candidates
+        gc.collect()
+        return spilled
+
+
+_watchdog = None
+
+
+def _get_watchdog():
+    global _watchdog
+    if _watchdog is None:
+        from IPython import get_ipython
+        _watchdog = MemoryWatchdog(get_ipython())
+    return _watchdog
+
+
+def memory_report(soft_limit, hard_limit=None, spill=False, spill_dir=None, idle_cells=3, top=5):
+    """检查内存占用，超过软限制时报告最大的变量，超过硬限制时可把不常用的DataFrame写入磁盘
+
+    Args:
+        soft_limit: 软限制（字节）
+        hard_limit: 硬限制（字节），为None时不写出
+        spill: 超过硬限制时是否写出不常用的DataFrame
+        spill_dir: 写出DataFrame的临时文件所在目录，为None时使用系统临时目录
+        idle_cells: 最近多少段代码中没有用到的DataFrame视为不常用
+        top: 报告的变量数
+    """
+    watchdog = _get_watchdog()
+    rss = current_rss()
+    report = {"rss": rss, "spilled_variables": sorted(watchdog.spilled)}
+    if rss is None or rss < soft_limit:
+        _reply(report)
+        return
+    report["largest"] = watchdog.largest(top)
+    if spill and hard_limit and rss >= hard_limit:
+        report["spilled"] = watchdog.spill(spill_dir, rss - soft_limit, idle_cells)
+        report["rss_after"] = current_rss()
+        report["spilled_variables"] = sorted(watchdog.spilled)
+    _reply(report)
+
+
+def _format_size(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.2f}GB"
+
+
+# 年份在前的日期或日期时间字符串，例如2024-01-31、2024/1/31 08:00:00
+_DATE_LIKE = re.compile(r"\d{4}[-/.]\d{1,2}[-/.]\d{1,2}([ T]\d{1,2}:\d{2}(:\d{2}(\.\d+)?)?)?")
+
+
+class DataFrameOptimizer:
+    """压缩pandas读取函数返回的DataFrame的内存
+
+    替换pandas的读取函数，返回的DataFrame不小于min_bytes时逐列优化：行数不少于category_min_rows、
+    不同取值比例不超过category_ratio的字符串列转为category；启用parse_dates时日期格式的字符串列解析为日期时间；
+    启用downcast_ints时取值范围允许的64位整数列降为32位，启用downcast_floats时浮点列在不损失精度时降为float32。
+    优化前后的内存占用和类型改变的列输出到标准输出，之后的代码可以据此还原类型。
+    """
+
+    READERS = ("read_csv", "read_table", "read_fwf", "read_excel", "read_json", "read_parquet", "read_feather",
+               "read_sql", "read_sql_query", "read_sql_table")
+    # 输出中最多列出的列数
+    MAX_REPORTED_COLUMNS = 8
+
+    def __init__(self, min_bytes=10 * 1024 * 1024, category_ratio=0.05, parse_dates=False, downcast_floats=False,
+                 downcast_ints=False, category_min_rows=1000):
+        """
+        Args:
+            min_bytes: 只优化不小于该大小的DataFrame（字节）
+            category_ratio: 字符串列的不同取值数不超过行数的该比例时转为category，为0时不转换
+            parse_dates: 是否把日期格式的字符串列解析为日期时间，解析后比较和序列化的结果与字符串不同
+            downcast_floats: 是否把能用float32精确表示的浮点列降为float32，
+                之后的求和等计算也以float32进行，结果只有约7位有效数字
+            downcast_ints: 是否把取值在32位范围内的64位整数列降为32位，之后的逐元素运算以32位进行，
+                结果超出范围时溢出。不会降到int8、int16，避免普通的乘法也溢出
+            category_min_rows: 行数少于该值的DataFrame不转换category，行数太少时无法判断是否为低基数列
+        """
+        self.min_bytes = min_bytes
+        self.category_ratio = category_ratio
+        self.parse_dates = parse_dates
+        self.downcast_floats = downcast_floats
+        self.downcast_ints = downcast_ints
+        self.category_min_rows = category_min_rows
+        self.patched = False
+        self._suspended = 0
+
+    def settings(self):
+        return (self.min_bytes, self.category_ratio, self.parse_dates, self.downcast_floats, self.downcast_ints,
+                self.category_min_rows)
+
+    @contextlib.contextmanager
+    def suspended(self):
+        """期间读取的DataFrame不做优化，例如读取已优化过的镜像"""
+        self._suspended += 1
+        try:
+            yield
+        finally:
+            self._suspended -= 1
+
+    def patch(self, *args):
+        """pandas导入后替换其读取函数"""
+        pd = sys.modules.get("pandas")
+        if self.patched or pd is None or not hasattr(pd, "read_csv"):
+            return
+        for name in self.READERS:
+            reader = getattr(pd, name, None)
+            if reader is not None:
+                setattr(pd, name, self._wrap(name, reader))
+        self.patched = True
+
+    def _wrap(self, name, reader):
+        @functools.wraps(reader)
+        def read(*args, **kwargs):
+            result = reader(*args, **kwargs)
+            if self._suspended:
+                return result
+            source = args[0] if args else next(iter(kwargs.values()), None)
+            label = f"{name}({os.path.basename(os.fspath(source))!r})" if isinstance(source, (str, os.PathLike)) else name
+            frames = result.items() if isinstance(result, dict) else [(None, result)]
+            for sheet, frame in frames:
+                try:
+                    self.optimize(frame, label if sheet is None else f"{label}[{sheet!r}]")
+                except Exception:
+                    # 优化失败时返回原样的读取结果
+                    pass
+            return result
+        return read
+
+    def optimize(self, df, label="DataFrame"):
+        """原地优化DataFrame的列类型，返回优化前后的内存占用，DataFrame较小或没有可优化的列时返回None"""
+        pd = sys.modules["pandas"]
+        if not isinstance(df, pd.DataFrame):
+            return None
+        before = object_size(df)
+        if before < self.min_bytes:
+            return None
+        changes = []
+        # 改变了取值语义的列（category、日期时间），全部列出
+        retyped = []
+        for index in range(df.shape[1]):
+            column = df.iloc[:, index]
+            converted = self._optimize_column(pd, column)
+            if converted is not None:
+                df.isetitem(index, converted)
+                changes.append(f"{df.columns[index]}: {column.dtype}→{converted.dtype}")
+                if converted.dtype.kind not in "iuf":
+                    retyped.append(f"{df.columns[index]!r}")
+        if not changes:
+            return None
+        after = object_size(df)
+        shown = "、".join(changes[:self.MAX_REPORTED_COLUMNS])
+        if len(changes) > self.MAX_REPORTED_COLUMNS:
+            shown += f"等{len(changes)}列"
+        print(f"[内存优化] {label}: {_format_size(before)} → {_format_size(after)}"
+              f"（节省{(before - after) / before:.0%}），{shown}")
+        if retyped:
+            print(f"[内存优化] 列{'、'.join(retyped)}已不是字符串类型，需要字符串时用df[列].astype(str)转换")
+        return {"before": before, "after": after, "columns": changes}
+
+    def _optimize_column(self, pd, column):
+        types = pd.api.types
+        dtype = column.dtype
+        if isinstance(dtype, pd.CategoricalDtype) or types.is_bool_dtype(dtype):
+            return None
+        if dtype.kind in "iu":
+            if not self.downcast_ints or dtype.itemsize <= 4 or column.empty:
+                return None
+            import numpy as np
+            target = "int32" if dtype.kind == "i" else "uint32"
+            info = np.iinfo(target)
+            if not (info.min <= column.min() and column.max() <= info.max):
+                return None
+            if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+                # 可空整数类型保持可空
+                target = {"int32": "Int32", "uint32": "UInt32"}[target]
+            return column.astype(target)
+        if dtype == "float64" and self.downcast_floats:
+            converted = column.astype("float32")
+            # 只在所有取值都能用float32精确表示时降低精度
+            if ((converted.astype("float64") == column) | column.isna()).all():
+                return converted
+            return None
+        if not (types.is_object_dtype(dtype) or types.is_string_dtype(dtype)):
+            return None
+        values = column.dropna()
+        if values.empty or types.infer_dtype(values.iloc[:1000], skipna=True) != "string":
+            return None
+        if self.parse_dates and values.iloc[:1000].str.fullmatch(_DATE_LIKE).all():
+            try:
+                # 所有取值都按同一格式解析成功才转换
+                return pd.to_datetime(column, errors="raise")
+            except (ValueError, TypeError, OverflowError):
+                pass
+        if (self.category_ratio and len(column) >= self.category_min_rows
+                and values.nunique() <= self.category_ratio * len(column)):
+            return column.astype("category")
+        return None
+
+
+_optimizer = None
+
+
+def _optimizer_settings():
+    """DataFrame优化的设置，未启用时为None；load()的缓存键包含该设置"""
+    return _optimizer.settings() if _optimizer is not None else None
+
+
+def _suspend_optimizer():
+    return _optimizer.suspended() if _optimizer is not None else contextlib.nullcontext()
+
+
+def optimize(df):
+    """立即优化DataFrame的内存，不受大小阈值限制，返回优化前后的内存占用"""
+    optimizer = DataFrameOptimizer(0, *(_optimizer.settings()[1:] if _optimizer is not None else ()))
+    return optimizer.optimize(df)
+
+
+# 扩展名 -> (pandas读取函数, 默认参数)
+_READERS = {
+    ".csv": ("read_csv", {}),
+    ".txt": ("read_csv", {}),
+    ".tsv": ("read_csv", {"sep": "\t"}),
+    ".xlsx": ("read_excel", {}),
+    ".xlsm": ("read_excel", {}),
+    ".xls": ("read_excel", {}),
+    ".json": ("read_json", {}),
+    ".jsonl": ("read_json", {"lines": True}),
+    ".parquet": ("read_parquet", {}),
+    ".feather": ("read_feather", {}),
+    ".pkl": ("read_pickle", {}),
+    ".pickle": ("read_pickle", {}),
+}
+# 本身读取很快的格式，不保存镜像
+_NO_MIRROR = {"read_parquet", "read_feather", "read_pickle"}
+# 未指定编码的文本文件按UTF-8解码失败时依次尝试的编码
+_FALLBACK_ENCODINGS = ("gb18030",)
+
+
+def _stable_repr(value):
+    """只由基本类型组成的值的repr，作为缓存键；包含函数等repr不稳定的对象时返回None"""
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return repr(value)
+    if isinstance(value, os.PathLike):
+        return repr(os.fspath(value))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_stable_repr(item) for item in value]
+        if None in items:
+            return None
+        if isinstance(value, (set, frozenset)):
+            items.sort()
+        return f"{type(value).__name__}({', '.join(items)})"
+    if isinstance(value, dict):
+        items = [(_stable_repr(k), _stable_repr(v)) for k, v in value.items()]
+        if any(k is None or v is None for k, v in items):
+            return None
+        return "{" + ", ".join(f"{k}: {v}" for k, v in sorted(items)) + "}"
+    return None
+
+
+class DataLoader:
+    """带缓存的数据文件读取
+
+    读取结果按文件路径、修改时间、大小和读取参数缓存：同一内核中再次读取时直接返回副本；
+    CSV、Excel等解析较慢的文件在缓存目录中保存Parquet镜像（无法转换为Arrow时使用pickle），
+    文件未变化时之后的内核直接读取镜像。文件变化后旧的镜像被替换，镜像总大小超过上限时删除最久未使用的镜像。
+    读取参数包含函数等无法稳定作为缓存键的对象时不使用缓存。
+    """
+
+    def __init__(self, cache_dir=None, mirror=True, memo_bytes=512 * 1024 * 1024, mirror_bytes=1024 * 1024 * 1024):
+        """
+        Args:
+            cache_dir: 镜像目录，为None时使用当前工作目录下的.autoanalyze_cache
+            mirror: 是否保存镜像
+            memo_bytes: 内核中缓存的读取结果的内存上限（字节）
+            mirror_bytes: 镜像目录的总大小上限（字节）
+        """
+        self.cache_dir = cache_dir
+        self.mirror = mirror
+        self.memo_bytes = memo_bytes
+        self.mirror_bytes = mirror_bytes
+        # 缓存键 -> (读取结果, 占用内存)，按最近使用顺序排列
+        self.memo = {}
+        self.stats = {"memo_hits": 0, "mirror_hits": 0, "parsed": 0, "uncached": 0}
+
+    def load(self, path, **kwargs):
+        import pandas as pd
+        path = os.path.abspath(os.path.expanduser(os.fspath(path)))
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in _READERS:
+            raise ValueError(f"load不支持{ext or '无扩展名'}文件，请直接使用pandas的读取函数")
+        reader, defaults = _READERS[ext]
+        options = dict(defaults, **kwargs)
+        stat = os.stat(path)
+        described = _stable_repr(options)
+        if described is None:
+            # converters、usecols等参数为函数时每次的repr都不同，缓存只会不断产生新的镜像
+            self.stats["uncached"] += 1
+            self.stats["parsed"] += 1
+            return self._parse(pd, reader, path, options)
+        # 镜像保存的是优化后的DataFrame，优化设置变化时重新解析
+        source = hashlib.sha256(repr((path, reader, described, _optimizer_settings())).encode("utf-8")).hexdigest()[:24]
+        stamp = f"{stat.st_mtime_ns}-{stat.st_size}"
+        key = (source, stamp)
+
+        if key in self.memo:
+            value = self.memo.pop(key)
+            self.memo[key] = value
+            self.stats["memo_hits"] += 1
+            return self._copy(value[0])
+
+        mirror = self.mirror and reader not in _NO_MIRROR
+        value = self._read_mirror(pd, source, stamp) if mirror else None
+        if value is not None:
+            self.stats["mirror_hits"] += 1
+        else:
+            value = self._parse(pd, reader, path, options)
+            self.stats["parsed"] += 1
+            if mirror:
+                try:
+                    self._write_mirror(source, stamp, value)
+                except OSError:
+                    # 缓存目录不可写时只在内核中缓存
+                    pass
+        self._remember(key, value)
+        return self._copy(value)
+
+    def _directory(self):
+        return self.cache_dir or os.path.join(os.getcwd(), ".autoanalyze_cache")
+
+    @staticmethod
+    def _parse(pd, reader, path, options):
+        options = dict(options)
+        if reader == "read_excel" and "engine" not in options and path.endswith((".xlsx", ".xlsm")):
+            import importlib.util
+            # calamine解析xlsx比openpyxl快一个数量级
+            if importlib.util.find_spec("python_calamine") is not None:
+                options["engine"] = "calamine"
+        read = getattr(pd, reader)
+        if reader != "read_csv" or "encoding" in options:
+            return read(path, **options)
+        for encoding in (None,) + _FALLBACK_ENCODINGS:
+            try:
+                return read(path, **options) if encoding is None else read(path, encoding=encoding, **options)
+            except UnicodeDecodeError:
+                if encoding == _FALLBACK_ENCODINGS[-1]:
+                    raise
+
+    def _read_mirror(self, pd, source, stamp):
+        base = os.path.join(self._directory(), f"{source}-{stamp}")
+        try:
+            if os.path.exists(base + ".parquet"):
+                # 更新修改时间，清理镜像时按最近使用的顺序保留
+                os.utime(base + ".parquet")
+                with _suspend_optimizer():
+                    return pd.read_parquet(base + ".parquet")
+            if os.path.exists(base + ".pkl"):
+                os.utime(base + ".pkl")
+                with open(base + ".pkl", "rb") as f:
+                    return pickle.load(f)
+        except Exception:
+            # 镜像损坏或缺少读取Parquet的库时重新解析
+            pass
+        return None
+
+    def _write_mirror(self, source, stamp, value):
+        directory = self._directory()
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{source}-{stamp}")
+        written = None
+        if isinstance(value, sys.modules["pandas"].DataFrame):
+            try:
+                _write_atomic(base + ".parquet", lambda path: value.to_parquet(path))
+                written = base + ".parquet"
+            except Exception:
+                # 列名不是字符串或包含无法转换为Arrow的对象时改用pickle
+                pass
+        if written is None:
+            def write(path):
+                with open(path, "wb") as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            _write_atomic(base + ".pkl", write)
+            written = base + ".pkl"
+        # 删除同一文件修改前的镜像
+        for name in os.listdir(directory):
+            if name.startswith(source + "-") and os.path.join(directory, name) != written:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+        self._prune_mirrors(directory, written)
+
+    def _prune_mirrors(self, directory, keep):
+        """镜像总大小超过上限时按修改时间删除最久未使用的镜像，刚写入的镜像保留"""
+        files = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if not name.endswith((".parquet", ".pkl")) or path == keep:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files) + os.path.getsize(keep)
+        for _, size, path in sorted(files):
+            if total <= self.mirror_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def _remember(self, key, value):
+        size = sum(object_size(frame) for frame in value.values()) if isinstance(value, dict) else object_size(value)
+        if size > self.memo_bytes:
+            return
+        self.memo[key] = (value, size)
+        total = sum(entry[1] for entry in self.memo.values())
+        for old in list(self.memo):
+            if total <= self.memo_bytes:
+                break
+            total -= self.memo.pop(old)[1]
+
+    @staticmethod
+    def _copy(value):
+        # 返回副本，代码修改结果时不影响缓存
+        if isinstance(value, dict):
+            return {name: frame.copy() for name, frame in value.items()}
+        return value.copy()
+
+
+_loader = None
+
+
+def _get_loader():
+    global _loader
+    if _loader is None:
+        _loader = DataLoader()
+    return _loader
+
+
+def load(path, **kwargs):
+    """读取数据文件为DataFrame，重复读取未变化的文件时使用缓存
+
+    根据扩展名选择pandas的读取函数：csv/txt/tsv、xlsx/xlsm/xls、json/jsonl、parquet、feather、pkl；
+    其他参数原样传给读取函数，例如sheet_name、usecols、dtype。未指定编码的CSV在UTF-8解码失败时自动尝试GB18030。
+
+    Args:
+        path: 文件路径，相对路径相对于工作目录
+    """
+    return _get_loader().load(path, **kwargs)
+
+
+_checkpointer = None
+
+
+def _get_checkpointer():
+    global _checkpointer
+    if _checkpointer is None:
+        from IPython import get_ipython
+        _checkpointer = Checkpointer(get_ipython())
+    return _checkpointer
+
+
+def save_checkpoint(directory):
+    """增量保存命名空间中的变量"""
+    _reply(_get_checkpointer().checkpoint(directory))
+
+
+def restore_checkpoint(directory):
+    """从检查点按需恢复变量"""
+    _reply({"variables": _get_checkpointer().restore(directory)})
+
+
+def load_all():
+    """立即加载检查点中所有尚未加载的变量"""
+    return _get_checkpointer().load()
+
+
+def install(shell, profile=True, watch_memory=False, data_cache_dir=None, data_mirror=True, optimize=None,
+            data_cache_bytes=1024 * 1024 * 1024):
+    """在内核中注册运行时钩子
+
+    Args:
+        shell: IPython的InteractiveShell
+        profile: 是否统计每段代码的执行信息
+        watch_memory: 是否跟踪变量的使用情况，用于内存过高时报告和写出不常用的DataFrame
+        data_cache_dir: load()保存Parquet镜像的目录，为None时使用工作目录下的.autoanalyze_cache
+        data_mirror: load()是否保存Parquet镜像
+        data_cache_bytes: Parquet镜像目录的总大小上限（字节）
+        optimize: DataFrameOptimizer的参数，为None时不优化pandas读取的DataFrame
+    """
+    global _loader, _optimizer
+    _loader = DataLoader(data_cache_dir, data_mirror, mirror_bytes=data_cache_bytes)
+    if optimize is not None:
+        _optimizer = DataFrameOptimizer(**optimize)
+        _optimizer.patch()
+        # pandas在之后的代码中才导入时再替换读取函数
+        shell.events.register("pre_run_cell", _optimizer.patch)
+    if profile:
+        profiler = CellProfiler(shell)
+        shell.events.register("pre_run_cell", profiler.pre_run_cell)
+        shell.events.register("post_run_cell", profiler.post_run_cell)
+    if watch_memory:
+        shell.events.register("pre_run_cell", _get_watchdog().pre_run_cell)
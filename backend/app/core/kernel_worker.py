@@ -0,0 +1,175 @@
+"""内核工作节点
+
+在工作节点上作为独立脚本运行，只依赖标准库和jupyter_client，不需要app包：
+
+    python kernel_worker.py --port 9500 --token <令牌> --kernel-ip 0.0.0.0 --advertise-host 10.0.0.5
+
+工作节点按服务端的请求在本机启动和管理内核，服务端拿到连接信息后直接通过Jupyter协议（ZMQ）与内核通信，
+代码执行和输出不经过工作节点。工作目录和检查点目录需要在服务端和工作节点上以相同路径可见（例如共享存储）。
+
+请求和响应都是一行JSON，每个请求都需要携带token：
+    {"op": "load"} -> 负载信息
+    {"op": "start", "kernel_id": ..., "cwd": ..., "limits": [cpu, memory_mb]} -> {"connection_info": {...}}
+    {"op": "poll", "kernel_id": ...} -> {"returncode": null或退出码}
+    {"op": "signal", "kernel_id": ..., "signum": ...} -> {}
+    {"op": "remove", "kernel_id": ...} -> {}  关闭内核并清理连接文件
+"""
+import os
+import sys
+import hmac
+import json
+import asyncio
+import argparse
+import functools
+import signal
+import socket
+from jupyter_client import AsyncKernelManager
+
+
+def _limit_resources(cpu_time, memory_mb):
+    import resource
+    if cpu_time:
+        # 软限制触发SIGXCPU，硬限制留出余量
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_time, cpu_time + 5))
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _meminfo():
+    """读取/proc/meminfo中的总内存和可用内存（字节），非Linux系统返回(None, None)"""
+    values = {}
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                name, value = line.split(":", 1)
+                values[name] = int(value.split()[0]) * 1024
+    except (OSError, ValueError):
+        return None, None
+    return values.get("MemTotal"), values.get("MemAvailable")
+
+
+class KernelWorker:
+    """在本机启动和管理内核的工作节点"""
+
+    def __init__(self, token, kernel_ip="127.0.0.1", advertise_host=None, max_kernels=0):
+        self.token = token or ""
+        self.kernel_ip = kernel_ip
+        self.advertise_host = advertise_host or (kernel_ip if kernel_ip != "0.0.0.0" else socket.gethostname())
+        self.max_kernels = max_kernels
+        # 内核ID -> 内核管理器
+        self.kernels = {}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not hmac.compare_digest(str(request.get("token", "")), self.token):
+                        response = {"error": "invalid token"}
+                    else:
+                        response = await getattr(self, "op_" + request.get("op", ""), self.op_unknown)(request)
+                except Exception as e:
+                    response = {"error": str(e)}
+                writer.write((json.dumps(response) + "\n").encode("utf-8"))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def op_unknown(self, request):
+        return {"error": f"unknown op: {request.get('op')}"}
+
+    async def op_load(self, request):
+        mem_total, mem_available = _meminfo()
+        return {
+            "host": self.advertise_host,
+            "kernels": len(self.kernels),
+            "max_kernels": self.max_kernels,
+            "cpu_count": os.cpu_count() or 1,
+            "load_avg": os.getloadavg()[0] if hasattr(os, "getloadavg") else None,
+            "mem_total": mem_total,
+            "mem_available": mem_available,
+        }
+
+    async def op_start(self, request):
+        kernel_id = request["kernel_id"]
+        if kernel_id in self.kernels:
+            # 重启时先移除原来的内核
+            await self.op_remove(request)
+        elif self.max_kernels and len(self.kernels) >= self.max_kernels:
+            return {"error": f"工作节点内核数已达上限（{self.max_kernels}个）"}
+        km = AsyncKernelManager(kernel_name="python3", ip=self.kernel_ip)
+        km.kernel_id = kernel_id
+        kwargs = {}
+        cpu_time, memory_mb = request.get("limits") or (None, None)
+        if (cpu_time or memory_mb) and sys.platform != "win32":
+            kwargs["preexec_fn"] = functools.partial(_limit_resources, cpu_time, memory_mb)
+        cwd = request.get("cwd")
+        await km.start_kernel(cwd=cwd if cwd and os.path.isdir(cwd) else None, **kwargs)
+        self.kernels[kernel_id] = km
+        info = km.get_connection_info(session=False)
+        info["key"] = info["key"].decode("utf-8") if isinstance(info["key"], bytes) else info["key"]
+        info["ip"] = self.advertise_host
+        return {"connection_info": info}
+
+    async def op_poll(self, request):
+        km = self.kernels.get(request["kernel_id"])
+        if km is None or km.provisioner is None:
+            return {"returncode": 0}
+        return {"returncode": await km.provisioner.poll()}
+
+    async def op_signal(self, request):
+        km = self.kernels.get(request["kernel_id"])
+        if km is not None and km.provisioner is not None:
+            await km.provisioner.send_signal(int(request["signum"]))
+        return {}
+
+    async def op_remove(self, request):
+        km = self.kernels.pop(request["kernel_id"], None)
+        if km is not None:
+            try:
+                await km.shutdown_kernel(now=True)
+            except Exception:
+                pass
+        return {}
+
+    async def shutdown(self):
+        for kernel_id in list(self.kernels):
+            await self.op_remove({"kernel_id": kernel_id})
+
+
+async def serve(host, port, worker):
+    server = await asyncio.start_server(worker.handle, host, port)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        # 退出前关闭本节点上的所有内核
+        await worker.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AutoAnalyze内核工作节点")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=9500, help="监听端口")
+    parser.add_argument("--token", default=os.environ.get("AUTOANALYZE_WORKER_TOKEN", ""), help="访问令牌")
+    parser.add_argument("--kernel-ip", default="127.0.0.1", help="内核绑定的地址")
+    parser.add_argument("--advertise-host", default=None, help="服务端连接内核使用的地址")
+    parser.add_argument("--max-kernels", type=int, default=0, help="最多运行的内核数，0表示不限制")
+    args = parser.parse_args()
+    worker = KernelWorker(args.token, args.kernel_ip, args.advertise_host, args.max_kernels)
+    asyncio.run(serve(args.host, args.port, worker))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+import os
+import time
+import asyncio
+from collections import deque
+from typing import Dict, List, Callable, Awaitable, Any, Deque, Tuple, Optional
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class OutputCoalescer:
+    """合并执行过程中的流式输出
+
+    内核的每条stream消息不再单独保存和广播，而是按执行缓存起来，
+    在时间窗口到期或缓存达到字节阈值时一次性输出。相邻的同名流会被合并，
+    stdout与stderr交替出现时按原顺序分段输出。
+
+    回车符（\r）按终端语义处理：同一行被反复改写时只保留最后的状态。
+    含回车符且尚未换行的末尾内容（如tqdm进度条）会暂存，直到换行或执行结束才作为正式输出保存，
+    因此保存的进度条输出量与行数而不是刷新次数成正比；每次定时刷新时暂存行的当前状态
+    以progress输出项发送，界面用它替换上一次的进度，不写入执行记录。
+    """
+
+    def __init__(self, emit: Callable[..., Awaitable[Any]],
+                 flush_interval: float = 0.05, max_bytes: int = 64 * 1024):
+        """初始化输出合并器
+
+        Args:
+            emit: 输出回调，参数为(execution_id, text, stream_name)，进度输出另有附加字段{'progress': True}
+            flush_interval: 刷新时间窗口（秒）
+            max_bytes: 缓存达到该字节数时立即刷新
+        """
+        self.emit = emit
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        # 执行ID -> [[流名称, 文本片段列表], ...]
+        self.buffers: Dict[str, List[List[Any]]] = {}
+        self.sizes: Dict[str, int] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._flush_tasks: Dict[str, asyncio.Task] = {}
+        # 同一执行的刷新串行进行，保证输出顺序
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # (执行ID, 流名称) -> 尚未换行、可能继续被回车改写的末尾内容
+        self._pending_lines: Dict[Tuple[str, str], str] = {}
+        # (执行ID, 流名称) -> 最近一次作为进度发送的内容
+        self._shown_progress: Dict[Tuple[str, str], str] = {}
+
+    async def write(self, execution_id: str, stream_name: str, text: str):
+        """写入一段流式输出"""
+        segments = self.buffers.setdefault(execution_id, [])
+        if segments and segments[-1][0] == stream_name:
+            segments[-1][1].append(text)
+        else:
+            segments.append([stream_name, [text]])
+        self.sizes[execution_id] = self.sizes.get(execution_id, 0) + len(text)
+
+        if self.sizes[execution_id] >= self.max_bytes:
+            await self.flush(execution_id)
+        elif execution_id not in self._timers:
+            loop = asyncio.get_running_loop()
+            self._timers[execution_id] = loop.call_later(self.flush_interval, self._on_timer, execution_id)
+
+    def _on_timer(self, execution_id: str):
+        """时间窗口到期，在后台刷新"""
+        self._timers.pop(execution_id, None)
+        task = asyncio.create_task(self.flush(execution_id))
+        self._flush_tasks[execution_id] = task
+        task.add_done_callback(lambda _: self._flush_tasks.pop(execution_id, None))
+
+    async def flush(self, execution_id: str, final: bool = False):
+        """立即输出该执行缓存的内容
+
+        Args:
+            execution_id: 执行ID
+            final: 是否为最后一次刷新，为True时同时输出暂存的未换行内容
+        """
+        timer = self._timers.pop(execution_id, None)
+        if timer is not None:
+            timer.cancel()
+        lock = self._locks.setdefault(execution_id, asyncio.Lock())
+        async with lock:
+            segments = self.buffers.pop(execution_id, None) or []
+            self.sizes.pop(execution_id, None)
+            for stream_name, parts in segments:
+                text = self._pending_lines.pop((execution_id, stream_name), '') + ''.join(parts)
+                text, pending = _split_pending(text)
+                if pending:
+                    self._pending_lines[(execution_id, stream_name)] = pending
+                else:
+                    self._shown_progress.pop((execution_id, stream_name), None)
+                await self._emit(execution_id, collapse_carriage_returns(text), stream_name)
+            keys = [key for key in self._pending_lines if key[0] == execution_id]
+            if final:
+                for key in keys:
+                    self._shown_progress.pop(key, None)
+                    pending = self._pending_lines.pop(key)
+                    await self._emit(execution_id, collapse_carriage_returns(pending), key[1])
+                return
+            for key in keys:
+                # 只发送当前行的最新状态，内容没有变化时不重复发送
+                progress = self._pending_lines[key].rstrip('\r')
+                if progress and self._shown_progress.get(key) != progress:
+                    self._shown_progress[key] = progress
+                    await self._emit(execution_id, progress, key[1], {'progress': True})
+
+    async def _emit(self, execution_id: str, text: str, stream_name: str, extra: Optional[Dict[str, Any]] = None):
+        if not text:
+            return
+        try:
+            if extra:
+                await self.emit(execution_id, text, stream_name, extra)
+            else:
+                await self.emit(execution_id, text, stream_name)
+        except Exception as e:
+            logger.error(f"输出执行结果时出错: {execution_id}, {str(e)}")
+
+    async def close(self, execution_id: str):
+        """刷新剩余输出并释放该执行的缓存"""
+        task = self._flush_tasks.get(execution_id)
+        if task is not None:
+            await task
+        await self.flush(execution_id, final=True)
+        self._locks.pop(execution_id, None)
+
+
+def collapse_carriage_returns(text: str) -> str:
+    """按终端语义处理回车符，每行只保留最后一次改写后的内容"""
+    if '\r' not in text:
+        return text
+    text = text.replace('\r\n', '\n')
+    lines = []
+    for line in text.split('\n'):
+        current = ''
+        for part in line.split('\r'):
+            # 回车后从行首覆盖写入，较短的内容只覆盖前面部分
+            current = part + current[len(part):]
+        lines.append(current)
+    return '\n'.join(lines)
+
+
+def _split_pending(text: str) -> Tuple[str, str]:
+    """拆出末尾含回车符且尚未换行的内容，它可能还会被后续输出改写"""
+    pos = text.rfind('\n') + 1
+    rest = text[pos:]
+    if '\r' not in rest:
+        return text, ''
+    # 暂存折叠后的当前行，长时间不换行的进度条也只占一行的空间；
+    # 保留末尾的回车符，后续输出仍从行首覆盖
+    pending = collapse_carriage_returns(rest)
+    if rest.endswith('\r'):
+        pending += '\r'
+    return text[:pos], pending
+
+
+def _last_bytes(text: str, limit: int) -> str:
+    """保留文本按UTF-8编码的最后limit个字节，不截断多字节字符"""
+    data = text.encode('utf-8')
+    if len(data) <= limit:
+        return text
+    return data[-limit:].decode('utf-8', errors='ignore')
+
+
+def _split_lines(text: str) -> List[str]:
+    """按换行符切分文本，保留每行末尾的换行符"""
+    lines = text.split('\n')
+    pieces = [line + '\n' for line in lines[:-1]]
+    if lines[-1]:
+        pieces.append(lines[-1])
+    return pieces
+
+
+class OutputLimiter:
+    """单个执行的输出大小限制
+
+    输出未超过字节数和行数上限时原样保留；超过上限后只保留开头部分和最后若干行
+    （环形缓冲，总字节数同样有上限，过长的行只保留末尾部分），完整输出写入落盘文件，
+    并在输出中插入截断标记。
+    """
+
+    def __init__(self, spill_path: str, max_bytes: int = 50000, max_lines: int = 500, tail_lines: int = 100,
+                 tail_bytes: int = 10000):
+        """初始化输出限制器
+
+        Args:
+            spill_path: 超过上限时保存完整输出的文件路径
+            max_bytes: 保留的开头部分最大字节数
+            max_lines: 保留的开头部分最大行数
+            tail_lines: 超过上限后保留的最后行数
+            tail_bytes: 超过上限后保留的最后若干行的最大总字节数
+        """
+        self.spill_path = spill_path
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self.total_bytes = 0
+        self.total_lines = 0
+        self.head_bytes = 0
+        self.head_lines = 0
+        # (输出类型, 行内容)
+        self.tail: Deque[Tuple[str, str]] = deque(maxlen=tail_lines)
+        self.tail_bytes = tail_bytes
+        self.tail_size = 0
+        self.tail_clipped = False  # 是否有行只保留了末尾部分
+        self.marker: Optional[Dict[str, Any]] = None
+        self._head_items: List[Dict[str, Any]] = []
+        self._spill_file = None
+
+    @property
+    def truncated(self) -> bool:
+        return self.marker is not None
+
+    def add(self, item: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """加入一个输出项
+
+        Returns:
+            List: 需要保存并发送的输出项（未超限时为原输出项，超限时可能为截断后的部分和截断标记）
+        """
+        text = item['content']
+        self.total_bytes += len(text.encode('utf-8'))
+        self.total_lines += text.count('\n')
+
+        if self.truncated:
+            self._spill(text)
+            self._push_tail(item['type'], text)
+            return []
+
+        size = len(text.encode('utf-8'))
+        lines = text.count('\n')
+        if self.head_bytes + size <= self.max_bytes and self.head_lines + lines <= self.max_lines:
+            self.head_bytes += size
+            self.head_lines += lines
+            self._head_items.append(item)
+            return [item]
+
+        # 本次输出越过上限：按行截取能放下的部分，其余进入环形缓冲
+        kept = []
+        pieces = _split_lines(text)
+        while pieces:
+            piece_size = len(pieces[0].encode('utf-8'))
+            if self.head_bytes + piece_size > self.max_bytes or self.head_lines + 1 > self.max_lines:
+                break
+            kept.append(pieces.pop(0))
+            self.head_bytes += piece_size
+            self.head_lines += 1
+
+        # 落盘文件先写入之前保留的开头部分，再写入本次的完整输出
+        self._open_spill()
+        self._spill(text)
+        result = [dict(item, content=''.join(kept))] if kept else []
+        for piece in pieces:
+            self._push_tail(item['type'], piece)
+
+        self.marker = {
+            'type': 'system',
+            'content': f"[输出超过上限（{self.max_lines}行/{self.max_bytes}字节），后续只保留最后{self.tail.maxlen}行]",
+            'timestamp': item['timestamp']
+        }
+        result.append(self.marker)
+        return result
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """执行结束，补全截断标记并返回保留的最后若干行"""
+        if not self.truncated:
+            return []
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+        self.marker['content'] = (
+            f"[输出已截断：共{self.total_lines}行，{self.total_bytes}字节，"
+            f"仅保留前{self.head_lines}行和最后{len(self.tail)}行"
+            f"{'（过长的行只保留末尾部分）' if self.tail_clipped else ''}，完整输出已保存到 {self.spill_path}]"
+        )
+        items = []
+        for output_type, line in self.tail:
+            if items and items[-1]['type'] == output_type:
+                items[-1]['content'] += line
+            else:
+                items.append({'type': output_type, 'content': line, 'timestamp': time.time()})
+        return items
+
+    def summary(self) -> Optional[Dict[str, Any]]:
+        """截断信息，未截断时返回None"""
+        if not self.truncated:
+            return None
+        return {
+            "total_bytes": self.total_bytes,
+            "total_lines": self.total_lines,
+            "kept_head_lines": self.head_lines,
+            "kept_tail_lines": len(self.tail),
+            "spill_file": self.spill_path
+        }
+
+    def _push_tail(self, output_type: str, text: str):
+        for piece in _split_lines(text):
+            # 上一行尚未结束时拼接到同一行
+            if self.tail and self.tail[-1][0] == output_type and not self.tail[-1][1].endswith('\n'):
+                _, line = self.tail.pop()
+                self.tail_size -= len(line.encode('utf-8'))
+                line += piece
+            else:
+                line = piece
+            size = len(line.encode('utf-8'))
+            if size > self.tail_bytes:
+                # 单行超过上限（如未换行的超长输出）时只保留末尾部分
+                line = _last_bytes(line, self.tail_bytes)
+                size = len(line.encode('utf-8'))
+                self.tail_clipped = True
+            if len(self.tail) == self.tail.maxlen:
+                self.tail_size -= len(self.tail.popleft()[1].encode('utf-8'))
+            self.tail.append((output_type, line))
+            self.tail_size += size
+            # 总字节数超限时丢弃最早的行，至少保留最后一行
+            while self.tail_size > self.tail_bytes and len(self.tail) > 1:
+                self.tail_size -= len(self.tail.popleft()[1].encode('utf-8'))
+
+    def _open_spill(self):
+        """打开落盘文件，并先写入已保留的开头部分"""
+        try:
+            os.makedirs(os.path.dirname(self.spill_path), exist_ok=True)
+            self._spill_file = open(self.spill_path, 'w', encoding='utf-8')
+            for item in self._head_items:
+                self._spill_file.write(item['content'])
+        except Exception as e:
+            logger.error(f"创建完整输出文件失败: {self.spill_path}, {str(e)}")
+            self._spill_file = None
+        self._head_items = []
+
+    def _spill(self, text: str):
+        if self._spill_file is not None:
+            self._spill_file.write(text)
@@ -0,0 +1,279 @@
+import os
+import sys
+import json
+import signal
+import socket
+import asyncio
+import secrets
+import subprocess
+from typing import Dict, Any, List, Optional, Tuple
+from jupyter_client.connect import KernelConnectionInfo
+from jupyter_client.provisioning import KernelProvisionerBase
+from app.core import kernel_worker
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class WorkerClient:
+    """单个内核工作节点的客户端"""
+
+    def __init__(self, host: str, port: int, token: str = ""):
+        self.host = host
+        self.port = port
+        self.token = token
+        # 最近一次查询到的负载信息
+        self.load: Dict[str, Any] = {}
+        self.reachable = True
+        self.placed = 0
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    async def request(self, payload: Dict[str, Any], timeout: float = 60) -> Dict[str, Any]:
+        """发送一个请求并等待响应，节点不可达时抛出OSError"""
+        async def _request():
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                writer.write((json.dumps({**payload, "token": self.token}) + "\n").encode("utf-8"))
+                await writer.drain()
+                line = await reader.readline()
+            finally:
+                writer.close()
+            if not line:
+                raise ConnectionError(f"工作节点 {self.address} 关闭了连接")
+            return json.loads(line)
+
+        try:
+            response = await asyncio.wait_for(_request(), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"工作节点 {self.address} 响应超时")
+        if "error" in response:
+            raise RuntimeError(f"工作节点 {self.address} 出错: {response['error']}")
+        return response
+
+    async def refresh(self, timeout: float = 2) -> bool:
+        """查询节点负载，返回节点是否可达"""
+        try:
+            self.load = await self.request({"op": "load"}, timeout)
+            self.reachable = True
+        except (OSError, RuntimeError) as e:
+            logger.warning(f"查询工作节点 {self.address} 负载失败: {str(e)}")
+            self.reachable = False
+        return self.reachable
+
+    def score(self) -> float:
+        """负载分数，越小越空闲：每个CPU上的内核数和系统负载，加上已用内存比例"""
+        load = self.load
+        cpus = load.get("cpu_count") or 1
+        score = load.get("kernels", 0) / cpus + (load.get("load_avg") or 0) / cpus
+        if load.get("mem_total") and load.get("mem_available") is not None:
+            score += 1 - load["mem_available"] / load["mem_total"]
+        return score
+
+    def full(self) -> bool:
+        return bool(self.load.get("max_kernels")) and self.load.get("kernels", 0) >= self.load["max_kernels"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "address": self.address,
+            "reachable": self.reachable,
+            "placed": self.placed,
+            **self.load,
+        }
+
+
+class KernelPlacement:
+    """在多个工作节点之间按当前负载分配内核"""
+
+    def __init__(self, workers: Optional[List[str]] = None, token: str = ""):
+        """初始化内核分配器
+
+        Args:
+            workers: 工作节点地址列表，格式为host:port
+            token: 访问工作节点的令牌
+        """
+        self.token = token
+        self.workers: List[WorkerClient] = []
+        for address in workers or []:
+            self.add_worker(address)
+        self._lock = asyncio.Lock()
+
+    def add_worker(self, address: str):
+        host, _, port = address.rpartition(":")
+        if not host or not port.isdigit():
+            raise ValueError(f"工作节点地址格式错误: {address}，应为host:port")
+        self.workers.append(WorkerClient(host, int(port), self.token))
+
+    async def choose(self) -> WorkerClient:
+        """查询所有节点的负载，选择最空闲的节点"""
+        async with self._lock:
+            await asyncio.gather(*(worker.refresh() for worker in self.workers))
+            candidates = [worker for worker in self.workers if worker.reachable and not worker.full()]
+            if not candidates:
+                raise RuntimeError("没有可用的内核工作节点")
+            worker = min(candidates, key=lambda w: (w.score(), w.placed))
+            worker.placed += 1
+            # 在下一次查询前先计入本次分配，并发创建内核时不会都落到同一节点
+            worker.load["kernels"] = worker.load.get("kernels", 0) + 1
+            return worker
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": True,
+            "workers": [worker.get_stats() for worker in self.workers],
+        }
+
+
+class RemoteProvisioner(KernelProvisionerBase):
+    """在工作节点上启动内核的内核供应器
+
+    启动时由KernelPlacement选择节点，节点启动内核后返回连接信息（节点地址、端口和签名密钥），
+    之后服务端通过Jupyter协议直接连接内核。进程状态查询和信号通过工作节点转发。
+    重启时重新选择节点，节点不可达时内核视为已退出，由健康检查在其他节点上重启。
+    """
+
+    placement: Optional[KernelPlacement] = None
+    # (CPU时间上限（秒）, 地址空间上限（MB）)，由工作节点在内核进程中设置
+    limits: Tuple[Optional[int], Optional[int]] = (None, None)
+    worker: Optional[WorkerClient] = None
+
+    @property
+    def has_process(self) -> bool:
+        return self.worker is not None
+
+    @property
+    def host(self) -> Optional[str]:
+        return self.worker.address if self.worker is not None else None
+
+    async def pre_launch(self, **kwargs: Any) -> Dict[str, Any]:
+        # 连接文件由工作节点生成，这里只需提供启动命令
+        return await super().pre_launch(cmd=list(self.kernel_spec.argv), **kwargs)
+
+    async def launch_kernel(self, cmd: List[str], **kwargs: Any) -> KernelConnectionInfo:
+        worker = await self.placement.choose()
+        response = await worker.request({
+            "op": "start",
+            "kernel_id": self.kernel_id,
+            "cwd": kwargs.get("cwd"),
+            "limits": list(self.limits),
+        })
+        info = dict(response["connection_info"])
+        info["key"] = info["key"].encode("utf-8")
+        self.worker = worker
+        self.connection_info = info
+        logger.info(f"内核 {self.kernel_id} 已在工作节点 {worker.address} 上启动")
+        return info
+
+    async def poll(self) -> Optional[int]:
+        if self.worker is None:
+            return 0
+        try:
+            return (await self.worker.request({"op": "poll", "kernel_id": self.kernel_id}, 10))["returncode"]
+        except (OSError, RuntimeError) as e:
+            logger.warning(f"无法查询内核 {self.kernel_id} 的状态: {str(e)}")
+            # 工作节点不可达时内核已无法使用
+            return 1
+
+    async def wait(self) -> Optional[int]:
+        ret = 0
+        if self.worker is not None:
+            while (ret := await self.poll()) is None:
+                await asyncio.sleep(0.1)
+        return ret
+
+    async def send_signal(self, signum: int) -> None:
+        if self.worker is None:
+            return
+        try:
+            await self.worker.request({"op": "signal", "kernel_id": self.kernel_id, "signum": int(signum)}, 10)
+        except (OSError, RuntimeError) as e:
+            logger.warning(f"向内核 {self.kernel_id} 发送信号失败: {str(e)}")
+
+    async def kill(self, restart: bool = False) -> None:
+        await self.send_signal(signal.SIGKILL)
+
+    async def terminate(self, restart: bool = False) -> None:
+        await self.send_signal(signal.SIGTERM)
+
+    async def cleanup(self, restart: bool = False) -> None:
+        if self.worker is None:
+            return
+        try:
+            await self.worker.request({"op": "remove", "kernel_id": self.kernel_id}, 30)
+        except (OSError, RuntimeError) as e:
+            logger.warning(f"清理工作节点上的内核 {self.kernel_id} 失败: {str(e)}")
+        self.worker = None
+
+    async def get_provisioner_info(self) -> Dict[str, Any]:
+        info = await super().get_provisioner_info()
+        info["worker"] = self.host
+        return info
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class LocalWorkerCluster:
+    """在本机启动多个工作节点进程，用于在单台机器上模拟多节点部署
+
+    每个节点是独立的kernel_worker进程，监听127.0.0.1上的不同端口，
+    服务端与它们的交互方式和远程节点完全相同。
+    """
+
+    def __init__(self, count: int, python: Optional[str] = None, start_timeout: float = 30):
+        self.count = count
+        self.python = python or sys.executable
+        self.start_timeout = start_timeout
+        self.token = secrets.token_hex(16)
+        self.processes: List[subprocess.Popen] = []
+        self.addresses: List[str] = []
+
+    async def start(self):
+        """启动所有节点进程并等待它们开始监听"""
+        for _ in range(self.count):
+            port = _free_port()
+            env = dict(os.environ, AUTOANALYZE_WORKER_TOKEN=self.token)
+            process = subprocess.Popen(
+                [self.python, kernel_worker.__file__, "--host", "127.0.0.1", "--port", str(port)],
+                stdin=subprocess.DEVNULL,
+                env=env
+            )
+            self.processes.append(process)
+            self.addresses.append(f"127.0.0.1:{port}")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.start_timeout
+        for process, address in zip(self.processes, self.addresses):
+            client = WorkerClient("127.0.0.1", int(address.rpartition(":")[2]), self.token)
+            while True:
+                if process.poll() is not None:
+                    await self.stop()
+                    raise RuntimeError(f"本地工作节点启动失败，退出码: {process.returncode}")
+                try:
+                    await client.request({"op": "load"}, 2)
+                    break
+                except OSError:
+                    pass
+                if loop.time() > deadline:
+                    await self.stop()
+                    raise RuntimeError("等待本地工作节点就绪超时")
+                await asyncio.sleep(0.1)
+        logger.info(f"已启动{self.count}个本地内核工作节点: {', '.join(self.addresses)}")
+
+    async def stop(self):
+        """停止所有节点进程，节点退出前关闭其上的内核"""
+        for process in self.processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in self.processes:
+            try:
+                await asyncio.to_thread(process.wait, 10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.processes = []
+        self.addresses = []
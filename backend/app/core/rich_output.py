@@ -0,0 +1,131 @@
+import re
+import json
+from typing import Dict, Any, Optional
+from app.core.image_store import ImageStore
+
+# pandas在display.html.table_schema开启时输出的表格结构化数据
+TABLE_MIME = "application/vnd.dataresource+json"
+PLOTLY_MIME = "application/vnd.plotly.v1+json"
+
+# DataFrame文本表示末尾的形状信息，例如 [1000 rows x 5 columns]
+SHAPE_PATTERN = re.compile(r"\[(\d+) rows x (\d+) columns\]\s*$")
+HTML_TAG = re.compile(r"<[^>]+>")
+# 没有实际内容的对象表示，例如 <IPython.core.display.HTML object>
+OBJECT_REPR = re.compile(r"^<[\w.]+ object( at 0x[0-9a-fA-F]+)?>$")
+
+# 在界面中渲染Plotly图表的HTML页面
+PLOTLY_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><script src="https://cdn.plot.ly/plotly-2.35.2.min.js"></script></head>
+<body style="margin:0"><div id="plot"></div>
+<script>const figure = {figure};
+Plotly.newPlot("plot", figure.data || [], figure.layout || {{}}, {{responsive: true}});</script>
+</body></html>"""
+
+
+def _compact_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _round_value(value: Any) -> Any:
+    """浮点数保留6位有效数字，与DataFrame的文本表示精度一致"""
+    if isinstance(value, float):
+        return float(f"{value:.6g}")
+    return value
+
+
+def table_for_agent(resource: Dict[str, Any], text: str, max_rows: int) -> str:
+    """把表格结构化数据转换为给智能体的紧凑JSON
+
+    只保留列名、列类型和前max_rows行，总行数从文本表示中读取
+    """
+    fields = resource.get("schema", {}).get("fields", [])
+    names = [field.get("name") for field in fields]
+    data = resource.get("data", [])
+    table = {
+        "columns": names,
+        "types": [field.get("type") for field in fields],
+        "rows": [[_round_value(row.get(name)) for name in names] for row in data[:max_rows]],
+    }
+    match = SHAPE_PATTERN.search(text or "")
+    table["total_rows"] = int(match.group(1)) if match else len(data)
+    if table["total_rows"] > len(table["rows"]):
+        table["truncated"] = True
+    return _compact_json(table)
+
+
+def plotly_summary(figure: Dict[str, Any]) -> str:
+    """Plotly图表的文字摘要，智能体只需要知道图表的标题和包含的数据系列"""
+    layout = figure.get("layout", {})
+    title = layout.get("title")
+    if isinstance(title, dict):
+        title = title.get("text")
+    traces = [
+        f"{trace.get('type', 'scatter')}({trace.get('name') or '未命名'})"
+        for trace in figure.get("data", [])
+    ]
+    return f"[Plotly图表] 标题: {title or '无'}; 数据系列: {', '.join(traces) or '无'}"
+
+
+def build_rich_output(data: Dict[str, Any], store: ImageStore, inline_bytes: int = 32 * 1024,
+                      table_max_rows: int = 10) -> Optional[Dict[str, Any]]:
+    """根据MIME bundle生成富文本输出项
+
+    content为给智能体的最紧凑表示（表格JSON、图表摘要或纯文本），
+    界面渲染用的HTML放在data中；超过inline_bytes时单独存储，只在url中给出地址。
+    content同样不超过inline_bytes，超出部分截断并注明完整内容的地址。
+
+    Args:
+        data: display_data/execute_result消息中的MIME bundle
+        store: 存放大体积输出的存储
+        inline_bytes: 直接随消息发送的最大字节数
+        table_max_rows: 给智能体的表格最多包含的行数
+
+    Returns:
+        Dict: 输出项，包含type、content、mime以及data或url；没有可用的富文本格式时返回None
+    """
+    text = data.get("text/plain", "")
+    if PLOTLY_MIME in data:
+        figure = data[PLOTLY_MIME]
+        item = {"type": "plotly", "content": plotly_summary(figure), "mime": "text/html"}
+        _attach_payload(item, PLOTLY_HTML.format(figure=_compact_json(figure)), store, inline_bytes)
+    elif TABLE_MIME in data:
+        item = {"type": "table", "content": table_for_agent(data[TABLE_MIME], text, table_max_rows), "mime": "text/html"}
+        if "text/html" in data:
+            _attach_payload(item, data["text/html"], store, inline_bytes)
+    elif "text/html" in data:
+        html = data["text/html"]
+        content = text if text and not OBJECT_REPR.match(text.strip()) else HTML_TAG.sub("", html).strip()
+        item = _attach_payload({"type": "html", "content": content, "mime": "text/html"}, html, store, inline_bytes)
+    elif "application/json" in data:
+        item = {"type": "json", "content": _compact_json(data["application/json"]), "mime": "application/json"}
+    else:
+        return None
+    return _clip_content(item, store, inline_bytes)
+
+
+def _clip_content(item: Dict[str, Any], store: ImageStore, inline_bytes: int) -> Dict[str, Any]:
+    """给智能体的内容超过inline_bytes时截断，并注明完整内容的地址
+
+    界面渲染的内容已单独存储时指向该地址，否则把完整内容写入存储，地址放在content_url中。
+    """
+    raw = item["content"].encode("utf-8")
+    if len(raw) <= inline_bytes:
+        return item
+    url = item.get("url")
+    if url is None:
+        url = store.put(raw, "json" if item["type"] == "json" else "txt")["url"]
+        item["content_url"] = url
+    kept = raw[:inline_bytes].decode("utf-8", errors="ignore")
+    item["content"] = f"{kept}\n[内容过长已截断：共{len(raw)}字节，完整内容见 {url}]"
+    return item
+
+
+def _attach_payload(item: Dict[str, Any], payload: str, store: ImageStore, inline_bytes: int) -> Dict[str, Any]:
+    """小的内容直接放入输出项，大的内容写入存储只保留URL"""
+    raw = payload.encode("utf-8")
+    if len(raw) <= inline_bytes:
+        item["data"] = payload
+    else:
+        item["url"] = store.put(raw, "html")["url"]
+        item["size"] = len(raw)
+    return item
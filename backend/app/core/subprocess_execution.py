@@ -0,0 +1,76 @@
+import sys
+import time
+import asyncio
+import tempfile
+import statistics
+from typing import Optional
+from app.schemas.config import ExecutionConfig
+from app.core.jupyter_execution import JupyterExecutionEngine
+from app.core.subprocess_kernel import SubprocessKernelManager
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SubprocessExecutionEngine(JupyterExecutionEngine):
+    """基于Python子进程的代码执行引擎
+
+    每个对话的内核是一个常驻的Python子进程，代码和输出通过管道以长度前缀的JSON帧传递，
+    省去Jupyter协议的消息签名、多通道和状态消息，适合大量短小的代码。
+    对外接口与JupyterExecutionEngine相同，执行记录、输出、缓存和检查点的处理完全复用；
+    matplotlib图表由子进程自行保存为PNG发送。不支持内核孵化进程和工作节点。
+    """
+
+    engine_name = "subprocess"
+    kernel_manager_class = SubprocessKernelManager
+    # 子进程使用Agg后端，图表由子进程在plt.show()和代码执行结束时发送
+    matplotlib_setup = ""
+
+    def _configure_launchers(self):
+        self.zygote = None
+        self.placement = None
+        self.local_workers = None
+        if self.config.kernel_zygote or self.config.kernel_workers or self.config.local_kernel_workers:
+            logger.warning("子进程执行引擎不支持内核孵化进程和工作节点，相关配置已忽略")
+
+
+async def benchmark(cells: int = 200, config: Optional[ExecutionConfig] = None):
+    """比较两种执行引擎执行短小代码的延迟
+
+    Args:
+        cells: 每种引擎执行的代码段数
+        config: 执行配置，为None时使用不保存检查点、不缓存结果的默认配置
+    """
+    codes = ["x = 1", "print(x)", "x + 1", "[i * i for i in range(100)]"]
+    for engine_class in (JupyterExecutionEngine, SubprocessExecutionEngine):
+        engine = engine_class(config or ExecutionConfig(
+            max_kernels=1,
+            spare_kernels=0,
+            health_check_interval=0,
+            execution_store_dir=tempfile.mkdtemp(),
+            image_store_dir=tempfile.mkdtemp()
+        ))
+        await engine.start()
+        try:
+            start = time.perf_counter()
+            await engine.create_kernel("benchmark")
+            startup = time.perf_counter() - start
+            latencies = []
+            for i in range(cells):
+                start = time.perf_counter()
+                execution_id = await engine.execute_code(codes[i % len(codes)], None, "benchmark")
+                await engine.wait_for_completion(execution_id)
+                latencies.append((time.perf_counter() - start) * 1000)
+            latencies.sort()
+            print(f"{engine.engine_name:>10}: 启动内核 {startup:.2f}秒，"
+                  f"每段代码 平均 {statistics.mean(latencies):.2f}ms，"
+                  f"中位数 {statistics.median(latencies):.2f}ms，"
+                  f"P95 {latencies[int(len(latencies) * 0.95)]:.2f}ms")
+        finally:
+            await engine.cleanup()
+
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(benchmark())
@@ -0,0 +1,231 @@
+import os
+import sys
+import json
+import uuid
+import queue
+import signal
+import asyncio
+import threading
+import subprocess
+from typing import Dict, Any, Optional
+from app.core import subprocess_kernel_server
+from app.core.zygote import kernel_python
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+HEADER = subprocess_kernel_server.HEADER
+
+
+class SubprocessKernelManager:
+    """子进程内核的管理器
+
+    提供内核池用到的AsyncKernelManager接口子集：启动、重启、中断、关闭和进程状态查询。
+    内核是运行subprocess_kernel_server.py的Python子进程，通过标准输入输出管道收发长度前缀的JSON帧，
+    没有Jupyter协议的消息签名、多通道和心跳开销。
+    """
+
+    def __init__(self, kernel_name: str = 'python3', python: Optional[str] = None, start_timeout: float = 60):
+        self.kernel_name = kernel_name
+        self.python = python or kernel_python(kernel_name)
+        self.start_timeout = start_timeout
+        self.kernel_id: Optional[str] = None
+        self.process: Optional[subprocess.Popen] = None
+        self._launch_args: Dict[str, Any] = {}
+        self._client: Optional["SubprocessKernelClient"] = None
+
+    @property
+    def provisioner(self):
+        """与内核供应器相同，提供poll()查询进程退出码"""
+        return self if self.process is not None else None
+
+    async def poll(self) -> Optional[int]:
+        return self.process.poll() if self.process is not None else 0
+
+    async def start_kernel(self, cwd: Optional[str] = None, **kwargs: Any):
+        """启动内核进程并等待其发送就绪消息
+
+        Args:
+            cwd: 内核进程的工作目录
+            kwargs: 传给subprocess.Popen的其他参数，例如设置资源限制的preexec_fn
+        """
+        self.kernel_id = self.kernel_id or str(uuid.uuid4())
+        self._launch_args = dict(kwargs, cwd=cwd)
+        env = dict(os.environ)
+        env.setdefault("MPLBACKEND", "Agg")
+        self.process = subprocess.Popen(
+            [self.python, subprocess_kernel_server.__file__],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=env,
+            **self._launch_args
+        )
+        self._client = SubprocessKernelClient(self)
+        self._client.start_channels()
+        try:
+            await self._client.wait_for_ready(self.start_timeout)
+        except Exception:
+            await self.shutdown_kernel(now=True)
+            raise
+
+    def client(self) -> "SubprocessKernelClient":
+        """内核进程只有一对管道，所有调用方共用同一个客户端"""
+        return self._client
+
+    async def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    async def interrupt_kernel(self):
+        """向内核进程发送SIGINT，内核把正在执行的代码中断为KeyboardInterrupt"""
+        if self.process is None:
+            return
+        if sys.platform == 'win32':
+            raise RuntimeError("Windows上不支持中断子进程内核")
+        self.process.send_signal(signal.SIGINT)
+
+    async def shutdown_kernel(self, now: bool = False, restart: bool = False):
+        if self._client is not None:
+            self._client.stop_channels()
+        process, self.process = self.process, None
+        if process is None:
+            return
+        if process.poll() is None:
+            if not now:
+                # 关闭标准输入后内核读取到结束帧自行退出
+                try:
+                    process.stdin.close()
+                    await asyncio.to_thread(process.wait, 5)
+                except (OSError, subprocess.TimeoutExpired):
+                    pass
+            if process.poll() is None:
+                process.kill()
+                await asyncio.to_thread(process.wait)
+        for pipe in (process.stdin, process.stdout):
+            try:
+                pipe.close()
+            except OSError:
+                pass
+
+    async def restart_kernel(self, now: bool = False, **kwargs: Any):
+        """关闭内核进程后以相同的参数重新启动"""
+        launch_args = dict(self._launch_args)
+        await self.shutdown_kernel(now=now, restart=True)
+        cwd = launch_args.pop("cwd", None)
+        await self.start_kernel(cwd=cwd, **launch_args)
+
+
+class _Heartbeat:
+    """子进程内核没有心跳通道，以进程是否存活代替"""
+
+    def __init__(self, manager: SubprocessKernelManager):
+        self.manager = manager
+
+    def is_beating(self) -> bool:
+        return self.manager.process is not None and self.manager.process.poll() is None
+
+
+class SubprocessKernelClient:
+    """子进程内核的客户端
+
+    提供内核池和执行引擎用到的AsyncKernelClient接口子集。后台线程从内核的标准输出读取帧，
+    转换为与Jupyter IOPub消息相同结构的字典后放入队列，由get_iopub_msg读取。
+    """
+
+    def __init__(self, manager: SubprocessKernelManager):
+        self.manager = manager
+        self.process = manager.process
+        self.hb_channel = _Heartbeat(manager)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._ready = asyncio.Event()
+        self._closed = False
+        self._reader: Optional[threading.Thread] = None
+        self._write_lock = threading.Lock()
+
+    def start_channels(self):
+        if self._reader is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._reader = threading.Thread(target=self._read_loop, args=(loop,), daemon=True)
+        self._reader.start()
+
+    def stop_channels(self):
+        self._closed = True
+
+    def _read_loop(self, loop: asyncio.AbstractEventLoop):
+        stream = self.process.stdout
+        while True:
+            try:
+                header = stream.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    break
+                payload = stream.read(HEADER.unpack(header)[0])
+                frame = json.loads(payload)
+            except (OSError, ValueError):
+                break
+            if frame["msg_type"] == "ready":
+                loop.call_soon_threadsafe(self._ready.set)
+                continue
+            msg = {
+                "header": {"msg_type": frame["msg_type"]},
+                "parent_header": {"msg_id": frame["msg_id"]},
+                "content": frame["content"],
+            }
+            try:
+                loop.call_soon_threadsafe(self._queue.put_nowait, msg)
+            except RuntimeError:
+                # 事件循环已关闭
+                return
+        try:
+            loop.call_soon_threadsafe(self._queue.put_nowait, None)
+        except RuntimeError:
+            pass
+
+    async def wait_for_ready(self, timeout: Optional[float] = None):
+        """等待内核发送就绪消息，内核进程提前退出时抛出RuntimeError"""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while not self._ready.is_set():
+            if self.process.poll() is not None:
+                raise RuntimeError(f"子进程内核启动失败，退出码: {self.process.returncode}")
+            if deadline is not None and loop.time() > deadline:
+                raise RuntimeError("等待子进程内核就绪超时")
+            try:
+                await asyncio.wait_for(self._ready.wait(), 0.1)
+            except asyncio.TimeoutError:
+                pass
+
+    def execute(self, code: str, silent: bool = False, store_history: bool = True,
+                stop_on_error: bool = True, **kwargs: Any) -> str:
+        """发送代码到内核执行，返回消息ID
+
+        内核按发送顺序逐个执行，stop_on_error为True时代码出错后内核中止已收到的其他请求
+        """
+        msg_id = str(uuid.uuid4())
+        payload = json.dumps({
+            "msg_id": msg_id,
+            "code": code,
+            "silent": silent,
+            "store_history": store_history and not silent,
+            "stop_on_error": stop_on_error,
+        }).encode("utf-8")
+        # 内核在后台线程中持续读取请求，写入不会长时间阻塞
+        with self._write_lock:
+            try:
+                self.process.stdin.write(HEADER.pack(len(payload)) + payload)
+                self.process.stdin.flush()
+            except (OSError, ValueError) as e:
+                raise RuntimeError(f"向子进程内核发送代码失败: {str(e)}")
+        return msg_id
+
+    async def get_iopub_msg(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """读取下一条输出消息，超时抛出queue.Empty，内核进程退出后抛出RuntimeError"""
+        if self._closed:
+            raise RuntimeError("子进程内核客户端已关闭")
+        try:
+            msg = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            raise queue.Empty
+        if msg is None:
+            self._queue.put_nowait(None)
+            raise RuntimeError("子进程内核已退出")
+        return msg
@@ -0,0 +1,322 @@
+"""子进程内核
+
+本文件作为独立脚本在内核的Python环境中运行，不能导入app包。代码由IPython的InteractiveShell执行，
+支持魔法命令和最后一个表达式的显示，但输出不经过Jupyter协议，而是通过标准输入输出管道以帧的形式收发：
+每帧为4字节大端长度加UTF-8编码的JSON。
+
+服务端 -> 内核（标准输入）：
+    {"msg_id": ..., "code": ..., "silent": false, "store_history": true, "stop_on_error": false}
+    stop_on_error为true时代码出错后中止此时已收到的其他请求，被中止的请求只有busy和idle两条status消息。
+内核 -> 服务端（标准输出）：
+    {"msg_id": ..., "msg_type": ..., "content": {...}}
+    msg_type与Jupyter的IOPub消息相同：status、execute_input、stream、display_data、execute_result、error；
+    启动完成后发送一帧msg_type为ready、msg_id为空的消息。
+
+用户代码的print等输出被重定向为stream消息；写到文件描述符1的输出（例如C扩展）转到标准错误，不会破坏协议。
+matplotlib使用Agg后端，plt.show()和每段代码执行结束时把打开的图表保存为PNG发送。
+"""
+import os
+import io
+import sys
+import json
+import time
+import queue
+import base64
+import struct
+import signal
+import threading
+
+HEADER = struct.Struct(">I")
+# 流式输出合并发送的时间间隔（秒）
+FLUSH_INTERVAL = 0.05
+
+
+class Channel:
+    """帧的收发，发送可以在多个线程中进行"""
+
+    def __init__(self, in_fd, out_fd):
+        self.in_file = os.fdopen(in_fd, "rb", buffering=0)
+        self.out_fd = out_fd
+        self.lock = threading.Lock()
+
+    def _read_exact(self, size):
+        data = b""
+        while len(data) < size:
+            chunk = self.in_file.read(size - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+    def receive(self):
+        """读取一帧，管道关闭时返回None"""
+        header = self._read_exact(HEADER.size)
+        if header is None:
+            return None
+        payload = self._read_exact(HEADER.unpack(header)[0])
+        return None if payload is None else json.loads(payload)
+
+    def send(self, message):
+        payload = json.dumps(message, default=str).encode("utf-8")
+        frame = HEADER.pack(len(payload)) + payload
+        with self.lock:
+            view = memoryview(frame)
+            while view:
+                written = os.write(self.out_fd, view)
+                view = view[written:]
+
+
+class Kernel:
+    def __init__(self, channel):
+        self.channel = channel
+        self.msg_id = None
+        # 正在执行代码时SIGINT才中断执行；主线程正在发送帧时推迟到发送完成后
+        self.executing = False
+        self.sending = False
+        self.interrupt_pending = False
+        self.streams = []
+        self.requests = queue.Queue()
+
+    def send(self, msg_type, content, msg_id=None):
+        main = threading.current_thread() is threading.main_thread()
+        if main:
+            self.sending = True
+        try:
+            self.channel.send({"msg_id": msg_id or self.msg_id, "msg_type": msg_type, "content": content})
+        finally:
+            if main:
+                self.sending = False
+                if self.interrupt_pending and self.executing:
+                    self.interrupt_pending = False
+                    raise KeyboardInterrupt
+
+    def handle_sigint(self, signum, frame):
+        if not self.executing:
+            return
+        if self.sending:
+            self.interrupt_pending = True
+            return
+        raise KeyboardInterrupt
+
+    def flush_streams(self):
+        for stream in self.streams:
+            stream.flush()
+
+    def _read_requests(self):
+        """在后台线程中持续读取请求，服务端写入时不会因内核正在执行而阻塞"""
+        while True:
+            request = self.channel.receive()
+            self.requests.put(request)
+            if request is None:
+                return
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            try:
+                self.flush_streams()
+            except Exception:
+                pass
+
+    def run(self, shell):
+        threading.Thread(target=self._read_requests, daemon=True).start()
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+        self.send("ready", {"pid": os.getpid()}, msg_id="")
+        while True:
+            request = self.requests.get()
+            if request is None:
+                break
+            if not self.execute(shell, request) and request.get("stop_on_error"):
+                self.abort_requests()
+
+    def abort_requests(self):
+        """中止出错时已收到但尚未执行的请求，之后收到的请求正常执行"""
+        for _ in range(self.requests.qsize()):
+            try:
+                request = self.requests.get_nowait()
+            except queue.Empty:
+                return
+            if request is None:
+                self.requests.put(None)
+                return
+            self.send("status", {"execution_state": "busy"}, msg_id=request["msg_id"])
+            self.send("status", {"execution_state": "idle"}, msg_id=request["msg_id"])
+
+    def execute(self, shell, request):
+        """执行一个请求，返回是否执行成功"""
+        self.msg_id = request["msg_id"]
+        silent = request.get("silent", False)
+        success = False
+        self.send("status", {"execution_state": "busy"})
+        try:
+            self.send("execute_input", {"code": request["code"], "execution_count": shell.execution_count})
+            self.interrupt_pending = False
+            self.executing = True
+            try:
+                result = shell.run_cell(request["code"], store_history=request.get("store_history", True), silent=silent)
+                success = result.success
+                if not silent:
+                    flush_figures()
+            finally:
+                self.executing = False
+        except KeyboardInterrupt:
+            # 中断发生在run_cell之外（例如发送图表时）
+            shell.showtraceback()
+            success = False
+        self.flush_streams()
+        self.send("status", {"execution_state": "idle"})
+        self.msg_id = None
+        return success
+
+
+_kernel = None
+
+
+class PipeStream(io.TextIOBase):
+    """把写入的文本缓存后作为stream消息发送"""
+
+    def __init__(self, name, original):
+        self.name = name
+        self.original = original
+        self._buffer = []
+        self._lock = threading.Lock()
+
+    def writable(self):
+        return True
+
+    @property
+    def encoding(self):
+        return "utf-8"
+
+    def fileno(self):
+        return self.original.fileno()
+
+    def isatty(self):
+        return False
+
+    def write(self, text):
+        if not isinstance(text, str):
+            raise TypeError(f"write() argument must be str, not {type(text).__name__}")
+        if _kernel.msg_id is None:
+            # 不在执行代码时（例如后台线程）的输出写到标准错误
+            self.original.write(text)
+            return len(text)
+        with self._lock:
+            self._buffer.append(text)
+        return len(text)
+
+    def flush(self):
+        with self._lock:
+            text, self._buffer = "".join(self._buffer), []
+        if text:
+            _kernel.send("stream", {"name": self.name, "text": text})
+
+
+def flush_figures():
+    """把打开的matplotlib图表保存为PNG发送并关闭"""
+    plt = sys.modules.get("matplotlib.pyplot")
+    if plt is None:
+        return
+    for num in plt.get_fignums():
+        figure = plt.figure(num)
+        buffer = io.BytesIO()
+        try:
+            figure.savefig(buffer, format="png", bbox_inches="tight")
+        except Exception as e:
+            sys.stderr.write(f"保存图表失败: {e}\n")
+            continue
+        _kernel.flush_streams()
+        _kernel.send("display_data", {
+            "data": {"image/png": base64.b64encode(buffer.getvalue()).decode("ascii"), "text/plain": repr(figure)},
+            "metadata": {},
+        })
+    plt.close("all")
+
+
+def _patch_pyplot(*args):
+    """pyplot导入后把plt.show()替换为发送图表"""
+    plt = sys.modules.get("matplotlib.pyplot")
+    if plt is not None and getattr(plt.show, "__name__", "") != "_show":
+        def _show(*args, **kwargs):
+            flush_figures()
+        plt.show = _show
+
+
+def create_shell():
+    from IPython.core.interactiveshell import InteractiveShell
+    from IPython.core.displaypub import DisplayPublisher
+    from IPython.core.displayhook import DisplayHook
+
+    class PipeDisplayPublisher(DisplayPublisher):
+        def publish(self, data, metadata=None, source=None, *, transient=None, update=False, **kwargs):
+            _kernel.flush_streams()
+            _kernel.send("display_data", {"data": data, "metadata": metadata or {}, "transient": transient or {}})
+
+        def clear_output(self, wait=False):
+            _kernel.flush_streams()
+            _kernel.send("clear_output", {"wait": wait})
+
+    class PipeDisplayHook(DisplayHook):
+        def start_displayhook(self):
+            self._result = None
+
+        def write_output_prompt(self):
+            pass
+
+        def write_format_data(self, format_dict, md_dict=None):
+            self._result = (format_dict, md_dict or {})
+
+        def finish_displayhook(self):
+            if self._result is None:
+                return
+            _kernel.flush_streams()
+            data, metadata = self._result
+            _kernel.send("execute_result", {"data": data, "metadata": metadata, "execution_count": self.prompt_count})
+
+    class PipeShell(InteractiveShell):
+        def _showtraceback(self, etype, evalue, stb):
+            _kernel.flush_streams()
+            _kernel.send("error", {
+                "ename": getattr(etype, "__name__", str(etype)),
+                "evalue": str(evalue),
+                "traceback": stb,
+            })
+
+        def system(self, cmd):
+            # shell命令的输出读回后作为stream消息发送，而不是直接写到文件描述符1
+            import subprocess
+            _kernel.flush_streams()
+            with subprocess.Popen(self.var_expand(cmd, depth=1), shell=True, cwd=os.getcwd(),
+                                  stdout=subprocess.PIPE, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL) as process:
+                for line in iter(process.stdout.readline, b""):
+                    sys.stdout.write(line.decode("utf-8", errors="replace"))
+            self.user_ns["_exit_code"] = process.returncode
+
+    shell = PipeShell.instance(displayhook_class=PipeDisplayHook, display_pub_class=PipeDisplayPublisher)
+    shell.events.register("pre_run_cell", _patch_pyplot)
+    shell.events.register("post_run_cell", _patch_pyplot)
+    return shell
+
+
+def main():
+    global _kernel
+    # 协议使用原来的标准输入输出，文件描述符1改为指向标准错误
+    out_fd = os.dup(1)
+    in_fd = os.dup(0)
+    os.dup2(2, 1)
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    os.environ.setdefault("MPLBACKEND", "Agg")
+
+    _kernel = Kernel(Channel(in_fd, out_fd))
+    original_stderr = sys.stderr
+    sys.stdout = PipeStream("stdout", original_stderr)
+    sys.stderr = PipeStream("stderr", original_stderr)
+    _kernel.streams = [sys.stdout, sys.stderr]
+    signal.signal(signal.SIGINT, _kernel.handle_sigint)
+    _kernel.run(create_shell())
+
+
+if __name__ == "__main__":
+    main()
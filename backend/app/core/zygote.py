@@ -0,0 +1,224 @@
+import os
+import sys
+import json
+import shutil
+import signal
+import asyncio
+import tempfile
+import subprocess
+from typing import Dict, Any, List, Optional, Tuple
+from jupyter_client.connect import KernelConnectionInfo
+from jupyter_client.provisioning import LocalProvisioner
+from jupyter_client.kernelspec import KernelSpecManager
+from app.core import zygote_server
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def kernel_python(kernel_name: str = 'python3') -> str:
+    """内核使用的Python解释器，孵化进程需要在同一个解释器中运行"""
+    try:
+        python = KernelSpecManager().get_kernel_spec(kernel_name).argv[0]
+    except Exception:
+        return sys.executable
+    if os.path.isabs(python):
+        return python
+    return shutil.which(python) or sys.executable
+
+
+class Zygote:
+    """内核孵化进程的管理器
+
+    孵化进程预先导入ipykernel和常用的数据分析库，新内核由孵化进程fork产生，
+    省去每次启动解释器和导入库的时间。仅支持POSIX系统。
+    """
+
+    def __init__(self, python: Optional[str] = None, preload_modules: Optional[List[str]] = None,
+                 start_timeout: float = 60):
+        """初始化孵化进程管理器
+
+        Args:
+            python: 运行孵化进程的Python解释器，应与内核使用的解释器相同，为None时使用当前解释器
+            preload_modules: 孵化进程预先导入的模块
+            start_timeout: 等待孵化进程就绪的最长时间（秒）
+        """
+        self.python = python or sys.executable
+        self.preload_modules = preload_modules or []
+        self.start_timeout = start_timeout
+        self.process: Optional[subprocess.Popen] = None
+        self.socket_path: Optional[str] = None
+        self._start_lock = asyncio.Lock()
+        self.fork_count = 0
+
+    @staticmethod
+    def supported() -> bool:
+        return sys.platform != 'win32' and hasattr(os, 'fork')
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    async def start(self):
+        """启动孵化进程并等待其完成预先导入"""
+        async with self._start_lock:
+            if self.alive:
+                return
+            socket_dir = tempfile.mkdtemp(prefix="autoanalyze-zygote-")
+            self.socket_path = os.path.join(socket_dir, "zygote.sock")
+            env = dict(os.environ)
+            # pyarrow的jemalloc默认启动后台线程，fork多线程进程不安全，孵化进程中关闭
+            env.setdefault("JE_ARROW_MALLOC_CONF", "background_thread:false")
+            self.process = subprocess.Popen(
+                [self.python, zygote_server.__file__, self.socket_path, json.dumps(self.preload_modules)],
+                stdin=subprocess.DEVNULL,
+                env=env
+            )
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.start_timeout
+            while True:
+                if self.process.poll() is not None:
+                    raise RuntimeError(f"内核孵化进程启动失败，退出码: {self.process.returncode}")
+                if os.path.exists(self.socket_path):
+                    try:
+                        await self._request({"op": "ping"})
+                        break
+                    except OSError:
+                        pass
+                if loop.time() > deadline:
+                    await self.stop()
+                    raise RuntimeError("等待内核孵化进程就绪超时")
+                await asyncio.sleep(0.1)
+            logger.info(f"内核孵化进程已启动: pid={self.process.pid}")
+
+    async def _request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        try:
+            writer.write((json.dumps(payload) + "\n").encode("utf-8"))
+            await writer.drain()
+            response = json.loads(await reader.readline())
+        finally:
+            writer.close()
+        if "error" in response:
+            raise RuntimeError(f"内核孵化进程出错: {response['error']}")
+        return response
+
+    async def fork(self, connection_file: str, cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None,
+                   limits: Tuple[Optional[int], Optional[int]] = (None, None)) -> int:
+        """fork一个新内核进程
+
+        Args:
+            connection_file: 内核的连接文件
+            cwd: 内核的工作目录
+            env: 内核的环境变量
+            limits: (CPU时间上限（秒）, 地址空间上限（MB）)
+
+        Returns:
+            int: 内核进程ID
+        """
+        if not self.alive:
+            # 孵化进程退出后（例如被系统终止）重新启动
+            await self.start()
+        response = await self._request({
+            "op": "fork",
+            "connection_file": connection_file,
+            "cwd": cwd,
+            "env": env or dict(os.environ),
+            "limits": list(limits),
+        })
+        self.fork_count += 1
+        return response["pid"]
+
+    async def poll(self, pid: int) -> Optional[int]:
+        """查询内核进程的退出码，仍在运行时返回None"""
+        if not self.alive:
+            # 孵化进程已退出，无法回收子进程，只能检查进程是否存在
+            try:
+                os.kill(pid, 0)
+                return None
+            except ProcessLookupError:
+                return 0
+        return (await self._request({"op": "poll", "pid": pid}))["returncode"]
+
+    async def stop(self):
+        """停止孵化进程，由它fork的内核检测到父进程退出后也会退出"""
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                await asyncio.to_thread(self.process.wait, 5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+        if self.socket_path:
+            try:
+                os.unlink(self.socket_path)
+                os.rmdir(os.path.dirname(self.socket_path))
+            except OSError:
+                pass
+            self.socket_path = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": True,
+            "alive": self.alive,
+            "pid": self.process.pid if self.alive else None,
+            "fork_count": self.fork_count,
+        }
+
+
+class ZygoteProvisioner(LocalProvisioner):
+    """由孵化进程fork内核的内核供应器
+
+    连接文件的生成与LocalProvisioner相同，只是内核进程不再通过Popen启动，
+    而是请求孵化进程fork。内核进程是孵化进程的子进程，退出码通过孵化进程查询。
+    """
+
+    zygote: Optional[Zygote] = None
+    # (CPU时间上限（秒）, 地址空间上限（MB）)，在fork出的子进程中设置
+    limits: Tuple[Optional[int], Optional[int]] = (None, None)
+
+    @property
+    def has_process(self) -> bool:
+        return self.pid is not None
+
+    async def launch_kernel(self, cmd: List[str], **kwargs: Any) -> KernelConnectionInfo:
+        self.pid = await self.zygote.fork(
+            self.parent.connection_file,
+            cwd=kwargs.get("cwd"),
+            env=kwargs.get("env"),
+            limits=self.limits
+        )
+        # 子进程调用了setsid，进程组ID与进程ID相同
+        self.pgid = self.pid
+        self.cwd = kwargs.get("cwd", os.getcwd())
+        return self.connection_info
+
+    async def poll(self) -> Optional[int]:
+        if self.pid is None:
+            return 0
+        return await self.zygote.poll(self.pid)
+
+    async def wait(self) -> Optional[int]:
+        ret = 0
+        if self.pid is not None:
+            while (ret := await self.poll()) is None:
+                await asyncio.sleep(0.1)
+            self.pid = None
+        return ret
+
+    async def send_signal(self, signum: int) -> None:
+        if self.pid is None:
+            return
+        try:
+            os.killpg(self.pgid, signum)
+        except OSError:
+            try:
+                os.kill(self.pid, signum)
+            except ProcessLookupError:
+                pass
+
+    async def kill(self, restart: bool = False) -> None:
+        await self.send_signal(signal.SIGKILL)
+
+    async def terminate(self, restart: bool = False) -> None:
+        await self.send_signal(signal.SIGTERM)
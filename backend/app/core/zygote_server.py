@@ -0,0 +1,147 @@
+"""内核孵化进程
+
+本文件作为独立脚本在内核的Python环境中运行，不能导入app包。进程启动时预先导入ipykernel和常用的数据分析库，
+之后通过Unix套接字接收请求，为每个新内核fork一个子进程。子进程与孵化进程以写时复制方式共享已导入的模块，
+无需重新启动解释器和导入库。
+
+请求和响应都是一行JSON：
+    {"op": "fork", "connection_file": ..., "cwd": ..., "env": {...}, "limits": [cpu, memory_mb]} -> {"pid": ...}
+    {"op": "poll", "pid": ...} -> {"returncode": null或退出码（被信号终止时为负的信号值）}
+    {"op": "ping"} -> {"pid": 孵化进程ID}
+"""
+import os
+import sys
+import json
+import signal
+import socket
+import importlib
+
+# 已退出的子进程 -> 退出码
+_exited = {}
+
+
+def _returncode(status):
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def _reap():
+    """回收所有已退出的子进程"""
+    while True:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        _exited[pid] = _returncode(status)
+
+
+def _limit_resources(cpu_time, memory_mb):
+    import resource
+    if cpu_time:
+        # 软限制触发SIGXCPU，硬限制留出余量
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_time, cpu_time + 5))
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _run_kernel(request):
+    """在子进程中启动内核，不会返回"""
+    try:
+        os.setsid()
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        os.environ.clear()
+        os.environ.update(request.get("env") or {})
+        # ipykernel在父进程退出时自动退出，父进程是孵化进程而不是服务进程
+        os.environ["JPY_PARENT_PID"] = str(os.getppid())
+        if request.get("cwd"):
+            os.chdir(request["cwd"])
+        cpu_time, memory_mb = request.get("limits") or (None, None)
+        if cpu_time or memory_mb:
+            _limit_resources(cpu_time, memory_mb)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.close(devnull)
+        # IPKernelApp在导入时就读取了JPY_PARENT_PID，需要通过参数重新指定
+        sys.argv = [sys.argv[0], "-f", request["connection_file"], f"--IPKernelApp.parent_handle={os.getppid()}"]
+        from ipykernel.kernelapp import IPKernelApp
+        IPKernelApp.launch_instance()
+        code = 0
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 0
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+        code = 1
+    os._exit(code)
+
+
+def _handle(request, server, conn):
+    op = request.get("op")
+    if op == "fork":
+        pid = os.fork()
+        if pid == 0:
+            server.close()
+            conn.close()
+            _run_kernel(request)
+        # 进程号可能被复用，之前同号子进程的退出码已不再适用
+        _exited.pop(pid, None)
+        return {"pid": pid}
+    if op == "poll":
+        _reap()
+        pid = request["pid"]
+        if pid in _exited:
+            return {"returncode": _exited[pid]}
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return {"returncode": 0}
+        return {"returncode": None}
+    if op == "ping":
+        return {"pid": os.getpid()}
+    return {"error": f"unknown op: {op}"}
+
+
+def main(socket_path, preload_modules):
+    for module in ["ipykernel.kernelapp", "ipykernel.ipkernel"] + preload_modules:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            pass
+
+    parent = os.getppid()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(16)
+    # 定期检查服务进程是否还在，服务退出后孵化进程也退出
+    server.settimeout(1)
+    while True:
+        if os.getppid() != parent:
+            break
+        _reap()
+        try:
+            conn, _ = server.accept()
+        except socket.timeout:
+            continue
+        with conn:
+            conn.settimeout(None)
+            reader = conn.makefile("r", encoding="utf-8")
+            for line in reader:
+                try:
+                    response = _handle(json.loads(line), server, conn)
+                except Exception as e:
+                    response = {"error": str(e)}
+                conn.sendall((json.dumps(response) + "\n").encode("utf-8"))
+    server.close()
+    try:
+        os.unlink(socket_path)
+    except OSError:
+        pass
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], json.loads(sys.argv[2]) if len(sys.argv) > 2 else [])
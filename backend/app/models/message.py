@@ -1,26 +1,26 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Integer
-from sqlalchemy.orm import relationship
-import uuid
-from datetime import datetime
-
-from ..db.session import Base
-
-
-class Message(Base):
-    """消息模型
-    
-    存储对话中的消息内容，包括用户消息和助手回复
-    """
-    __tablename__ = "messages"
-    
-    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
-    conversation_id = Column(String, ForeignKey("conversations.id", ondelete="CASCADE"), index=True)
-    role = Column(String, index=True)  # 'user' 或 'assistant'
-    content = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    
-    # 关系：消息属于一个对话
-    conversation = relationship("Conversation", back_populates="messages")
-    
-    def __repr__(self):
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Integer
+from sqlalchemy.orm import relationship
+import uuid
+from datetime import datetime
+
+from ..db.session import Base
+
+
+class Message(Base):
+    """消息模型
+    
+    存储对话中的消息内容，包括用户消息和助手回复
+    """
+    __tablename__ = "messages"
+    
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    conversation_id = Column(String, ForeignKey("conversations.id", ondelete="CASCADE"), index=True)
+    role = Column(String, index=True)  # 'user' 或 'assistant'
+    content = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # 关系：消息属于一个对话
+    conversation = relationship("Conversation", back_populates="messages")
+    
+    def __repr__(self):
         return f"<Message(id={self.id}, role={self.role}, conversation_id={self.conversation_id})>"
\ No newline at end of file
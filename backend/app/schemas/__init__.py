@@ -1,16 +1,16 @@
-# 导出所有模式类
-from .conversation import ConversationBase, ConversationCreate, ConversationResponse, ConversationDetail, ConversationList
-from .message import MessageBase, MessageCreate, MessageResponse, UserMessage, AssistantMessage
-from .execution import (
-    ExecutionStatus, ExecutionRequest, ExecutionResponse, 
-    ExecutionOutputType, ExecutionOutput, 
-    CancelExecutionRequest, ExecutionStatusResponse
-)
-from .filesystem import (
-    WorkspaceRequest, WorkspaceResponse, 
-    FileItem, DirectoryItem, FileSystemItem, FilePreview
-)
-from .config import (
-    ModelConfig, SecurityConfig, DatabaseConfig, 
-    ServerConfig, SystemConfig, StatusResponse
+# 导出所有模式类
+from .conversation import ConversationBase, ConversationCreate, ConversationResponse, ConversationDetail, ConversationList
+from .message import MessageBase, MessageCreate, MessageResponse, UserMessage, AssistantMessage
+from .execution import (
+    ExecutionStatus, ExecutionRequest, ExecutionResponse, 
+    ExecutionOutputType, ExecutionOutput, 
+    CancelExecutionRequest, ExecutionStatusResponse
+)
+from .filesystem import (
+    WorkspaceRequest, WorkspaceResponse, 
+    FileItem, DirectoryItem, FileSystemItem, FilePreview
+)
+from .config import (
+    ModelConfig, SecurityConfig, DatabaseConfig, 
+    ServerConfig, SystemConfig, StatusResponse, ExecutionConfig
 )
\ No newline at end of file
@@ -1,51 +1,113 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
-
-
-class ModelConfig(BaseModel):
-    """模型配置"""
-    type: str = Field(..., description="模型类型，如'openai', 'claude', 'local'")
-    api_key: Optional[str] = Field(None, description="API密钥")
-    endpoint: Optional[str] = Field(None, description="API端点URL")
-    model: str = Field("gpt-4", description="模型名称")
-
-
-class SecurityConfig(BaseModel):
-    """安全配置"""
-    max_execution_time: int = Field(300, description="最大执行时间（秒）")
-    max_memory: int = Field(1024, description="最大内存使用（MB）")
-
-
-class DatabaseConfig(BaseModel):
-    """数据库配置"""
-    type: str = Field("sqlite", description="数据库类型")
-    path: str = Field("./data/history.db", description="数据库路径")
-
-
-class ServerConfig(BaseModel):
-    """服务器配置"""
-    host: str = Field("127.0.0.1", description="服务器主机")
-    port: int = Field(8000, description="服务器端口")
-    frontend_port: int = Field(3000, description="前端服务器端口")
-
-
-class SystemConfig(BaseModel):
-    """系统配置"""
-    model: Optional[ModelConfig] = Field(None, description="主模型配置")
-    user_model: Optional[ModelConfig] = Field(None, description="用户代理模型配置")
-    vision_model: Optional[ModelConfig] = Field(None, description="视觉模型配置")
-
-
-class ModelStatusResponse(BaseModel):
-    """模型状态响应"""
-    status: str = Field(..., description="模型状态")
-    type: str = Field(..., description="模型类型")
-
-class StatusResponse(BaseModel):
-    """状态响应"""
-    status: str = Field(..., description="状态，'ok'或'error'")
-    version: str = Field(..., description="应用版本")
-    model: ModelStatusResponse = Field(..., description="模型状态")
-    workspace: Optional[str] = Field(None, description="当前工作目录")
-    config: Dict[str, Any] = Field(..., description="当前配置")
+from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, Any
+
+
+class ModelConfig(BaseModel):
+    """模型配置"""
+    type: str = Field(..., description="模型类型，如'openai', 'claude', 'local'")
+    api_key: Optional[str] = Field(None, description="API密钥")
+    endpoint: Optional[str] = Field(None, description="API端点URL")
+    model: str = Field("gpt-4", description="模型名称")
+
+
+class SecurityConfig(BaseModel):
+    """安全配置"""
+    max_execution_time: int = Field(300, description="最大执行时间（秒）")
+    max_memory: int = Field(1024, description="最大内存使用（MB）")
+
+
+class ExecutionConfig(BaseModel):
+    """代码执行引擎配置"""
+    engine: str = Field("jupyter", description="执行引擎：jupyter通过Jupyter协议与内核通信，subprocess通过管道与常驻的Python子进程通信，短小代码的延迟更低")
+    max_kernels: int = Field(4, description="内核池最大内核数，超出时按LRU回收空闲内核")
+    spare_kernels: int = Field(1, description="预先启动的备用内核数，不计入内核池容量")
+    preload_modules: List[str] = Field(
+        ["numpy", "pandas", "matplotlib.pyplot", "sklearn"],
+        description="内核启动时预先导入的模块"
+    )
+    max_execution_records: int = Field(200, description="内存中最多保留的执行记录数")
+    max_execution_memory_mb: int = Field(256, description="内存中执行记录的估算内存上限（MB）")
+    execution_record_ttl: int = Field(3600, description="已结束的执行记录在内存中保留的时间（秒），超时后写入磁盘")
+    execution_store_dir: Optional[str] = Field(None, description="执行记录落盘目录，为空时使用data/executions")
+    image_store_dir: Optional[str] = Field(None, description="执行生成的图片的存储目录，为空时使用data/images")
+    output_store_dir: Optional[str] = Field(None, description="大体积富文本输出的存储目录，为空时使用data/outputs")
+    rich_output_inline_bytes: int = Field(32 * 1024, description="HTML等富文本输出直接随消息发送的最大字节数，超出后单独存储并只发送URL")
+    agent_table_max_rows: int = Field(10, description="表格以结构化数据返回给智能体时最多包含的行数")
+    output_flush_interval: float = Field(0.05, description="流式输出合并的时间窗口（秒）")
+    output_flush_bytes: int = Field(64 * 1024, description="流式输出缓存达到该字节数时立即发送")
+    max_output_bytes: int = Field(50000, description="单次执行保留的输出字节数上限，超出后只保留开头和最后若干行")
+    max_output_lines: int = Field(500, description="单次执行保留的输出行数上限")
+    output_tail_lines: int = Field(100, description="输出超过上限后保留的最后行数")
+    output_tail_bytes: int = Field(10000, description="输出超过上限后保留的最后若干行的最大总字节数，过长的行只保留末尾部分")
+    execution_timeout: Optional[float] = Field(300, description="单次代码执行的最长时间（秒），为空表示不限制")
+    interrupt_grace_period: float = Field(5, description="超时中断后等待内核响应的时间（秒），仍未结束则重启内核")
+    kernel_cpu_time_limit: Optional[int] = Field(None, description="内核进程累计CPU时间上限（秒），为空表示不限制，仅POSIX系统有效")
+    preflight_checks: bool = Field(True, description="执行前检查语法、读取的文件是否存在以及导入的模块是否已安装")
+    memoize_cells: bool = Field(False, description="是否缓存自包含代码的执行结果，代码和读取的文件都未变化时直接重放输出")
+    memoize_max_entries: int = Field(128, description="最多缓存的执行结果数")
+    profile_cells: bool = Field(True, description="是否在内核中统计每段代码的耗时、CPU时间、内存峰值和新建的DataFrame")
+    slow_cell_threshold: float = Field(10, description="执行耗时超过该值（秒）时记录警告日志")
+    health_check_interval: float = Field(5, description="内核健康检查间隔（秒），为0时不检查")
+    replay_on_restart: bool = Field(False, description="内核异常重启后是否重放该对话执行成功的代码以恢复变量")
+    replay_max_cells: int = Field(100, description="每个对话最多记录的可重放代码段数，超出后不再重放")
+    checkpoint_after_cells: bool = Field(False, description="每段代码执行成功后是否把内核中的变量增量保存到检查点，内核重启或服务重启后按需恢复")
+    checkpoint_dir: Optional[str] = Field(None, description="检查点目录，为空时使用data/checkpoints，每个对话一个子目录")
+    checkpoint_timeout: float = Field(120, description="保存检查点的最长时间（秒）")
+    kernel_zygote: bool = Field(False, description="是否由预先导入了常用库的孵化进程fork新内核，仅POSIX系统有效")
+    kernel_workers: List[str] = Field([], description="内核工作节点地址列表（host:port），非空时内核按负载分配到这些节点上运行")
+    kernel_worker_token: str = Field("", description="访问内核工作节点的令牌")
+    local_kernel_workers: int = Field(0, description="在本机启动的工作节点进程数，用于在单台机器上模拟多节点部署，未配置kernel_workers时生效")
+    kernel_memory_limit_mb: Optional[int] = Field(None, description="内核进程地址空间上限（MB），为空表示不限制，仅POSIX系统有效")
+    memory_soft_limit_mb: Optional[int] = Field(2048, description="内核常驻内存软限制（MB），每段代码执行后超过该值时在工具结果中提醒智能体并列出占用最多的变量，为空表示不检查")
+    memory_hard_limit_mb: Optional[int] = Field(4096, description="内核常驻内存硬限制（MB），超过后提醒智能体内核可能被系统终止，开启memory_spill时写出不常用的DataFrame")
+    memory_spill: bool = Field(False, description="超过硬限制时是否把最近若干段代码未使用的DataFrame写入Parquet文件，再次使用时自动加载")
+    memory_spill_dir: Optional[str] = Field(None, description="写出DataFrame的临时文件所在目录，为空时使用系统临时目录，文件在内核退出时自动删除")
+    memory_spill_idle_cells: int = Field(3, description="最近多少段代码中没有用到的DataFrame可以写出")
+    memory_report_top: int = Field(5, description="内存过高时列出的变量数")
+    kernel_idle_timeout: Optional[float] = Field(None, description="内核连续多少分钟没有执行代码后回收，回收时该对话的执行记录写入磁盘，为空表示不回收")
+    checkpoint_on_cull: bool = Field(True, description="回收空闲内核前是否保存检查点，之后再使用该对话时从检查点恢复变量")
+    data_mirror: bool = Field(True, description="内核中的autoanalyze.load()是否把解析过的CSV、Excel等文件保存为Parquet镜像，文件未变化时直接读取镜像")
+    data_cache_dir: Optional[str] = Field(None, description="Parquet镜像目录，为空时使用工作目录下的.autoanalyze_cache")
+    data_cache_max_mb: int = Field(1024, description="Parquet镜像目录的总大小上限（MB），超出后删除最久未使用的镜像")
+    optimize_dataframes: bool = Field(True, description="是否自动压缩pandas读取函数返回的较大DataFrame的内存：低基数字符串列转为category，类型改变的列会在输出中列出")
+    optimize_min_mb: float = Field(10, description="只优化内存占用不小于该值的DataFrame（MB）")
+    optimize_category_ratio: float = Field(0.05, description="字符串列的不同取值数不超过行数的该比例时转为category，为0时不转换")
+    optimize_category_min_rows: int = Field(1000, description="行数少于该值的DataFrame不把字符串列转为category")
+    optimize_parse_dates: bool = Field(False, description="是否把日期格式（年份在前）的字符串列解析为日期时间，之后的比较和序列化结果与字符串不同")
+    optimize_float32: bool = Field(False, description="是否把能用float32精确表示的浮点列降为float32，之后的求和等计算结果只有约7位有效数字")
+    optimize_int32: bool = Field(False, description="是否把取值在32位范围内的64位整数列降为int32，之后的乘法等逐元素运算结果超出范围时溢出")
+
+
+class DatabaseConfig(BaseModel):
+    """数据库配置"""
+    type: str = Field("sqlite", description="数据库类型")
+    path: str = Field("./data/history.db", description="数据库路径")
+
+
+class ServerConfig(BaseModel):
+    """服务器配置"""
+    host: str = Field("127.0.0.1", description="服务器主机")
+    port: int = Field(8000, description="服务器端口")
+    frontend_port: int = Field(3000, description="前端服务器端口")
+
+
+class SystemConfig(BaseModel):
+    """系统配置"""
+    model: Optional[ModelConfig] = Field(None, description="主模型配置")
+    user_model: Optional[ModelConfig] = Field(None, description="用户代理模型配置")
+    vision_model: Optional[ModelConfig] = Field(None, description="视觉模型配置")
+
+
+class ModelStatusResponse(BaseModel):
+    """模型状态响应"""
+    status: str = Field(..., description="模型状态")
+    type: str = Field(..., description="模型类型")
+
+class StatusResponse(BaseModel):
+    """状态响应"""
+    status: str = Field(..., description="状态，'ok'或'error'")
+    version: str = Field(..., description="应用版本")
+    model: ModelStatusResponse = Field(..., description="模型状态")
+    workspace: Optional[str] = Field(None, description="当前工作目录")
+    config: Dict[str, Any] = Field(..., description="当前配置")
     tag:str
\ No newline at end of file
@@ -1,96 +1,134 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
-from datetime import datetime
-import enum
-
-
-class ExecutionStatus(str, enum.Enum):
-    """执行状态枚举"""
-    PENDING = "pending"  # 等待执行
-    RUNNING = "running"  # 正在执行
-    COMPLETED = "completed"  # 执行完成
-    FAILED = "failed"  # 执行失败
-    CANCELLED = "cancelled"  # 执行被取消
-
-
-class ExecutionRequest(BaseModel):
-    """执行请求"""
-    code: str = Field(..., description="要执行的代码")
-    language: str = Field("python", description="代码语言")
-    conversation_id: str = Field(..., description="关联的对话ID")
-
-
-class ExecutionCreate(BaseModel):
-    """执行记录创建模型"""
-    id: str = Field(..., description="执行ID")
-    conversation_id: str = Field(..., description="关联的对话ID")
-    code: str = Field(..., description="执行的代码")
-    language: str = Field("python", description="代码语言")
-    status: ExecutionStatus = Field(ExecutionStatus.PENDING, description="执行状态")
-    created_at: datetime = Field(..., description="创建时间")
-    updated_at: datetime = Field(..., description="更新时间")
-
-
-class ExecutionUpdate(BaseModel):
-    """执行记录更新模型"""
-    status: Optional[ExecutionStatus] = Field(None, description="执行状态")
-    started_at: Optional[datetime] = Field(None, description="开始执行时间")
-    completed_at: Optional[datetime] = Field(None, description="完成执行时间")
-    updated_at: Optional[datetime] = Field(None, description="更新时间")
-
-
-class ExecutionResponse(BaseModel):
-    """执行响应"""
-    id: str = Field(..., description="执行ID")
-    status: ExecutionStatus = Field(..., description="执行状态")
-    created_at: datetime = Field(..., description="创建时间")
-    started_at: Optional[datetime] = Field(None, description="开始执行时间")
-    completed_at: Optional[datetime] = Field(None, description="完成执行时间")
-    conversation_id: str = Field(..., description="关联的对话ID")
-
-    class Config:
-        from_attributes = True
-
-
-class ExecutionOutputType(str, enum.Enum):
-    """执行输出类型枚举"""
-    STDOUT = "stdout"  # 标准输出
-    STDERR = "stderr"  # 标准错误
-    RESULT = "result"  # 执行结果
-    ERROR = "error"  # 执行错误
-
-
-class ExecutionOutputCreate(BaseModel):
-    """执行输出创建模型"""
-    id: str = Field(..., description="输出ID")
-    execution_id: str = Field(..., description="关联的执行ID")
-    output_type: str = Field(..., description="输出类型")
-    content: str = Field(..., description="输出内容")
-    timestamp: datetime = Field(..., description="创建时间")
-
-
-class ExecutionOutput(BaseModel):
-    """执行输出"""
-    id: str = Field(..., description="输出ID")
-    execution_id: str = Field(..., description="关联的执行ID")
-    output_type: str = Field(..., description="输出类型")
-    content: str = Field(..., description="输出内容")
-    sequence: int = Field(..., description="输出序号")
-    created_at: datetime = Field(..., description="创建时间")
-
-    class Config:
-        from_attributes = True
-
-
-class CancelExecutionRequest(BaseModel):
-    """取消执行请求"""
-    execution_id: str = Field(..., description="要取消的执行ID")
-
-
-class ExecutionStatusResponse(BaseModel):
-    """执行状态响应"""
-    status: ExecutionStatus = Field(..., description="执行状态")
-    outputs: List[ExecutionOutput] = Field([], description="执行输出列表")
-
-    class Config:
-        from_attributes = True
\ No newline at end of file
+from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, Any
+from datetime import datetime
+import enum
+
+
+class ExecutionStatus(str, enum.Enum):
+    """执行状态枚举"""
+    PENDING = "pending"  # 等待执行
+    RUNNING = "running"  # 正在执行
+    COMPLETED = "completed"  # 执行完成
+    FAILED = "failed"  # 执行失败
+    CANCELLED = "cancelled"  # 执行被取消
+
+
+class ExecutionRequest(BaseModel):
+    """执行请求"""
+    code: str = Field(..., description="要执行的代码")
+    language: str = Field("python", description="代码语言")
+    conversation_id: str = Field(..., description="关联的对话ID")
+
+
+class ExecutionCreate(BaseModel):
+    """执行记录创建模型"""
+    id: str = Field(..., description="执行ID")
+    conversation_id: str = Field(..., description="关联的对话ID")
+    code: str = Field(..., description="执行的代码")
+    language: str = Field("python", description="代码语言")
+    status: ExecutionStatus = Field(ExecutionStatus.PENDING, description="执行状态")
+    created_at: datetime = Field(..., description="创建时间")
+    updated_at: datetime = Field(..., description="更新时间")
+
+
+class ExecutionUpdate(BaseModel):
+    """执行记录更新模型"""
+    status: Optional[ExecutionStatus] = Field(None, description="执行状态")
+    started_at: Optional[datetime] = Field(None, description="开始执行时间")
+    completed_at: Optional[datetime] = Field(None, description="完成执行时间")
+    updated_at: Optional[datetime] = Field(None, description="更新时间")
+
+
+class ExecutionResponse(BaseModel):
+    """执行响应"""
+    id: str = Field(..., description="执行ID")
+    status: ExecutionStatus = Field(..., description="执行状态")
+    created_at: datetime = Field(..., description="创建时间")
+    started_at: Optional[datetime] = Field(None, description="开始执行时间")
+    completed_at: Optional[datetime] = Field(None, description="完成执行时间")
+    conversation_id: str = Field(..., description="关联的对话ID")
+
+    class Config:
+        from_attributes = True
+
+
+class ExecutionOutputType(str, enum.Enum):
+    """执行输出类型枚举"""
+    STDOUT = "stdout"  # 标准输出
+    STDERR = "stderr"  # 标准错误
+    RESULT = "result"  # 执行结果
+    ERROR = "error"  # 执行错误
+
+
+class ExecutionOutputCreate(BaseModel):
+    """执行输出创建模型"""
+    id: str = Field(..., description="输出ID")
+    execution_id: str = Field(..., description="关联的执行ID")
+    output_type: str = Field(..., description="输出类型")
+    content: str = Field(..., description="输出内容")
+    timestamp: datetime = Field(..., description="创建时间")
+
+
+class ExecutionOutput(BaseModel):
+    """执行输出"""
+    id: str = Field(..., description="输出ID")
+    execution_id: str = Field(..., description="关联的执行ID")
+    output_type: str = Field(..., description="输出类型")
+    content: str = Field(..., description="输出内容")
+    sequence: int = Field(..., description="输出序号")
+    created_at: datetime = Field(..., description="创建时间")
+
+    class Config:
+        from_attributes = True
+
+
+class CancelExecutionRequest(BaseModel):
+    """取消执行请求"""
+    execution_id: str = Field(..., description="要取消的执行ID")
+
+
+class ExecutionStatusResponse(BaseModel):
+    """执行状态响应"""
+    status: ExecutionStatus = Field(..., description="执行状态")
+    outputs: List[ExecutionOutput] = Field([], description="执行输出列表")
+
+    class Config:
+        from_attributes = True
+
+class KernelStats(BaseModel):
+    """单个内核的统计信息"""
+    conversation_id: str = Field(..., description="内核所属的对话ID")
+    kernel_id: Optional[str] = Field(None, description="内核ID")
+    created_at: float = Field(..., description="内核创建时间戳")
+    last_activity: float = Field(..., description="最近一次使用时间戳")
+    running: int = Field(0, description="正在执行的代码数")
+    execution_count: int = Field(0, description="已执行的代码次数")
+    error_count: int = Field(0, description="执行出错的次数")
+    total_execution_time: float = Field(0.0, description="累计执行耗时（秒）")
+    restart_count: int = Field(0, description="内核异常重启的次数")
+    replayed_cells: int = Field(0, description="最近一次重启后重放的代码段数")
+    last_replay_time: Optional[float] = Field(None, description="最近一次重放耗时（秒）")
+    workspace: Optional[str] = Field(None, description="内核当前的工作目录")
+    last_checkpoint: Optional[float] = Field(None, description="最近一次保存检查点的时间戳")
+    checkpoint_bytes: int = Field(0, description="检查点占用的磁盘空间（字节）")
+    rss: Optional[int] = Field(None, description="最近一次执行后内核的常驻内存（字节）")
+    spilled_variables: List[str] = Field([], description="已写入磁盘、再次使用时自动加载的DataFrame")
+    worker: Optional[str] = Field(None, description="内核所在的工作节点地址，在本机运行时为空")
+
+
+class KernelPoolStatusResponse(BaseModel):
+    """内核池状态响应"""
+    engine: str = Field("jupyter", description="执行引擎名称")
+    execution_store: Dict[str, Any] = Field({}, description="执行记录存储的统计信息")
+    max_kernels: int = Field(..., description="内核池最大内核数")
+    evicted_count: int = Field(0, description="因内核池已满被回收的内核数")
+    restart_count: int = Field(0, description="内核异常重启的总次数")
+    cell_cache: Dict[str, Any] = Field({}, description="执行结果缓存的条目数和命中、未命中次数")
+    zygote: Dict[str, Any] = Field({}, description="内核孵化进程的状态和fork次数")
+    placement: Dict[str, Any] = Field({}, description="内核工作节点的负载和分配次数")
+    culling: Dict[str, Any] = Field({}, description="空闲内核回收的次数、回收的内存和最近回收的内核")
+    spare_kernels: int = Field(0, description="当前可用的备用内核数")
+    spare_target: int = Field(0, description="目标备用内核数")
+    spare_hits: int = Field(0, description="直接领取备用内核的次数")
+    spare_misses: int = Field(0, description="没有备用内核、需要现场启动内核的次数")
+    kernels: List[KernelStats] = Field([], description="内核列表")
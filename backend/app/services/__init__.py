@@ -1,2 +1,2 @@
-# 服务模块初始化文件
+# 服务模块初始化文件
 # 此模块包含应用的业务逻辑服务层
\ No newline at end of file
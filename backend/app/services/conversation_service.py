@@ -1,39 +1,62 @@
-from typing import List, Optional, Dict, Any
-from uuid import uuid4
-from datetime import datetime
-from ..schemas.conversation import ConversationCreate
-from sqlalchemy.orm import Session
-
-
-def create_conversation(title: str, db: Session = None) -> Dict[str, Any]:
-    """
-    创建对话
-    
-    Args:
-        title: 对话标题
-        db: 数据库会话
-        
-    Returns:
-        Dict[str, Any]: 创建的对话信息
-    """
- 
-    
-    # 生成对话ID
-    conversation_id = f"conv_{uuid4().hex[:8]}"
-    
-    # 创建对话
-    conversation_data = ConversationCreate(
-        id=conversation_id,
-        title=title,
-        created_at=datetime.now()
-    )
-    
-    # # 保存到数据库
-    # conversation = crud_conversation.create(db, obj_in=conversation_data)
-    
-    return {
-        "id": conversation_id,
-        "title": title,
-        "created_at": datetime.now()
-    }
-
+from typing import List, Optional, Dict, Any
+from uuid import uuid4
+from datetime import datetime
+from ..schemas.conversation import ConversationCreate
+from sqlalchemy.orm import Session
+
+
+def create_conversation(title: str, db: Session = None) -> Dict[str, Any]:
+    """
+    创建对话
+    
+    Args:
+        title: 对话标题
+        db: 数据库会话
+        
+    Returns:
+        Dict[str, Any]: 创建的对话信息
+    """
+ 
+    
+    # 生成对话ID
+    conversation_id = f"conv_{uuid4().hex[:8]}"
+    
+    # 创建对话
+    conversation_data = ConversationCreate(
+        id=conversation_id,
+        title=title,
+        created_at=datetime.now()
+    )
+    
+    # # 保存到数据库
+    # conversation = crud_conversation.create(db, obj_in=conversation_data)
+    
+    return {
+        "id": conversation_id,
+        "title": title,
+        "created_at": datetime.now()
+    }
+
+
+async def branch_conversation(conversation_id: str, title: Optional[str] = None) -> Dict[str, Any]:
+    """
+    从已有对话分出新对话，复制智能体的消息历史和内核中的变量
+
+    Args:
+        conversation_id: 源对话ID
+        title: 新对话标题，为空时在源对话ID后加"分支"
+
+    Returns:
+        Dict[str, Any]: 新对话信息，包含源对话ID和可恢复的变量
+    """
+    from app.core.execution_engine import execution_engine
+    from app.services.model_service import branch_agent
+
+    conversation = create_conversation(title or f"{conversation_id} 分支")
+    result = await execution_engine.branch_conversation(conversation_id, conversation["id"])
+    branch_agent(conversation_id, conversation["id"])
+    return {
+        **conversation,
+        "source_id": conversation_id,
+        "variables": result["variables"],
+    }
@@ -0,0 +1,46 @@
+import os
+
+from app.core.cell_cache import CellCache, analyze_cell
+
+
+def test_self_contained_cell_is_cacheable():
+    cell = analyze_cell("import pandas as pd\nprint(pd.read_csv('sales.csv').describe())")
+    assert cell == {"reads": ["sales.csv"], "imports": ["import pandas as pd"]}
+
+
+def test_comprehension_variables_do_not_block_caching():
+    assert analyze_cell("print([i * i for i in range(3)])") is not None
+
+
+def test_cells_with_state_or_side_effects_are_not_cacheable():
+    for code in [
+        "x = 1",  # 绑定新变量
+        "print(df.head())",  # 依赖之前定义的变量
+        "import random\nprint(random.random())",  # 结果不确定
+        "import pandas as pd\npd.DataFrame({'a': [1]}).to_csv('out.csv')",  # 写文件
+        "import pandas as pd\nprint(pd.read_csv(path))",  # 路径不是常量
+        "import pandas as pd\nprint(pd.read_sql('SELECT 1', 'sqlite:///x.db'))",  # 读取数据库
+        "!ls",  # shell命令
+        "%%time\nprint(1)",  # 单元格魔法
+        "print((",  # 语法错误
+    ]:
+        assert analyze_cell(code) is None, code
+
+
+def test_lookup_hits_until_input_file_changes(tmp_path):
+    (tmp_path / "data.csv").write_text("a\n1\n")
+    cache = CellCache()
+    code = "import pandas as pd\nprint(pd.read_csv('data.csv'))"
+
+    cell, cached = cache.lookup(code, str(tmp_path))
+    assert cell is not None and cached is None
+    cache.put(cell, {"output": [{"type": "stdout", "content": "   a\n0  1\n"}], "images": []})
+
+    cell, cached = cache.lookup(code, str(tmp_path))
+    assert cached["output"][0]["content"] == "   a\n0  1\n"
+    assert cached["imports"] == ["import pandas as pd"]
+
+    (tmp_path / "data.csv").write_text("a\n1\n2\n")
+    os.utime(tmp_path / "data.csv", ns=(0, 0))
+    assert cache.lookup(code, str(tmp_path))[1] is None
+    assert cache.stats()["hits"] == 1
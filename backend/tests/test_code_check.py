@@ -0,0 +1,67 @@
+from app.core.agent.code_check import check_syntax, file_accesses, find_missing_files, strip_ipython_syntax, written_files
+
+
+def test_continuation_lines_starting_with_operators_are_kept():
+    code = "mask = (df['a']\n        != 0)\ntotal = (x\n         % 7)\nprint(mask, total)"
+    source = strip_ipython_syntax(code)
+    assert source == code
+    tree, error = check_syntax(source)
+    assert error is None and tree is not None
+
+
+def test_magics_and_shell_commands_become_python():
+    code = "\n%matplotlib inline\nfiles = !ls\nif files:\n    !echo hi\nprint(files)"
+    source = strip_ipython_syntax(code)
+    lines = source.split("\n")
+    assert len(lines) == len(code.split("\n"))
+    assert lines[0] == ""
+    assert lines[1] == "get_ipython().run_line_magic('matplotlib', 'inline')"
+    assert lines[2] == "files = get_ipython().getoutput('ls')"
+    assert check_syntax(source)[1] is None
+
+
+def test_cell_magics_are_not_checked():
+    assert strip_ipython_syntax("%%time\nx = 1") is None
+
+
+def test_syntax_errors_keep_original_line_numbers():
+    _, error = check_syntax(strip_ipython_syntax("\n!ls\nx = (1,\n"))
+    assert error is not None and error["line"] == 3
+
+
+def missing(code, workspace):
+    tree, _ = check_syntax(code)
+    return [error["path"] for error in find_missing_files(tree, str(workspace))]
+
+
+def test_missing_files_only_checks_path_readers(tmp_path):
+    (tmp_path / "sales.csv").write_text("a\n1\n")
+    code = (
+        "import pandas as pd\n"
+        "a = pd.read_csv('sales.csv')\n"
+        "b = pd.read_sql('SELECT * FROM sales', conn)\n"
+        "c = pd.read_sql_query('SELECT 1', conn)\n"
+        "d = pd.read_html('<table><tr><td>1</td></tr></table>')\n"
+        "e = pd.read_json('{\"a\": [1, 2]}')\n"
+        "f = pd.read_excel('sale.xlsx')\n"
+    )
+    assert missing(code, tmp_path) == ["sale.xlsx"]
+
+
+def test_files_written_by_earlier_batch_blocks_are_not_missing(tmp_path):
+    blocks = [
+        "import pandas as pd\ndf = pd.DataFrame({'a': [1]})\ndf.to_csv('out.csv')",
+        "import pandas as pd\ndf = pd.read_csv('./out.csv')\nother = pd.read_csv('other.csv')",
+    ]
+    written = written_files(blocks[0])
+    assert written == {"out.csv"}
+    tree, _ = check_syntax(blocks[1])
+    errors = find_missing_files(tree, str(tmp_path), written)
+    assert [error["path"] for error in errors] == ["other.csv"]
+    assert written_files("x = (") == set()
+
+
+def test_database_reads_are_not_file_reads():
+    tree, _ = check_syntax("import pandas as pd\ndf = pd.read_sql('SELECT 1', 'sqlite:///x.db')")
+    reads, written, dynamic = file_accesses(tree)
+    assert reads == [] and not written and dynamic
@@ -0,0 +1,105 @@
+import time
+
+from app.core.execution_store import ExecutionStore
+
+
+def make_record(conversation_id, text, end_time=None):
+    return {
+        "conversation_id": conversation_id,
+        "code": "print('x')",
+        "status": "completed",
+        "output": [{"type": "stdout", "content": text, "timestamp": 0.0}],
+        "images": [],
+        "end_time": end_time or time.time(),
+    }
+
+
+def add_finished(store, execution_id, record):
+    store[execution_id] = record
+    store.mark_finished(execution_id)
+
+
+def test_finished_records_over_limit_are_spilled_and_loaded(tmp_path):
+    store = ExecutionStore(str(tmp_path), max_records=2)
+    for index in range(3):
+        add_finished(store, f"e{index}", make_record("c1", f"output {index}\n"))
+
+    assert len(store) == 2
+    assert (tmp_path / "e0" / "record.json").exists()
+    assert store.stats()["spilled_count"] == 1
+
+    assert "e0" in store
+    record = store["e0"]
+    assert record["output"][0]["content"] == "output 0\n"
+    assert record["conversation_id"] == "c1"
+    assert store.stats()["loaded_count"] == 1
+    # 加载后仍不超过上限，最久未访问的记录被写出
+    assert len(store) == 2
+
+
+def test_running_records_stay_in_memory(tmp_path):
+    store = ExecutionStore(str(tmp_path), max_records=1)
+    store["running"] = make_record("c1", "partial\n")
+    add_finished(store, "done", make_record("c1", "done\n"))
+    add_finished(store, "later", make_record("c1", "later\n"))
+    assert "running" in store.records
+    assert not (tmp_path / "running").exists()
+
+
+def test_expired_records_are_spilled(tmp_path):
+    store = ExecutionStore(str(tmp_path), ttl=60)
+    add_finished(store, "old", make_record("c1", "old\n", end_time=time.time() - 120))
+    assert "old" not in store.records
+    assert store.get("old")["output"][0]["content"] == "old\n"
+
+
+def test_drop_conversation_removes_memory_and_disk_records(tmp_path):
+    store = ExecutionStore(str(tmp_path), max_records=1)
+    add_finished(store, "a1", make_record("a", "a1\n"))
+    add_finished(store, "a2", make_record("a", "a2\n"))
+    add_finished(store, "b1", make_record("b", "b1\n"))
+    store["a3"] = make_record("a", "running\n")
+
+    dropped, freed = store.drop_conversation("a")
+    assert dropped == 2
+    assert freed == 0  # a1、a2都已写入磁盘
+    assert store.get("a1") is None and store.get("a2") is None
+    assert store.get("b1")["output"][0]["content"] == "b1\n"
+    # 正在执行的记录不删除
+    assert "a3" in store.records
+
+
+def test_drop_conversation_reports_freed_memory(tmp_path):
+    store = ExecutionStore(str(tmp_path))
+    add_finished(store, "a1", make_record("a", "x" * 100))
+    assert store.drop_conversation("a") == (1, len("print('x')") + 100)
+    assert len(store) == 0
+
+
+def test_spill_conversation_keeps_records_on_disk(tmp_path):
+    store = ExecutionStore(str(tmp_path))
+    add_finished(store, "a1", make_record("a", "a1\n"))
+    add_finished(store, "b1", make_record("b", "b1\n"))
+    store["a2"] = make_record("a", "running\n")
+
+    spilled, freed = store.spill_conversation("a")
+    assert spilled == 1 and freed > 0
+    assert "a1" not in store.records and "b1" in store.records
+    assert "a2" in store.records
+    assert store.get("a1")["output"][0]["content"] == "a1\n"
+
+
+def test_rich_output_payload_counts_towards_memory(tmp_path):
+    store = ExecutionStore(str(tmp_path), max_memory_mb=1)
+    record = make_record("a", "")
+    record["output"] = [
+        {"type": "table", "content": '{"columns":["a"]}', "mime": "text/html",
+         "data": "<table>" + "<tr><td>1</td></tr>" * 100000 + "</table>", "timestamp": 0.0},
+        {"type": "plotly", "content": "[Plotly图表]", "mime": "text/html",
+         "data": {"data": [{"y": list(range(100))}]}, "timestamp": 0.0},
+    ]
+    assert ExecutionStore._estimate_size(record) > 100000 * len("<tr><td>1</td></tr>")
+    add_finished(store, "big", record)
+    # 表格HTML超过内存上限，记录写入磁盘
+    assert "big" not in store.records
+    assert store.get("big")["output"][0]["data"].startswith("<table>")
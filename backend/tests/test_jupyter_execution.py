@@ -0,0 +1,53 @@
+import asyncio
+
+from app.core.jupyter_execution import JupyterExecutionEngine
+from app.schemas.config import ExecutionConfig
+
+
+def make_engine(tmp_path, **options):
+    config = ExecutionConfig(
+        max_kernels=2,
+        spare_kernels=0,
+        health_check_interval=0,
+        memoize_cells=False,
+        execution_store_dir=str(tmp_path / "executions"),
+        image_store_dir=str(tmp_path / "images"),
+        output_store_dir=str(tmp_path / "outputs"),
+        checkpoint_dir=str(tmp_path / "checkpoints"),
+        **options,
+    )
+    return JupyterExecutionEngine(config)
+
+
+async def run(engine, code, conversation_id="c1"):
+    execution_id = await engine.execute_code(code, None, conversation_id, None)
+    result = await engine.wait_for_completion(execution_id)
+    return execution_id, result["status"], "".join(item["content"] for item in result["output"]).strip()
+
+
+def test_culling_is_off_by_default():
+    assert ExecutionConfig().kernel_idle_timeout is None
+
+
+def test_culled_kernel_keeps_records_and_restores_variables(tmp_path):
+    async def scenario():
+        engine = make_engine(tmp_path, checkpoint_on_cull=True)
+        await engine.start()
+        try:
+            execution_id, status, _ = await run(engine, "x = 41\nprint('saved')")
+            assert status == "completed"
+
+            culled = await engine.cull_idle_kernels(idle_timeout=0)
+            assert [info["conversation_id"] for info in culled] == ["c1"]
+            assert culled[0]["checkpointed"] and culled[0]["spilled_records"] == 1
+            assert engine.kernel_pool.get("c1") is None
+            # 执行记录写入磁盘后仍可读取
+            assert execution_id not in engine.executions.records
+            assert engine.executions.get(execution_id)["output"][0]["content"] == "saved\n"
+
+            _, status, output = await run(engine, "print(x + 1)")
+            assert (status, output) == ("completed", "42")
+        finally:
+            await engine.cleanup()
+
+    asyncio.run(scenario())
@@ -0,0 +1,228 @@
+import asyncio
+import queue
+import time
+import uuid
+
+import pytest
+
+from app.core.kernel_pool import KernelPool
+
+
+class FakeHeartbeat:
+    def is_beating(self):
+        return True
+
+
+class FakeClient:
+    """在内核管理器的命名空间中直接执行代码，并按Jupyter的顺序产生IOPub消息"""
+
+    def __init__(self, km):
+        self.km = km
+        self.messages = asyncio.Queue()
+        self.hb_channel = FakeHeartbeat()
+
+    def start_channels(self):
+        pass
+
+    def stop_channels(self):
+        pass
+
+    async def wait_for_ready(self, timeout=None):
+        pass
+
+    def execute(self, code, silent=False, store_history=True):
+        msg_id = str(uuid.uuid4())
+        self.km.executed.append(code)
+        try:
+            exec(code, self.km.namespace)
+        except Exception as e:
+            self._put(msg_id, "error", {"ename": type(e).__name__, "evalue": str(e), "traceback": []})
+        if not code.startswith("# slow"):
+            # 以# slow开头的代码一直不结束
+            self._put(msg_id, "status", {"execution_state": "idle"})
+        return msg_id
+
+    def _put(self, msg_id, msg_type, content):
+        self.messages.put_nowait({"parent_header": {"msg_id": msg_id}, "header": {"msg_type": msg_type},
+                                  "content": content})
+
+    async def get_iopub_msg(self, timeout=None):
+        if timeout is None:
+            return await self.messages.get()
+        try:
+            return await asyncio.wait_for(self.messages.get(), timeout)
+        except asyncio.TimeoutError:
+            raise queue.Empty
+
+
+class FakeKernelManager:
+    def __init__(self, kernel_name="python3"):
+        self.namespace = {}
+        self.executed = []
+        self.alive = True
+        self.interrupts = 0
+
+    async def start_kernel(self, **kwargs):
+        pass
+
+    def client(self):
+        return FakeClient(self)
+
+    async def restart_kernel(self, now=False):
+        self.namespace = {}
+        self.executed = []
+        self.alive = True
+
+    async def interrupt_kernel(self):
+        self.interrupts += 1
+
+    async def shutdown_kernel(self, now=False):
+        self.alive = False
+
+    async def is_alive(self):
+        return self.alive
+
+
+def make_pool(**options):
+    options.setdefault("health_check_interval", 0)
+    return KernelPool(kernel_manager_class=FakeKernelManager, **options)
+
+
+async def run(pool, entry, code):
+    """执行代码并像执行引擎一样记录执行成功的代码"""
+    await pool._execute_silent(entry, code)
+    pool.record_history(entry, code)
+
+
+def test_replay_keeps_only_cells_before_the_first_failure():
+    async def scenario():
+        pool = make_pool(replay_on_restart=True)
+        entry = await pool.acquire("c1")
+        await run(pool, entry, "x = 1")
+        # 原本执行成功、重启后失败的代码，例如读取的文件已被删除
+        pool.record_history(entry, "raise FileNotFoundError('data.csv')")
+        await run(pool, entry, "y = x + 1")
+
+        assert await pool.restart_kernel("c1")
+        km = entry["kernel_manager"]
+        assert km.namespace["x"] == 1 and "y" not in km.namespace
+        assert entry["replayed_cells"] == 1
+        assert [code for _, code in entry["history"]] == ["x = 1"]
+        assert km.interrupts == 1
+        await pool.shutdown_all()
+
+    asyncio.run(scenario())
+
+
+def test_replay_stops_when_a_cell_times_out():
+    async def scenario():
+        pool = make_pool(replay_on_restart=True, replay_timeout=0.05)
+        entry = await pool.acquire("c1")
+        await run(pool, entry, "x = 1")
+        # 原本很快结束、重放时超时的代码
+        pool.record_history(entry, "# slow\ny = 2")
+        await run(pool, entry, "z = 3")
+
+        assert await pool.restart_kernel("c1")
+        km = entry["kernel_manager"]
+        assert [code for _, code in entry["history"]] == ["x = 1"]
+        assert "z" not in km.namespace and km.interrupts == 1
+        assert entry["ready"].is_set()
+        await pool.shutdown_all()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("replay", [False, True])
+def test_stale_checkpoint_is_not_restored_without_the_later_cells(replay):
+    async def scenario():
+        pool = make_pool(replay_on_restart=replay, restore_code=lambda cid, load_all: "x = 'checkpoint'")
+        entry = await pool.acquire("c1")
+        # 新建内核时已从检查点恢复，检查点覆盖创建之前的代码
+        assert entry["checkpoint_covers"] == entry["created_at"]
+        await run(pool, entry, "x = 'newer'")
+
+        await pool.restart_kernel("c1")
+        namespace = entry["kernel_manager"].namespace
+        if replay:
+            # 恢复检查点后只重放之后执行成功的代码
+            assert namespace["x"] == "newer"
+            assert entry["kernel_manager"].executed[-2:] == ["x = 'checkpoint'", "x = 'newer'"]
+            assert entry["checkpoint_covers"] is not None
+        else:
+            assert "x" not in namespace
+            assert entry["checkpoint_covers"] is None
+        await pool.shutdown_all()
+
+    asyncio.run(scenario())
+
+
+def test_current_checkpoint_is_restored_without_replay():
+    async def scenario():
+        pool = make_pool(replay_on_restart=True, restore_code=lambda cid, load_all: "x = 'checkpoint'")
+        entry = await pool.acquire("c1")
+        await run(pool, entry, "x = 'newer'")
+        # 检查点在这之后保存，包含全部执行成功的代码的结果
+        entry["checkpoint_covers"] = time.time()
+
+        await pool.restart_kernel("c1")
+        km = entry["kernel_manager"]
+        assert km.namespace["x"] == "checkpoint"
+        assert "x = 'newer'" not in km.executed
+        assert [code for _, code in entry["history"]] == ["x = 'newer'"]
+        await pool.shutdown_all()
+
+    asyncio.run(scenario())
+
+
+def test_before_evict_runs_before_the_lru_kernel_is_shut_down():
+    async def scenario():
+        evicted = []
+
+        async def before_evict(entry):
+            evicted.append((entry["conversation_id"], entry["kernel_manager"].alive))
+
+        pool = make_pool(max_size=1, before_evict=before_evict)
+        first = await pool.acquire("c1")
+        await pool.acquire("c2")
+        assert evicted == [("c1", True)]
+        assert not first["kernel_manager"].alive
+        assert list(pool.kernels) == ["c2"] and pool.evicted_count == 1
+        await pool.shutdown_all()
+
+    asyncio.run(scenario())
+
+
+def test_kernel_used_during_before_evict_is_kept():
+    async def scenario():
+        async def before_evict(entry):
+            # 保存检查点期间该对话又开始执行代码
+            entry["running"] += 1
+
+        pool = make_pool(max_size=1, before_evict=before_evict)
+        first = await pool.acquire("c1")
+        with pytest.raises(RuntimeError):
+            await pool.acquire("c2")
+        assert pool.get("c1") is first and first["kernel_manager"].alive
+        assert pool.evicted_count == 0
+        await pool.shutdown_all()
+
+    asyncio.run(scenario())
+
+
+def test_monitor_restarts_dead_kernel_and_replays():
+    async def scenario():
+        pool = make_pool(replay_on_restart=True, health_check_interval=0.01)
+        pool.start()
+        entry = await pool.acquire("c1")
+        await run(pool, entry, "x = 1")
+        entry["kernel_manager"].alive = False
+        for _ in range(100):
+            if entry["restart_count"]:
+                break
+            await asyncio.sleep(0.01)
+        assert entry["restart_count"] == 1
+        assert entry["kernel_manager"].namespace["x"] == 1
+        await pool.shutdown_all()
+
+    asyncio.run(scenario())
@@ -0,0 +1,146 @@
+import pandas as pd
+import pytest
+
+from app.core import kernel_runtime
+from app.core.kernel_runtime import DataFrameOptimizer, DataLoader
+
+
+def make_frame():
+    return pd.DataFrame({
+        "age": [42, 44, 46] * 400,
+        "qty": [3, 2, 1] * 400,
+        "city": ["北京", "上海", "广州"] * 400,
+    })
+
+
+def test_optimizer_keeps_int64_by_default():
+    df = make_frame()
+    DataFrameOptimizer(min_bytes=0).optimize(df)
+    assert df["age"].dtype == "int64"
+    assert (df["age"] * 100).tolist()[:3] == [4200, 4400, 4600]
+    assert (df["qty"] * df["age"]).max() == 126
+    assert isinstance(df["city"].dtype, pd.CategoricalDtype)
+
+
+def test_optimizer_only_converts_low_cardinality_strings(capsys):
+    df = make_frame()
+    df["half_unique"] = [f"id{i // 2}" for i in range(len(df))]
+    df["day"] = ["2024-01-31", "2024-02-01"] * (len(df) // 2)
+    DataFrameOptimizer(min_bytes=0, category_ratio=0.05).optimize(df)
+    assert not isinstance(df["half_unique"].dtype, pd.CategoricalDtype)
+    # 日期解析默认关闭，低基数的日期字符串同样按category处理
+    assert not pd.api.types.is_datetime64_any_dtype(df["day"])
+    output = capsys.readouterr().out
+    assert "'city'" in output and "astype(str)" in output
+
+
+def test_optimizer_skips_category_for_few_rows():
+    df = pd.DataFrame({"city": ["北京", "上海"] * 50})
+    assert DataFrameOptimizer(min_bytes=0).optimize(df) is None
+    assert not isinstance(df["city"].dtype, pd.CategoricalDtype)
+
+
+def test_optimizer_parses_dates_when_enabled():
+    df = pd.DataFrame({"day": [f"2024-01-{i % 28 + 1:02d}" for i in range(2000)]})
+    DataFrameOptimizer(min_bytes=0, parse_dates=True).optimize(df)
+    assert pd.api.types.is_datetime64_any_dtype(df["day"])
+
+
+def test_optimizer_downcasts_ints_to_int32_at_most():
+    df = make_frame()
+    DataFrameOptimizer(min_bytes=0, downcast_ints=True).optimize(df)
+    assert df["age"].dtype == "int32"
+    assert (df["age"] * 100).tolist()[:3] == [4200, 4400, 4600]
+
+
+def test_optimizer_keeps_ints_out_of_int32_range():
+    df = pd.DataFrame({"id": [1, 2 ** 40]})
+    assert DataFrameOptimizer(min_bytes=0, downcast_ints=True).optimize(df) is None
+    assert df["id"].dtype == "int64"
+
+
+def test_optimizer_skips_small_frames():
+    df = make_frame()
+    assert DataFrameOptimizer(min_bytes=1024 * 1024).optimize(df) is None
+    assert df["city"].dtype != "category"
+
+
+def test_loader_caches_until_file_changes(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,x\n2,y\n", encoding="utf-8")
+    loader = DataLoader(cache_dir=str(tmp_path / "cache"))
+    first = loader.load(str(path))
+    first.loc[0, "a"] = 100
+    assert loader.load(str(path))["a"].tolist() == [1, 2]
+    assert loader.stats["memo_hits"] == 1
+
+    path.write_text("a,b\n3,z\n", encoding="utf-8")
+    assert loader.load(str(path))["a"].tolist() == [3]
+    assert loader.stats["parsed"] == 2
+
+
+def test_loader_skips_cache_for_callable_options(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,x\n2,y\n", encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+    loader = DataLoader(cache_dir=str(cache_dir))
+    for _ in range(3):
+        df = loader.load(str(path), usecols=lambda name: name == "a")
+        assert df.columns.tolist() == ["a"]
+    assert loader.stats["uncached"] == 3
+    assert not cache_dir.exists()
+    # 只包含基本类型的参数照常缓存
+    loader.load(str(path), usecols=["a"])
+    loader.load(str(path), usecols=["a"])
+    assert loader.stats["memo_hits"] == 1
+    assert len(list(cache_dir.iterdir())) == 1
+
+
+def test_loader_prunes_least_recently_used_mirrors(tmp_path):
+    cache_dir = tmp_path / "cache"
+    paths = []
+    for index in range(3):
+        path = tmp_path / f"data{index}.csv"
+        path.write_text("a\n" + "\n".join(str(i) for i in range(1000)), encoding="utf-8")
+        paths.append(path)
+    loader = DataLoader(cache_dir=str(cache_dir))
+    loader.load(str(paths[0]))
+    mirror_size = sum(f.stat().st_size for f in cache_dir.iterdir())
+    loader.mirror_bytes = mirror_size * 2
+    loader.load(str(paths[1]))
+    loader.load(str(paths[2]))
+    assert len(list(cache_dir.iterdir())) == 2
+    # 最早的镜像被删除，之后的内核需要重新解析
+    fresh = DataLoader(cache_dir=str(cache_dir))
+    fresh.load(str(paths[0]))
+    assert fresh.stats["parsed"] == 1
+
+
+def test_optimize_helper_ignores_size_threshold(monkeypatch):
+    monkeypatch.setattr(kernel_runtime, "_optimizer", None)
+    df = make_frame()
+    result = kernel_runtime.optimize(df)
+    assert result is not None and result["after"] < result["before"]
+    assert df["age"].dtype == "int64"
+
+
+def test_optimizer_keeps_nullable_ints_nullable():
+    df = pd.DataFrame({"n": pd.array([1, None, 3], dtype="Int64")})
+    DataFrameOptimizer(min_bytes=0, downcast_ints=True).optimize(df)
+    assert str(df["n"].dtype) == "Int32"
+    assert df["n"].isna().tolist() == [False, True, False]
+
+
+def test_loader_falls_back_to_gb18030(tmp_path):
+    path = tmp_path / "gbk.csv"
+    path.write_bytes("城市,人口\n北京,2189\n".encode("gb18030"))
+    df = DataLoader(mirror=False).load(str(path))
+    assert df.columns.tolist() == ["城市", "人口"]
+    assert df["城市"].tolist() == ["北京"]
+
+
+def test_loader_raises_for_undecodable_csv(tmp_path):
+    path = tmp_path / "binary.csv"
+    path.write_bytes(b"a,b\n\xff\xfe\x81\x30,1\n")
+    with pytest.raises(UnicodeDecodeError):
+        DataLoader(mirror=False).load(str(path))
@@ -0,0 +1,126 @@
+import asyncio
+
+from app.core.output_buffer import OutputCoalescer, OutputLimiter, _split_pending, collapse_carriage_returns
+
+
+def item(content, output_type='stdout'):
+    return {'type': output_type, 'content': content, 'timestamp': 0.0}
+
+
+def lines(start, stop):
+    return ''.join(f"line {i}\n" for i in range(start, stop))
+
+
+def test_limiter_keeps_small_output(tmp_path):
+    limiter = OutputLimiter(str(tmp_path / 'full_output.txt'), max_lines=10, tail_lines=3)
+    assert limiter.add(item(lines(0, 5))) == [item(lines(0, 5))]
+    assert limiter.finish() == []
+    assert limiter.summary() is None
+    assert not (tmp_path / 'full_output.txt').exists()
+
+
+def test_limiter_spills_every_line_once(tmp_path):
+    spill_path = tmp_path / 'full_output.txt'
+    limiter = OutputLimiter(str(spill_path), max_lines=10, tail_lines=3)
+    limiter.add(item(lines(0, 4)))
+    # 越过上限的这一段只有一部分保留在开头
+    result = limiter.add(item(lines(4, 14)))
+    assert result[0]['content'] == lines(4, 10)
+    assert result[1]['type'] == 'system'
+    limiter.add(item(lines(14, 20), 'stderr'))
+    tail = limiter.finish()
+
+    assert spill_path.read_text(encoding='utf-8') == lines(0, 20)
+    assert [entry['content'] for entry in tail] == [lines(17, 20)]
+    assert tail[0]['type'] == 'stderr'
+    summary = limiter.summary()
+    assert summary['total_lines'] == 20
+    assert summary['kept_head_lines'] == 10
+    assert summary['kept_tail_lines'] == 3
+    assert str(spill_path) in result[1]['content']
+
+
+def test_limiter_spills_when_first_item_crosses_limit(tmp_path):
+    spill_path = tmp_path / 'full_output.txt'
+    limiter = OutputLimiter(str(spill_path), max_bytes=20, tail_lines=2)
+    result = limiter.add(item(lines(0, 6)))
+    assert result[0]['content'] == lines(0, 2)
+    limiter.finish()
+    assert spill_path.read_text(encoding='utf-8') == lines(0, 6)
+
+
+def test_limiter_caps_single_huge_line(tmp_path):
+    limiter = OutputLimiter(str(tmp_path / 'full_output.txt'), max_bytes=50000, tail_bytes=1000)
+    kept = limiter.add(item('x' * 5_000_000))
+    kept += limiter.add(item('y' * 5_000_000))
+    kept += limiter.finish()
+    assert sum(len(entry['content']) for entry in kept) < 2000
+    assert kept[-1]['content'] == 'y' * 1000
+    assert '末尾部分' in kept[0]['content']
+    assert limiter.summary()['total_bytes'] == 10_000_000
+
+
+def test_limiter_caps_total_tail_bytes(tmp_path):
+    limiter = OutputLimiter(str(tmp_path / 'full_output.txt'), max_bytes=50000, tail_lines=100, tail_bytes=20000)
+    kept = []
+    for i in range(2000):
+        kept += limiter.add(item(f"{i:05d}" + 'z' * 5000 + '\n'))
+    tail = limiter.finish()
+    assert sum(len(entry['content'].encode('utf-8')) for entry in kept + tail) <= 50000 + 20000 + 1000
+    assert tail[-1]['content'].endswith('\n')
+    assert tail[-1]['content'].splitlines()[-1].startswith('01999')
+    assert limiter.summary()['kept_tail_lines'] == 3
+
+
+def test_collapse_carriage_returns_keeps_last_state_of_each_line():
+    assert collapse_carriage_returns("plain\n") == "plain\n"
+    assert collapse_carriage_returns(" 10%\r 50%\r100%\ndone\n") == "100%\ndone\n"
+    assert collapse_carriage_returns("abcdef\rXY") == "XYcdef"
+    assert collapse_carriage_returns("a\r\nb") == "a\nb"
+
+
+def test_split_pending_holds_unfinished_progress_line():
+    assert _split_pending("a\nb") == ("a\nb", "")
+    assert _split_pending("a\n 10%\r 20%") == ("a\n", " 20%")
+    assert _split_pending("a\n 10%\r") == ("a\n", " 10%\r")
+    assert _split_pending(" 10%\r 20%\n") == (" 10%\r 20%\n", "")
+
+
+def run_coalescer(writes):
+    """依次写入(流名称, 文本)，None表示一次定时刷新，最后关闭"""
+    emitted = []
+
+    async def emit(execution_id, text, stream_name, extra=None):
+        emitted.append((text, stream_name, bool(extra and extra.get('progress'))))
+
+    async def main():
+        coalescer = OutputCoalescer(emit, flush_interval=60)
+        for write in writes:
+            if write is None:
+                await coalescer.flush('e1')
+            else:
+                await coalescer.write('e1', *write)
+        await coalescer.close('e1')
+
+    asyncio.run(main())
+    return emitted
+
+
+def test_coalescer_sends_live_progress_and_persists_final_line():
+    emitted = run_coalescer([
+        ('stderr', 'start\n 10%\r'), None,
+        ('stderr', ' 20%\r 30%\r'), None,
+        None,
+        ('stderr', '100%\n'), None,
+    ])
+    assert emitted == [
+        ('start\n', 'stderr', False),
+        (' 10%', 'stderr', True),
+        (' 30%', 'stderr', True),
+        ('100%\n', 'stderr', False),
+    ]
+
+
+def test_coalescer_persists_unfinished_line_at_close():
+    emitted = run_coalescer([('stdout', 'a\rbb\rccc'), None])
+    assert emitted == [('ccc', 'stdout', True), ('ccc', 'stdout', False)]
@@ -0,0 +1,31 @@
+from app.core.image_store import ImageStore
+from app.core.rich_output import build_rich_output
+
+
+def test_large_html_content_is_clipped_and_points_to_payload(tmp_path):
+    store = ImageStore(str(tmp_path), url_prefix="/api/outputs")
+    html = "<table>" + "<tr><td>cell</td></tr>" * 10000 + "</table>"
+    item = build_rich_output({"text/html": html, "text/plain": "<IPython.core.display.HTML object>"},
+                             store, inline_bytes=1000)
+    assert "data" not in item
+    assert len(item["content"].encode("utf-8")) < 1200
+    assert item["url"] in item["content"]
+    assert store.find(item["url"].rsplit("/", 1)[-1]).read_text(encoding="utf-8") == html
+
+
+def test_large_json_content_is_clipped_and_stored(tmp_path):
+    store = ImageStore(str(tmp_path), url_prefix="/api/outputs")
+    value = {"values": ["数据"] * 10000}
+    item = build_rich_output({"application/json": value}, store, inline_bytes=1000)
+    assert len(item["content"].encode("utf-8")) < 1200
+    assert item["content_url"] in item["content"]
+    stored = store.find(item["content_url"].rsplit("/", 1)[-1])
+    assert stored.suffix == ".json"
+    assert stored.read_text(encoding="utf-8").startswith('{"values":["数据"')
+
+
+def test_small_json_content_is_kept(tmp_path):
+    store = ImageStore(str(tmp_path), url_prefix="/api/outputs")
+    item = build_rich_output({"application/json": {"a": 1}}, store)
+    assert item == {"type": "json", "content": '{"a":1}', "mime": "application/json"}
+    assert not any(tmp_path.iterdir())
@@ -0,0 +1,27 @@
+import subprocess
+import sys
+import time
+
+from app.core import zygote_server
+
+
+def test_fork_forgets_exit_code_of_reused_pid(monkeypatch):
+    pid = 424242
+    monkeypatch.setitem(zygote_server._exited, pid, -9)
+    monkeypatch.setattr(zygote_server.os, "fork", lambda: pid)
+    monkeypatch.setattr(zygote_server, "_reap", lambda: None)
+    # 新的子进程仍在运行
+    monkeypatch.setattr(zygote_server.os, "kill", lambda target, sig: None)
+
+    assert zygote_server._handle({"op": "fork"}, None, None) == {"pid": pid}
+    assert zygote_server._handle({"op": "poll", "pid": pid}, None, None) == {"returncode": None}
+
+
+def test_poll_reports_exit_code_of_reaped_child():
+    pid = subprocess.Popen([sys.executable, "-c", "raise SystemExit(3)"]).pid
+    deadline = time.time() + 5
+    response = zygote_server._handle({"op": "poll", "pid": pid}, None, None)
+    while response["returncode"] is None and time.time() < deadline:
+        time.sleep(0.01)
+        response = zygote_server._handle({"op": "poll", "pid": pid}, None, None)
+    assert response == {"returncode": 3}
@@ -147,6 +147,7 @@ export default {
       terminate: 'Terminate',
       stderr: 'Standard Error',
       stdout: 'Standard Output',
+      richOutput: 'Rich Output',
       code: 'Code',
       imageOutput: 'Execution result image'
     },
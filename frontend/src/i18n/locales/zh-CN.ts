@@ -152,6 +152,7 @@ export default {
       terminate: '终止执行',
       stderr: '标准错误',
       stdout: '标准输出',
+      richOutput: '富文本输出',
       code: '代码',
       imageOutput: '执行结果图片'
     },
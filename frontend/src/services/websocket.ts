@@ -1,7 +1,7 @@
 import { ref } from 'vue'
 import { configService } from './config'
 import { useConversationStore } from '../stores/conversation'
-import { useCodeExecutionStore } from '../stores/codeExecution'
+import { useCodeExecutionStore, appendOutput } from '../stores/codeExecution'
 import { ElMessage } from 'element-plus'
 import type { OutputItem, ImageItem, ExecutionStatus } from '../types'
 
@@ -184,7 +184,7 @@ export const websocketService = {
         // 保持兼容性，同时更新本地状态
         if (this.executionStatus.value[executionId]) {
           // 添加到输出列表
-          this.executionStatus.value[executionId].output.push(message.data.output)
+          appendOutput(this.executionStatus.value[executionId].output, message.data.output)
           
           // 如果是图片类型，也添加到图片列表
           if (message.data.output.type === 'image') {
@@ -196,10 +196,13 @@ export const websocketService = {
       case 'code_execution_image':
         // 处理专门的图片消息类型
         const imgExecutionId = message.data.execution_id
+        // 图片通过HTTP接口获取，消息中只有地址和尺寸
         const imageData: ImageItem = {
           type: 'image',
           format: message.data.image_format || 'png',
-          data: message.data.image_data
+          url: configService.getBackendBaseUrl() + message.data.image_url,
+          width: message.data.image_width,
+          height: message.data.image_height
         }
         // 使用codeExecutionStore添加图片
         codeExecutionStore.addImage(imgExecutionId, imageData)
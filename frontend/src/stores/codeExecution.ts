@@ -2,6 +2,15 @@ import { defineStore } from 'pinia'
 import { ref, reactive } from 'vue'
 import type { OutputItem, ImageItem, ExecutionStatus } from '../types'
 
+// 添加一个输出项：同类型的上一个进度输出被新的进度或正式输出替换
+export function appendOutput(outputs: OutputItem[], output: OutputItem) {
+  const index = outputs.findIndex(item => item.progress && item.type === output.type)
+  if (index !== -1) {
+    outputs.splice(index, 1)
+  }
+  outputs.push(output)
+}
+
 export const useCodeExecutionStore = defineStore('codeExecution', () => {
   // 存储所有代码执行的状态
   const executionStatus = ref<{[key: string]: ExecutionStatus}>({})
@@ -25,7 +34,7 @@ export const useCodeExecutionStore = defineStore('codeExecution', () => {
   // 添加输出
   function addOutput(executionId: string, output: OutputItem) {
     if (executionStatus.value[executionId]) {
-      executionStatus.value[executionId].output.push(output)
+      appendOutput(executionStatus.value[executionId].output, output)
       
       // 如果是图片类型，也添加到图片列表
       if (output.type === 'image') {
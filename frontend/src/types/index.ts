@@ -37,12 +37,20 @@ export interface FileItem {
   export interface OutputItem {
     type: string
     content: string
+    mime?: string
+    data?: string
+    url?: string
+    // 进度条所在行的当前状态，替换同类型的上一个进度输出
+    progress?: boolean
   }
   
   export interface ImageItem {
     type: string
     format: string
-    data: string
+    data?: string
+    url?: string
+    width?: number | null
+    height?: number | null
   }
   
   export interface ExecutionStatus {